@@ -0,0 +1,96 @@
+"""Benchmark backup time and size for each backup compression codec.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_backup [--tasks 100000]
+
+Backups go to a temporary directory, never to backups/. Sizes are the
+bytes stored (apparent) and the disk space allocated for them; a flat
+indented JSON copy, as older versions wrote for every backup, is the
+baseline. Verification of the zlib backups is timed on one thread and on
+BACKUP_VERIFY_WORKERS threads.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_fsync import make_todos
+from config.settings import BACKUP_VERIFY_WORKERS
+from utils.backup_manager import BackupManager
+from utils.chunk_store import ChunkStore, CODECS
+
+
+def disk_usage(directory):
+    """(apparent bytes, allocated bytes, file count) under a directory."""
+    apparent = allocated = count = 0
+    for path in Path(directory).rglob("*"):
+        if path.is_file():
+            st = path.stat()
+            apparent += st.st_size
+            allocated += getattr(st, "st_blocks", 0) * 512 or st.st_size
+            count += 1
+    return apparent, allocated, count
+
+
+def timed(func):
+    """Run func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench_codec(directory, todos, codec):
+    """Full backup, backup after one edit, and restore for one codec."""
+    BackupManager.BACKUP_DIR = directory
+    BackupManager.chunks = ChunkStore(directory / "chunks", codec)
+
+    manifest, full_time = timed(lambda: BackupManager._write_backup(todos))
+    full_size = disk_usage(directory)
+
+    todos[len(todos) // 2]["title"] += " (edited)"
+    _, edit_time = timed(lambda: BackupManager._write_backup(todos))
+    edit_size = disk_usage(directory)
+
+    count, restore_time = timed(lambda: sum(1 for _ in BackupManager.iter_backup_tasks(manifest.name)))
+    assert count == len(todos)
+    return full_time, full_size, edit_time, edit_size[0] - full_size[0], restore_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    todos = make_todos(args.tasks)
+    flat = json.dumps(todos, indent=2, ensure_ascii=False).encode("utf-8")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat_path = Path(tmp) / "flat.json"
+        _, flat_time = timed(lambda: flat_path.write_bytes(flat))
+        print(f"{args.tasks} tasks; flat copy: {len(flat) / 1024:.0f} KiB in {flat_time:.2f} s "
+              f"(every backup)\n")
+        print(f"{'codec':6} {'backup':>8} {'stored':>10} {'on disk':>10} {'files':>6} "
+              f"{'vs flat':>8} {'2nd backup':>11} {'added':>9} {'restore':>8}")
+
+        for codec in CODECS:
+            directory = Path(tmp) / codec
+            full_time, (apparent, allocated, files), edit_time, added, restore_time = \
+                bench_codec(directory, make_todos(args.tasks), codec)
+            print(f"{codec:6} {full_time:7.2f}s {apparent / 1024:8.0f} K {allocated / 1024:8.0f} K "
+                  f"{files:6} {apparent / len(flat):7.1%} {edit_time:10.2f}s "
+                  f"{added / 1024:7.1f} K {restore_time:7.2f}s")
+
+        BackupManager.BACKUP_DIR = Path(tmp) / "zlib"
+        BackupManager.chunks = ChunkStore(BackupManager.BACKUP_DIR / "chunks", "zlib")
+        print()
+        for workers in (1, BACKUP_VERIFY_WORKERS):
+            report, verify_time = timed(lambda: BackupManager.verify_backups(workers=workers))
+            assert not report["corrupt"]
+            print(f"verify {report['checked']} backups, {workers} thread(s): {verify_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
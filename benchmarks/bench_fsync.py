@@ -0,0 +1,164 @@
+"""Benchmark todos.json write and journal append latency under each fsync policy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fsync [--tasks 5000] [--writes 20] [--threads 8] [--edits 200]
+
+Four patterns are timed: back-to-back saves from one thread; the app's
+own pattern, where several threads save one file but each save holds a
+lock, as every todos.json write holds store_lock; a burst of
+unsynchronized writers to separate files, the only case where group commit
+("batched") has anything to batch; and a burst of journal appends, which is
+how every edit is saved by default and where "batched" shares one fsync
+among the appends of a burst.
+
+Writes go to a temporary directory next to the system temp dir, so results
+depend on that filesystem; point TMPDIR at the disk holding todos.json for
+representative numbers.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from utils.atomic_io import append_text, atomic_write, DelayedSync, GroupCommit, FSYNC_POLICIES
+from utils.file_lock import FileLock
+import utils.atomic_io as atomic_io
+
+
+def make_todos(count):
+    """Build a synthetic todo list."""
+    return [
+        {
+            "title": f"Task {i}",
+            "description_content": [{"text": f"Description for task {i}", "formatting": []}],
+            "completed": i % 3 == 0,
+            "priority": ("High", "Medium", "Low")[i % 3],
+            "due_datetime": "2025-11-23 12:00",
+            "has_reminder": False,
+            "reminder_datetime": None,
+            "is_recurring": False,
+            "recurring_frequency": "None",
+            "created_at": "2025-11-23 23:27:20",
+            "sub_todos": [],
+        }
+        for i in range(count)
+    ]
+
+
+def timed_write(path, payload, policy):
+    """Write once and return the latency in milliseconds."""
+    start = time.perf_counter()
+    atomic_write(path, lambda f: f.write(payload), policy)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_sequential(directory, todos, policy, writes):
+    """Back-to-back saves from a single thread."""
+    path = directory / f"seq_{policy}.json"
+    return [timed_write(path, todos, policy) for _ in range(writes)]
+
+
+def bench_locked(directory, todos, policy, threads, writes):
+    """Saves of one file from several threads, each holding a lock, as the app does."""
+    path = directory / f"locked_{policy}.json"
+    lock = FileLock(directory / "bench.lock")
+    latencies = []
+
+    def worker():
+        for _ in range(writes):
+            with lock:
+                latencies.append(timed_write(path, todos, policy))
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies
+
+
+def bench_burst(directory, todos, policy, threads, writes):
+    """Concurrent saves of several files, as group commit sees them."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        path = directory / f"burst_{policy}_{n}.json"
+        for _ in range(writes):
+            ms = timed_write(path, todos, policy)
+            with lock:
+                latencies.append(ms)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def bench_journal(directory, todo, policy, edits):
+    """Back-to-back journal appends of one edited task each, as the app saves edits."""
+    path = directory / f"journal_{policy}.journal"
+    line = json.dumps({"op": "set", "index": 0, "todo": todo}, ensure_ascii=False) + "\n"
+    latencies = []
+    for _ in range(edits):
+        start = time.perf_counter()
+        append_text(path, line, policy)
+        latencies.append((time.perf_counter() - start) * 1000)
+    atomic_io._delayed_sync.flush()
+    return latencies
+
+
+def summarize(latencies):
+    """Format mean / p50 / p95 latency."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"mean {statistics.mean(ordered):8.2f} ms  "
+            f"p50 {statistics.median(ordered):8.2f} ms  p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    # Encode once so the numbers show file I/O, not JSON encoding
+    records = make_todos(args.tasks)
+    todos = json.dumps(records, indent=2, ensure_ascii=False)
+    print(f"{args.tasks} tasks ({len(todos) // 1024} KiB), {args.writes} writes per run, {args.threads} threads in app and burst runs\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for policy in FSYNC_POLICIES:
+            atomic_io._group_commit = GroupCommit()
+            atomic_io._delayed_sync = DelayedSync()
+            seq = bench_sequential(directory, todos, policy, args.writes)
+            locked = bench_locked(directory, todos, policy, args.threads, args.writes)
+            burst, elapsed = bench_burst(directory, todos, policy, args.threads, args.writes)
+            fsyncs = atomic_io._group_commit.fsync_count
+            journal = bench_journal(directory, records[0], policy, args.edits)
+            print(f"{policy:8} sequential: {summarize(seq)}")
+            print(f"{'':8} app (lock): {summarize(locked)}")
+            print(f"{'':8} burst:      {summarize(burst)}  "
+                  f"{len(burst) / elapsed:7.1f} writes/s")
+            print(f"{'':8} journal:    {summarize(journal)}")
+            if policy == "batched":
+                print(f"{'':8} group commit issued {fsyncs} fsyncs for "
+                      f"{args.writes + len(locked) + len(burst)} writes; "
+                      f"{len(journal)} journal appends took "
+                      f"{atomic_io._delayed_sync.fsync_count} fsyncs")
+            print()
+
+
+if __name__ == "__main__":
+    main()
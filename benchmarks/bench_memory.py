@@ -0,0 +1,95 @@
+"""Benchmark the memory held by a loaded todo list: JSON records vs TodoItem models.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [--tasks 100000]
+
+The synthetic list looks like a real one: every task has its own created_at
+and title, due dates fall on a few dozen distinct days, a quarter of the
+tasks have three sub-tasks and half have no description. Both variants are
+parsed from the same JSON text and measured with tracemalloc, so strings
+shared by the parser's literals don't flatter either side.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from models.todo import TodoItem, new_id
+
+
+def make_records(count):
+    """Build a realistic synthetic list as JSON text."""
+    start = datetime(2025, 1, 1)
+    todos = []
+    for i in range(count):
+        created = (start + timedelta(seconds=37 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        due = (start + timedelta(days=i % 60)).strftime("%Y-%m-%d 09:00")
+        todo = {
+            "id": new_id(),
+            "title": f"Task {i}",
+            "priority": ("High", "Medium", "Low")[i % 3],
+            "due_datetime": due if i % 4 else None,
+            "description_content": ([{"text": "Follow up", "formatting": []}] if i % 2
+                                    else []),
+            "completed": i % 3 == 0,
+            "has_reminder": i % 10 == 0,
+            "reminder_datetime": due if i % 10 == 0 else None,
+            "is_recurring": False,
+            "recurring_frequency": "None",
+            "created_at": created,
+            "sub_todos": [
+                {"id": new_id(), "title": f"Step {n}", "description_content": [],
+                 "completed": n == 0, "created_at": created}
+                for n in range(3 if i % 4 == 0 else 0)
+            ],
+        }
+        if todo["completed"]:
+            todo["completed_at"] = created
+        todos.append(todo)
+    return json.dumps(todos, ensure_ascii=False)
+
+
+def measure(build):
+    """Bytes still allocated by what build() returns, and the time it took."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    text = make_records(args.tasks)
+    records, record_bytes, parse_time = measure(lambda: json.loads(text))
+    del records
+    todos, model_bytes, load_time = measure(lambda: TodoItem.from_dicts(json.loads(text)))
+
+    start = time.perf_counter()
+    out = TodoItem.to_dicts(todos)
+    dump_time = time.perf_counter() - start
+    assert out == json.loads(text)
+
+    print(f"{args.tasks} tasks, {len(text) / 1024:.0f} KiB of JSON\n")
+    print(f"{'':10} {'memory':>10} {'per task':>9} {'load':>8}")
+    print(f"{'records':10} {record_bytes / 2**20:8.1f} M {record_bytes / args.tasks:7.0f} B "
+          f"{parse_time:7.2f}s")
+    print(f"{'models':10} {model_bytes / 2**20:8.1f} M {model_bytes / args.tasks:7.0f} B "
+          f"{load_time:7.2f}s")
+    print(f"\nmodels use {model_bytes / record_bytes:.0%} of the records' memory; "
+          f"to_dicts() takes {dump_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark task search: the search index vs scanning every task, and fuzzy search.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search [--tasks 100000]
+
+Tasks come from bench_memory's synthetic list, with a few words of text
+per title and description. The scan is what the task list did before the
+index: lowercase each title and description and test for the query.
+Fuzzy queries have typos; the first one also builds the trigram index.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.bench_memory import make_records
+from models.task_index import TaskIndex
+from models.todo import TodoItem
+
+WORDS = ("buy", "milk", "call", "plumber", "review", "report", "book", "flight",
+         "pay", "invoice", "clean", "garage", "email", "dentist", "plan", "trip")
+QUERIES = ("milk", "rep", "pay inv", "flight", "gar", "zzz")
+FUZZY_QUERIES = ("mlk", "plumbr", "pay invioce", "dentsit", "qqqq")
+
+
+def make_todos(count):
+    """Synthetic tasks with a few random words of text each."""
+    rng = random.Random(0)
+    todos = TodoItem.from_dicts(json.loads(make_records(count)))
+    for todo in todos:
+        todo.title = f"{todo.title} {' '.join(rng.sample(WORDS, 2))}"
+        todo.description_content = [{"text": " ".join(rng.sample(WORDS, 3)), "formatting": []}]
+    return todos
+
+
+def scan(todos, query):
+    """The search the task list did before the index."""
+    found = set()
+    for todo in todos:
+        title = todo.title.lower()
+        desc = " ".join(x.get("text", "") for x in todo.description_content).lower()
+        if query in title or query in desc:
+            found.add(todo.id)
+    return found
+
+
+def timed(func, repeat=5):
+    """Best time of a few calls, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    todos = make_todos(args.tasks)
+    start = time.perf_counter()
+    index = TaskIndex(todos)
+    build_time = time.perf_counter() - start
+
+    print(f"{args.tasks} tasks, index built in {build_time:.2f}s\n")
+    print(f"{'query':10} {'matches':>8} {'index':>10} {'scan':>10}")
+    for query in QUERIES:
+        ids, index_time = timed(lambda: index.search.find(query))
+        _, scan_time = timed(lambda: scan(todos, query), repeat=1)
+        print(f"{query:10} {len(ids):8} {index_time * 1000:8.2f}ms {scan_time * 1000:8.1f}ms")
+
+    start = time.perf_counter()
+    index.search.rank("milk")
+    gram_time = time.perf_counter() - start
+    print(f"\nfuzzy (trigram index built in {gram_time:.2f}s)\n")
+    print(f"{'query':12} {'matches':>8} {'time':>10}  best match")
+    by_id = {todo.id: todo for todo in todos}
+    for query in FUZZY_QUERIES:
+        ranking, rank_time = timed(lambda: index.search.rank(query))
+        best = max(ranking, key=ranking.get) if ranking else None
+        title = by_id[best].title if best else ""
+        print(f"{query:12} {len(ranking):8} {rank_time * 1000:8.2f}ms  {title}")
+
+    todo = todos[len(todos) // 2]
+    _, update_time = timed(lambda: index.replace(todo, todo))
+    print(f"\nre-indexing one edited task takes {update_time * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,55 @@ APP_VERSION = "2.0.0"
 BASE_DIR = Path(__file__).parent.parent
 TODO_FILE = BASE_DIR / "todos.json"
 SETTINGS_FILE = BASE_DIR / "settings.json"
+JOURNAL_FILE = BASE_DIR / "todos.journal"
+DATABASE_FILE = BASE_DIR / "todos.db"
+ARCHIVE_DIR = BASE_DIR / "archive"
+LOCK_FILE = BASE_DIR / "todos.lock"
+SYNC_FILE = BASE_DIR / "todos.sync"
+BACKUP_LOCK_FILE = BASE_DIR / "backups.lock"
+
+# Storage Settings
+STORAGE_BACKEND = "json"  # "json" or "sqlite"
+
+# Journal Settings
+JOURNAL_ENABLED = True
+JOURNAL_COMPACT_THRESHOLD = 1024 * 1024  # bytes
+
+# File Format Settings
+JSON_COMPACT = False  # write todos without indentation (smaller, faster)
+
+# Durability Settings
+FSYNC_POLICY = "always"  # "always", "batched" (group commit) or "never"
+FSYNC_BATCH_WINDOW_MS = 5  # how long a group commit waits for more writers (and journal syncs lag)
+
+# Loading Settings
+FIRST_LOAD_CHUNK = 100  # tasks parsed before the first screen is drawn
+LOAD_CHUNK_SIZE = 2000  # tasks parsed per idle step afterwards
+
+# Archive Settings
+ARCHIVE_ENABLED = True
+ARCHIVE_AFTER_DAYS = 30  # completed tasks older than this leave the active list
+
+# Backup Settings
+BACKUP_COMPRESSION = "zlib"  # "zlib", "gzip", "lzma" or "none"
+BACKUP_INTERVAL_MS = 15 * 60 * 1000  # automatic backups (skipped if unchanged)
+# Grandfather-father-son retention: the "last" N backups are kept, plus the
+# newest backup of each of the last N hours / days / weeks that have backups
+BACKUP_RETENTION = {"last": 10, "hourly": 24, "daily": 14, "weekly": 12}
+BACKUP_VERIFY_WORKERS = 8  # threads reading and re-hashing chunks when verifying
+
+# Multi-Instance Settings
+LOCK_TIMEOUT = 10  # seconds to wait for another instance's write
+SYNC_POLL_MS = 2000  # how often to check for changes by other instances
+
+# Autosave Settings
+AUTOSAVE_DELAY_MS = 1500  # quiet period before pending changes are written
+
+# Search Settings
+SEARCH_DEBOUNCE_MS = 250  # pause in typing before the search box is applied
+FUZZY_MIN_SIMILARITY = 0.4  # trigram similarity (0-1) for a word to count as a match
+FUZZY_RECENCY_WEIGHT = 0.2  # score bonus for a task created just now, halving every
+FUZZY_RECENCY_DAYS = 30  # this many days
 
 # Date/Time Formats
 DATE_FORMAT = "%Y-%m-%d"
@@ -32,6 +81,13 @@ DISPLAY_DATE_FORMAT = "%Y-%m-%d %H:%M"
 # UI Settings
 DEFAULT_WINDOW_SIZE = "1280x800"
 MIN_WINDOW_SIZE = (1000, 700)
+# Refresh the task list by changing only the rows that differ from what is
+# shown (False: clear and re-insert every row on each refresh)
+INCREMENTAL_TREE_UPDATES = True
+# Above this many tasks in view, only the rows in sight (plus
+# VIRTUAL_LIST_OVERSCAN below them) are kept in the task list (0: never)
+VIRTUAL_LIST_THRESHOLD = 2000
+VIRTUAL_LIST_OVERSCAN = 10
 
 # Default Theme
 DEFAULT_THEME = "superhero"
@@ -5,12 +5,12 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.widgets.scrolled import ScrolledText
 from ttkbootstrap.widgets import DateEntry 
 from datetime import datetime, timedelta
-import json
 import re
 import csv
+from models.todo import TodoItem, new_id
+from utils.data_manager import DataManager
 
 # --- Constants ---
-TODO_FILE = "todos.json"
 DATE_FORMAT = "%Y-%m-%d"
 DATETIME_FORMAT = "%Y-%m-%d %H:%M"
 
@@ -642,13 +642,18 @@ class TodoListApp(ttk.Window):
             messagebox.showerror("Error", f"Export failed: {e}")
 
     def save_todos(self):
-        with open(TODO_FILE, "w") as f: json.dump(self.todo_list, f, indent=2)
+        # Saved through DataManager like the main app (versioned file, ids, journal);
+        # new tasks keep the id given here, so it stays the same across saves
+        for todo in self.todo_list:
+            todo.setdefault("id", new_id())
+            for sub in todo.get("sub_todos", []):
+                sub.setdefault("id", new_id())
+        DataManager.save_todos(TodoItem.from_dicts(self.todo_list))
 
     def load_todos(self):
         try:
-            with open(TODO_FILE, "r") as f: 
-                self.todo_list = json.load(f)
-                self.apply_filters_and_sort()
+            self.todo_list = DataManager.read_records()
+            self.apply_filters_and_sort()
         except: self.todo_list = []
         self.update_stats()
 
@@ -1,3 +1,5 @@
 """Data models package."""
 
-from .todo import TodoItem, SubTodoItem
+from .todo import TodoItem, SubTodoItem, RecordView
+from .task_index import TaskIndex
+from .search_index import SearchIndex
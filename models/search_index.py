@@ -0,0 +1,216 @@
+"""Full-text search over task titles, descriptions and sub-tasks."""
+
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config.settings import FUZZY_MIN_SIMILARITY, FUZZY_RECENCY_WEIGHT, FUZZY_RECENCY_DAYS
+from models.todo import TodoItem, now_epoch
+
+
+_WORD = re.compile(r"\w+")
+_DAY = 86400
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words."""
+    return _WORD.findall(text.lower())
+
+
+def _text_of(todo: TodoItem) -> List[str]:
+    """The searchable text of a task: title, description and its sub-tasks'."""
+    parts = [todo.title]
+    parts.extend(line.get("text", "") for line in todo.description_content)
+    for sub in todo.sub_todos:
+        parts.append(sub.title)
+        parts.extend(line.get("text", "") for line in sub.description_content)
+    return parts
+
+
+def trigrams(word: str) -> Set[str]:
+    """The three-letter pieces of a word, padded so its start and end count."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _same_text(old: TodoItem, new: TodoItem) -> bool:
+    """Check if two versions of a task have the same searchable text."""
+    if old.title != new.title or old.description_content != new.description_content:
+        return False
+    if len(old.sub_todos) != len(new.sub_todos):
+        return False
+    return all(a.title == b.title and a.description_content == b.description_content
+               for a, b in zip(old.sub_todos, new.sub_todos))
+
+
+class SearchIndex:
+    """Inverted index from words to the IDs of the tasks containing them.
+
+    A query matches a task when every word in it starts a word of the
+    task's title, description or one of its sub-tasks, so "gro mil" finds
+    "Groceries" with a sub-task "Buy milk". The indexed words are kept
+    sorted, so the words starting with a query word are found by bisection
+    and a lookup never looks at the tasks themselves.
+
+    rank() is the typo-tolerant search: the indexed words are themselves
+    indexed by trigram, so the words similar to a query word are found
+    without looking at every word, and only the tasks containing them are
+    scored. The trigram index is built on the first fuzzy search.
+
+    Tasks are added, re-indexed and removed one at a time as they change
+    (see TaskIndex); sync() re-indexes a whole new list, tokenizing only
+    tasks whose text differs from the indexed version.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._words: List[str] = []  # sorted keys of _postings
+        self._docs: Dict[str, Tuple[TodoItem, Tuple[str, ...]]] = {}
+        # Trigram -> indexed words containing it, and each word's trigram count
+        self._grams: Optional[Dict[str, Set[str]]] = None
+        self._gram_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, todo: TodoItem):
+        """Index a task, or re-index it after its text changed."""
+        todo_id = todo.id
+        self._remove_id(todo_id)
+        words = tuple(set(tokenize("\n".join(_text_of(todo)))))
+        postings = self._postings
+        for word in words:
+            ids = postings.get(word)
+            if ids is None:
+                ids = postings[word] = set()
+                insort(self._words, word)
+                if self._grams is not None:
+                    self._add_grams(word)
+            ids.add(todo_id)
+        self._docs[todo_id] = (todo, words)
+
+    def remove(self, todo: TodoItem):
+        """Forget a task."""
+        self._remove_id(todo.id)
+
+    def sync(self, todos: Iterable[TodoItem]):
+        """Index exactly the given tasks, keeping the entries of unchanged ones."""
+        current = {todo.id: todo for todo in todos}
+        for todo_id in [i for i in self._docs if i not in current]:
+            self._remove_id(todo_id)
+        for todo_id, todo in current.items():
+            entry = self._docs.get(todo_id)
+            if entry is None or (entry[0] is not todo and not _same_text(entry[0], todo)):
+                self.add(todo)
+            elif entry[0] is not todo:
+                self._docs[todo_id] = (todo, entry[1])
+
+    def find(self, query: str) -> Optional[Set[str]]:
+        """Get the IDs of the tasks matching a query (None if it has no words)."""
+        words = set(tokenize(query))
+        if not words:
+            return None
+        result = None
+        # Longer words match fewer tasks; start with them to keep sets small
+        for word in sorted(words, key=len, reverse=True):
+            ids = self._prefixed(word)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+    def rank(self, query: str, now: int = None) -> Optional[Dict[str, float]]:
+        """Get {task ID: score} for the tasks fuzzily matching a query.
+        
+        Every query word must be similar (FUZZY_MIN_SIMILARITY) to, or the
+        start of, a word of the task. The score is the mean similarity of
+        the query words' best matches plus a bonus for recently created
+        tasks. None if the query has no words.
+        """
+        words = set(tokenize(query))
+        if not words:
+            return None
+        if self._grams is None:
+            self._grams = {}
+            for word in self._postings:
+                self._add_grams(word)
+        
+        scores = None
+        for word in words:
+            best = {}  # task ID -> similarity of its closest word to this one
+            # Most similar first, so a task's first similarity is its best
+            for similar, similarity in sorted(self._similar_words(word),
+                                              key=lambda pair: -pair[1]):
+                best.update(dict.fromkeys(self._postings[similar] - best.keys(), similarity))
+            if scores is None:
+                scores = best
+            else:
+                scores = {i: score + best[i] for i, score in scores.items() if i in best}
+            if not scores:
+                return {}
+        
+        now = now_epoch() if now is None else now
+        decay = 0.5 ** (1 / (FUZZY_RECENCY_DAYS * _DAY))  # per second of age
+        count = len(words)
+        docs = self._docs
+        ranking = {}
+        for todo_id, score in scores.items():
+            created = docs[todo_id][0].created_ts
+            score /= count
+            if created is not None:
+                score += FUZZY_RECENCY_WEIGHT * decay ** (now - created if now > created else 0)
+            ranking[todo_id] = score
+        return ranking
+
+    def _similar_words(self, word: str) -> List[Tuple[str, float]]:
+        """Indexed words similar to word (Dice coefficient of their trigrams)."""
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for other in self._grams.get(gram, ()):
+                shared[other] = shared.get(other, 0) + 1
+        similar = []
+        for other, count in shared.items():
+            if other.startswith(word):
+                similar.append((other, 1.0))
+                continue
+            similarity = 2 * count / (len(grams) + self._gram_counts[other])
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                similar.append((other, similarity))
+        return similar
+
+    def _add_grams(self, word: str):
+        grams = trigrams(word)
+        self._gram_counts[word] = len(grams)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(word)
+
+    def _drop_grams(self, word: str):
+        del self._gram_counts[word]
+        for gram in trigrams(word):
+            words = self._grams[gram]
+            words.discard(word)
+            if not words:
+                del self._grams[gram]
+
+    def _prefixed(self, prefix: str) -> Set[str]:
+        """IDs of the tasks with a word starting with prefix."""
+        words = self._words
+        i = bisect_left(words, prefix)
+        ids = set()
+        while i < len(words) and words[i].startswith(prefix):
+            ids |= self._postings[words[i]]
+            i += 1
+        return ids
+
+    def _remove_id(self, todo_id: str):
+        entry = self._docs.pop(todo_id, None)
+        if entry is None:
+            return
+        for word in entry[1]:
+            ids = self._postings[word]
+            ids.discard(todo_id)
+            if not ids:
+                del self._postings[word]
+                del self._words[bisect_left(self._words, word)]
+                if self._grams is not None:
+                    self._drop_grams(word)
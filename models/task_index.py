@@ -0,0 +1,101 @@
+"""Lookup of tasks and sub-tasks by ID."""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from models.todo import TodoItem, SubTodoItem, new_id
+from models.search_index import SearchIndex
+
+
+class TaskIndex:
+    """Maps the IDs in a task list to its TodoItem and SubTodoItem objects.
+
+    Lookups by ID are dict lookups; a sub-task ID also gives its parent.
+    List positions, which storage still takes for single-task changes, are
+    indexed on first use and dropped when tasks are removed.
+    
+    IDs must be unique in a list (they are row ids in the UI). A task or
+    sub-task indexed under an ID that is already taken, as after a crash
+    mid-archive duplicated it, gets a fresh one.
+    
+    The tasks' text is indexed for search in search (a SearchIndex), kept
+    up to date by the same calls.
+    """
+
+    def __init__(self, todos: List[TodoItem] = None):
+        self.search = SearchIndex()
+        self.rebuild([] if todos is None else todos)
+
+    def rebuild(self, todos: List[TodoItem]):
+        """Index a (new) task list from scratch."""
+        self.todos = todos
+        self.tasks: Dict[str, TodoItem] = {}
+        self.subs: Dict[str, Tuple[TodoItem, SubTodoItem]] = {}
+        self._positions: Optional[Dict[str, int]] = None
+        for todo in todos:
+            self._add(todo)
+        self.search.sync(todos)
+
+    def extend(self, todos: Iterable[TodoItem]):
+        """Index tasks appended to the list."""
+        for todo in todos:
+            self._add(todo)
+            self.search.add(todo)
+
+    def add(self, todo: TodoItem):
+        """Index a task that was appended to the list."""
+        self._add(todo)
+        self.search.add(todo)
+        if self._positions is not None:
+            self._positions[todo.id] = len(self.todos) - 1
+
+    def replace(self, old: TodoItem, todo: TodoItem):
+        """Re-index a task replaced (or edited) in place; it keeps its position."""
+        self._drop(old)
+        self.search.remove(old)
+        self._add(todo)
+        self.search.add(todo)
+
+    def remove(self, todo: TodoItem):
+        """Forget a task removed from the list."""
+        self._drop(todo)
+        self.search.remove(todo)
+        self._positions = None
+
+    def add_sub(self, todo: TodoItem, sub: SubTodoItem):
+        """Index a sub-task added to (or replaced in) a task."""
+        if self.subs.get(sub.id, (todo, sub))[0] is not todo:
+            sub.id = new_id()
+        self.subs[sub.id] = (todo, sub)
+        self.search.add(todo)
+
+    def remove_sub(self, sub: SubTodoItem):
+        """Forget a sub-task removed from its task."""
+        todo, _ = self.subs.pop(sub.id, (None, None))
+        if todo is not None:
+            self.search.add(todo)
+
+    def find(self, item_id: str) -> Tuple[Optional[TodoItem], Optional[SubTodoItem]]:
+        """Get (task, None) for a task ID, (parent, sub-task) for a sub-task ID."""
+        todo = self.tasks.get(item_id)
+        if todo is not None:
+            return todo, None
+        return self.subs.get(item_id, (None, None))
+
+    def position(self, todo_id: str) -> int:
+        """Position of a task in the list."""
+        if self._positions is None:
+            self._positions = {todo.id: i for i, todo in enumerate(self.todos)}
+        return self._positions[todo_id]
+
+    def _add(self, todo: TodoItem):
+        if self.tasks.get(todo.id, todo) is not todo:
+            todo.id = new_id()
+        self.tasks[todo.id] = todo
+        for sub in todo.sub_todos:
+            if self.subs.get(sub.id, (todo, sub))[1] is not sub:
+                sub.id = new_id()
+            self.subs[sub.id] = (todo, sub)
+
+    def _drop(self, todo: TodoItem):
+        self.tasks.pop(todo.id, None)
+        for sub in todo.sub_todos:
+            self.subs.pop(sub.id, None)
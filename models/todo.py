@@ -1,70 +1,210 @@
 """Todo data models."""
 
-from datetime import datetime
-from typing import List, Dict, Optional
-from config.settings import DATETIME_FORMAT
+import sys
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Iterable, Optional
+from config.settings import PRIORITY_LEVELS
+
+
+# Enum-like values, interned so every task shares one string object each
+HIGH, MEDIUM, LOW = (sys.intern(p) for p in PRIORITY_LEVELS)
+STATUS_DONE = sys.intern("Done")
+STATUS_ACTIVE = sys.intern("Active")
+STATUS_OVERDUE = sys.intern("Overdue")
+NO_RECURRENCE = sys.intern("None")
+
+_intern = sys.intern
+
+
+def _shared(value):
+    """Intern a short, often repeated string field (dates, names); other values pass through."""
+    return _intern(value) if type(value) is str else value
+
+
+def _shared_description(desc, memo: Dict):
+    """Reuse one list for identical plain one-line descriptions within a load.
+
+    Safe because description_content is always replaced, never mutated in
+    place (see DataManager).
+    """
+    if type(desc) is list and len(desc) == 1:
+        line = desc[0]
+        if type(line) is dict and len(line) == 2 and line.get("formatting") == []:
+            text = line.get("text")
+            if type(text) is str:
+                shared = memo.get(text)
+                if shared is None:
+                    memo[text] = desc
+                    return desc
+                return shared
+    return desc
+
+
+def new_id() -> str:
+    """A fresh task or sub-task ID (64 random bits as hex)."""
+    return uuid.uuid4().hex[:16]
+
+
+def _now() -> str:
+    """Current time in the created_at format."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_epoch(value: datetime) -> int:
+    """Whole seconds from 1970-01-01 to a naive local time (no DST shifts)."""
+    return (value - _EPOCH) // _SECOND
+
+
+def now_epoch() -> int:
+    """The current local time as to_epoch() seconds, to compare tasks against."""
+    return to_epoch(datetime.now())
+
+
+def _parse_epoch(value: Optional[str]) -> Optional[int]:
+    """Parse a stored "YYYY-mm-dd HH:MM[:SS]" string (None if unset or invalid)."""
+    if not value:
+        return None
+    try:
+        return to_epoch(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# Due and reminder dates repeat across tasks, so their parses are reused
+_parse_shared_epoch = lru_cache(maxsize=4096)(_parse_epoch)
 
 
 class SubTodoItem:
     """Represents a sub-task."""
     
-    def __init__(self, title: str, description_content: List[Dict] = None, 
-                 completed: bool = False, created_at: str = None):
+    __slots__ = ("id", "title", "description_content", "completed", "created_at", "extra")
+    
+    FIELDS = ("id", "title", "description_content", "completed", "created_at")
+    
+    def __init__(self, title: str, description_content: List[Dict] = None,
+                 completed: bool = False, created_at: str = None, extra: Dict = None,
+                 id: str = None):
+        self.id = id or new_id()
         self.title = title
         self.description_content = description_content or []
         self.completed = completed
-        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.created_at = _shared(created_at) or _now()
+        self.extra = extra  # fields this version doesn't know, kept for the round trip
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        data = {
+            "id": self.id,
             "title": self.title,
             "description_content": self.description_content,
             "completed": self.completed,
             "created_at": self.created_at
         }
+        if self.extra:
+            data.update(self.extra)
+        return data
     
     @classmethod
-    def from_dict(cls, data: Dict) -> 'SubTodoItem':
+    def from_dict(cls, data: Dict, _memo: Dict = None) -> 'SubTodoItem':
         """Create instance from dictionary."""
-        return cls(
-            title=data.get("title", ""),
-            description_content=data.get("description_content", []),
-            completed=data.get("completed", False),
-            created_at=data.get("created_at")
-        )
+        sub = cls.__new__(cls)
+        sub.id = data.get("id") or new_id()
+        sub.title = data.get("title", "")
+        desc = data.get("description_content") or []
+        sub.description_content = desc if _memo is None else _shared_description(desc, _memo)
+        sub.completed = bool(data.get("completed", False))
+        sub.created_at = _shared(data.get("created_at")) or _now()
+        sub.extra = None
+        if not data.keys() <= _SUB_FIELDS:
+            sub.extra = {k: v for k, v in data.items() if k not in _SUB_FIELDS}
+        return sub
 
 
 class TodoItem:
-    """Represents a main task."""
+    """Represents a main task.
     
-    def __init__(self, title: str, priority: str = "Medium", 
+    Tasks are slotted (no per-instance dict) and share their repeated
+    values: priority and recurrence are interned enum-like strings, dates
+    are interned, and identical plain descriptions are one list per load.
+    DataManager converts between these and the JSON records the storage
+    layer reads and writes, in bulk with from_dicts() and to_dicts().
+    
+    Every task and sub-task has a persistent unique id (see TaskIndex).
+    The due, reminder and creation dates are parsed once, when they are
+    set, into due_ts, reminder_ts and created_ts (to_epoch() seconds, None
+    if unset or invalid), so overdue checks and date sorts compare ints.
+    """
+    
+    __slots__ = ("id", "title", "priority", "_due_datetime", "due_ts", "description_content",
+                 "completed", "has_reminder", "_reminder_datetime", "reminder_ts",
+                 "is_recurring", "recurring_frequency", "_created_at", "created_ts",
+                 "sub_todos", "completed_at", "extra")
+    
+    FIELDS = ("id", "title", "priority", "due_datetime", "description_content", "completed",
+              "has_reminder", "reminder_datetime", "is_recurring", "recurring_frequency",
+              "created_at", "sub_todos", "completed_at")
+    
+    def __init__(self, title: str, priority: str = "Medium",
                  due_datetime: str = None, description_content: List[Dict] = None,
                  completed: bool = False, has_reminder: bool = False,
                  reminder_datetime: str = None, is_recurring: bool = False,
                  recurring_frequency: str = "None", created_at: str = None,
-                 sub_todos: List[SubTodoItem] = None):
+                 sub_todos: List[SubTodoItem] = None, completed_at: str = None,
+                 extra: Dict = None, id: str = None):
+        self.id = id or new_id()
         self.title = title
-        self.priority = priority
+        self.priority = _shared(priority)
         self.due_datetime = due_datetime
         self.description_content = description_content or []
         self.completed = completed
         self.has_reminder = has_reminder
         self.reminder_datetime = reminder_datetime
         self.is_recurring = is_recurring
-        self.recurring_frequency = recurring_frequency
-        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.recurring_frequency = _shared(recurring_frequency)
+        self.created_at = created_at or _now()
         self.sub_todos = sub_todos or []
+        self.completed_at = _shared(completed_at)
+        self.extra = extra  # fields this version doesn't know, kept for the round trip
     
-    def is_overdue(self) -> bool:
-        """Check if task is overdue."""
-        if not self.due_datetime or self.completed:
-            return False
-        try:
-            due_dt = datetime.strptime(self.due_datetime, DATETIME_FORMAT)
-            return due_dt < datetime.now()
-        except:
+    @property
+    def due_datetime(self) -> Optional[str]:
+        return self._due_datetime
+    
+    @due_datetime.setter
+    def due_datetime(self, value: Optional[str]):
+        self._due_datetime = _shared(value)
+        self.due_ts = _parse_shared_epoch(value)
+    
+    @property
+    def reminder_datetime(self) -> Optional[str]:
+        return self._reminder_datetime
+    
+    @reminder_datetime.setter
+    def reminder_datetime(self, value: Optional[str]):
+        self._reminder_datetime = _shared(value)
+        self.reminder_ts = _parse_shared_epoch(value)
+    
+    @property
+    def created_at(self) -> str:
+        return self._created_at
+    
+    @created_at.setter
+    def created_at(self, value: str):
+        self._created_at = _shared(value)
+        self.created_ts = _parse_epoch(value)
+    
+    def is_overdue(self, now: int = None) -> bool:
+        """Check if task is overdue (as of now, in now_epoch() seconds)."""
+        if self.due_ts is None or self.completed:
             return False
+        return self.due_ts < (now_epoch() if now is None else now)
     
     def get_progress(self) -> int:
         """Calculate progress percentage based on sub-tasks."""
@@ -73,48 +213,102 @@ class TodoItem:
         completed_count = sum(1 for sub in self.sub_todos if sub.completed)
         return int((completed_count / len(self.sub_todos)) * 100)
     
-    def get_status(self) -> str:
+    def get_status(self, now: int = None) -> str:
         """Get current status of the task."""
         if self.completed:
-            return "Done"
-        if self.is_overdue():
-            return "Overdue"
-        return "Active"
+            return STATUS_DONE
+        if self.is_overdue(now):
+            return STATUS_OVERDUE
+        return STATUS_ACTIVE
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        data = {
+            "id": self.id,
             "title": self.title,
             "priority": self.priority,
-            "due_datetime": self.due_datetime,
+            "due_datetime": self._due_datetime,
             "description_content": self.description_content,
             "completed": self.completed,
             "has_reminder": self.has_reminder,
-            "reminder_datetime": self.reminder_datetime,
+            "reminder_datetime": self._reminder_datetime,
             "is_recurring": self.is_recurring,
             "recurring_frequency": self.recurring_frequency,
-            "created_at": self.created_at,
-            "sub_todos": [sub.to_dict() if isinstance(sub, SubTodoItem) else sub 
-                         for sub in self.sub_todos]
+            "created_at": self._created_at,
+            "sub_todos": [sub.to_dict() for sub in self.sub_todos]
         }
+        if self.completed_at is not None:
+            data["completed_at"] = self.completed_at
+        if self.extra:
+            data.update(self.extra)
+        return data
     
     @classmethod
-    def from_dict(cls, data: Dict) -> 'TodoItem':
+    def from_dict(cls, data: Dict, _memo: Dict = None) -> 'TodoItem':
         """Create instance from dictionary."""
-        sub_todos_data = data.get("sub_todos", [])
-        sub_todos = [SubTodoItem.from_dict(sub) if isinstance(sub, dict) else sub 
-                     for sub in sub_todos_data]
-        
-        return cls(
-            title=data.get("title", ""),
-            priority=data.get("priority", "Medium"),
-            due_datetime=data.get("due_datetime"),
-            description_content=data.get("description_content", []),
-            completed=data.get("completed", False),
-            has_reminder=data.get("has_reminder", False),
-            reminder_datetime=data.get("reminder_datetime"),
-            is_recurring=data.get("is_recurring", False),
-            recurring_frequency=data.get("recurring_frequency", "None"),
-            created_at=data.get("created_at"),
-            sub_todos=sub_todos
-        )
+        todo = cls.__new__(cls)
+        todo.id = data.get("id") or new_id()
+        todo.title = data.get("title", "")
+        todo.priority = _shared(data.get("priority") or MEDIUM)
+        due = data.get("due_datetime")
+        todo._due_datetime = _shared(due)
+        todo.due_ts = _parse_shared_epoch(due)
+        desc = data.get("description_content") or []
+        todo.description_content = desc if _memo is None else _shared_description(desc, _memo)
+        todo.completed = bool(data.get("completed", False))
+        todo.has_reminder = bool(data.get("has_reminder", False))
+        reminder = data.get("reminder_datetime")
+        todo._reminder_datetime = _shared(reminder)
+        todo.reminder_ts = _parse_shared_epoch(reminder)
+        todo.is_recurring = bool(data.get("is_recurring", False))
+        todo.recurring_frequency = _shared(data.get("recurring_frequency") or NO_RECURRENCE)
+        created = data.get("created_at") or _now()
+        todo._created_at = _shared(created)
+        todo.created_ts = _parse_epoch(created)
+        todo.sub_todos = [SubTodoItem.from_dict(sub, _memo) for sub in data.get("sub_todos") or ()]
+        todo.completed_at = _shared(data.get("completed_at"))
+        todo.extra = None
+        if not data.keys() <= _TASK_FIELDS:
+            todo.extra = {k: v for k, v in data.items() if k not in _TASK_FIELDS}
+        return todo
+    
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict]) -> List['TodoItem']:
+        """Convert a list of JSON records, sharing repeated descriptions across it."""
+        memo = {}
+        from_dict = cls.from_dict
+        return [from_dict(record, memo) for record in records]
+    
+    @staticmethod
+    def to_dicts(todos: Iterable['TodoItem']) -> List[Dict]:
+        """Convert tasks to JSON records (fresh dicts, safe to write from another thread)."""
+        return [todo.to_dict() for todo in todos]
+
+
+_SUB_FIELDS = frozenset(SubTodoItem.FIELDS)
+_TASK_FIELDS = frozenset(TodoItem.FIELDS)
+
+
+class RecordView(Sequence):
+    """Read-only view of a task list as JSON records, converted on access.
+    
+    Lets record-based code (storage, diffs) walk a large list without a
+    second full copy of it in memory.
+    """
+    
+    __slots__ = ("todos",)
+    
+    def __init__(self, todos: List[TodoItem]):
+        self.todos = todos
+    
+    def __len__(self) -> int:
+        return len(self.todos)
+    
+    def __getitem__(self, index) -> Dict:
+        if isinstance(index, slice):
+            return [todo.to_dict() for todo in self.todos[index]]
+        return self.todos[index].to_dict()
+    
+    def __iter__(self):
+        for todo in self.todos:
+            yield todo.to_dict()
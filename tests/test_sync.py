@@ -0,0 +1,149 @@
+"""Two app instances editing the same task store at once.
+
+Each instance is a separate process running the app's own load, save and
+merge code against a private copy of the package, so the task files (which
+live next to the package) are shared by the two processes and nothing else.
+Every test runs against both storage backends.
+App modules are only imported inside the worker processes, after the copy
+is put first on sys.path.
+"""
+
+import multiprocessing
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SAME_SECOND = "2026-01-05 09:30:00"
+TIMEOUT = 60
+
+
+def _import_app(base):
+    sys.path.insert(0, str(base))
+    from models.todo import TodoItem
+    from utils.data_manager import DataManager
+    return TodoItem, DataManager
+
+
+def _seed(base, titles):
+    TodoItem, DataManager = _import_app(base)
+    todos = [TodoItem(title, created_at=SAME_SECOND) for title in titles]
+    assert DataManager.save_todos(todos)
+
+
+def _save_change(DataManager, todos, op, index=None):
+    """What MainWindow._save_change() does: record, or merge on a foreign write."""
+    if (not DataManager.record_change(todos, op, index)
+            and DataManager.has_external_changes()):
+        todos[:], _ = DataManager.merge_external(todos)
+
+
+def _instance(base, ops, barrier, results):
+    """Load, apply ops while the other instance does the same, then sync."""
+    TodoItem, DataManager = _import_app(base)
+    # As MainWindow.load_todos() does it, which also marks the list as synced
+    todos = DataManager.finish_loading(list(DataManager.iter_todos()))
+    barrier.wait()
+
+    for op, title, *args in ops:
+        position = next((i for i, t in enumerate(todos) if t.title == title), None)
+        if op == "add":
+            todos.append(TodoItem(title, created_at=SAME_SECOND))
+            _save_change(DataManager, todos, "add")
+        elif op == "edit":
+            todos[position] = TodoItem(args[0], id=todos[position].id,
+                                       created_at=todos[position].created_at)
+            _save_change(DataManager, todos, "set", position)
+        elif op == "delete":
+            del todos[position]
+            _save_change(DataManager, todos, "delete", position)
+    barrier.wait()
+
+    # What the periodic poll does once the other instance has written
+    if DataManager.has_external_changes():
+        todos, _ = DataManager.merge_external(todos)
+    barrier.wait()
+    if DataManager.has_external_changes():
+        todos, _ = DataManager.merge_external(todos)
+    results.put([(t.id, t.title) for t in todos])
+
+
+def _stored(base, results):
+    _, DataManager = _import_app(base)
+    results.put([(t.id, t.title) for t in DataManager.read_todos()])
+
+
+def _run(ctx, target, *args):
+    process = ctx.Process(target=target, args=args)
+    process.start()
+    process.join(TIMEOUT)
+    assert process.exitcode == 0
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def app(tmp_path, request):
+    """A private copy of the app's packages, set to one storage backend."""
+    base = tmp_path / "app"
+    for package in ("config", "models", "utils"):
+        shutil.copytree(ROOT / package, base / package,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+    settings = base / "config" / "settings.py"
+    settings.write_text(settings.read_text().replace(
+        'STORAGE_BACKEND = "json"', f'STORAGE_BACKEND = "{request.param}"'))
+    return base
+
+
+def run_instances(base, titles, ops_a, ops_b):
+    """Seed the store, run two instances concurrently; return their lists and the store's."""
+
+    ctx = multiprocessing.get_context("spawn")
+    _run(ctx, _seed, base, titles)
+
+    barrier = ctx.Barrier(2)
+    results = ctx.Queue()
+    instances = [ctx.Process(target=_instance, args=(base, ops, barrier, results))
+                 for ops in (ops_a, ops_b)]
+    for process in instances:
+        process.start()
+    lists = [results.get(timeout=TIMEOUT) for _ in instances]
+    for process in instances:
+        process.join(TIMEOUT)
+        assert process.exitcode == 0
+
+    _run(ctx, _stored, base, results)
+    return lists, results.get(timeout=TIMEOUT)
+
+
+def titles(tasks):
+    return [title for _, title in tasks]
+
+
+@pytest.mark.parametrize("ops_a, ops_b, expected", [
+    # Tasks created in the same second must not be confused with each other
+    ([("delete", "A")], [("edit", "B", "B edited")], ["B edited", "C"]),
+    ([("edit", "A", "A edited")], [("edit", "C", "C edited")], ["A edited", "B", "C edited"]),
+    ([("delete", "B")], [("delete", "C")], ["A"]),
+    ([("add", "D"), ("delete", "A")], [("edit", "C", "C edited")], ["B", "C edited", "D"]),
+])
+def test_concurrent_changes_merge(app, ops_a, ops_b, expected):
+    lists, stored = run_instances(app, ["A", "B", "C"], ops_a, ops_b)
+    assert titles(stored) == expected
+    assert lists == [stored, stored]
+
+
+def test_edit_beats_concurrent_delete(app):
+    lists, stored = run_instances(app, ["A", "B", "C"],
+                                  [("delete", "B")], [("edit", "B", "B edited")])
+    # Whether it keeps its place depends on which instance saved first
+    assert sorted(titles(stored)) == ["A", "B edited", "C"]
+    assert lists == [stored, stored]
+
+
+def test_concurrent_adds_keep_both(app):
+    lists, stored = run_instances(app, ["A"], [("add", "B")], [("add", "C")])
+    assert titles(stored)[0] == "A"
+    assert sorted(titles(stored)) == ["A", "B", "C"]
+    assert len({task_id for task_id, _ in stored}) == 3
+    assert lists == [stored, stored]
@@ -3,8 +3,8 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from datetime import datetime
-from config.settings import DATETIME_FORMAT
+from config.settings import SEARCH_DEBOUNCE_MS
+from models.todo import now_epoch
 
 
 class Dashboard(ttk.Frame):
@@ -24,17 +24,34 @@ class Dashboard(ttk.Frame):
         )
         self.stats_label.pack(side=LEFT, padx=10)
         
+        # Background activity (e.g. backups)
+        self.status_label = ttk.Label(self, text="", bootstyle="secondary")
+        self.status_label.pack(side=LEFT, padx=10)
+        
         # Search frame
         search_frame = ttk.Frame(self)
         search_frame.pack(side=RIGHT)
         
         ttk.Label(search_frame, text="🔍").pack(side=LEFT, padx=5)
         
+        # Searches run once typing pauses (or on Enter), not on every keystroke
+        self._search_job = None
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *args: self.on_search_change(self.search_var.get()))
+        self.search_var.trace_add("write", lambda *args: self._schedule_search())
         
         self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=25)
         self.search_entry.pack(side=LEFT)
+        self.search_entry.bind("<Return>", lambda e: self._run_search())
+        
+        # Typo-tolerant search, results ranked by relevance
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            search_frame,
+            text="Fuzzy",
+            variable=self.fuzzy_var,
+            command=self._run_search,
+            bootstyle="round-toggle"
+        ).pack(side=LEFT, padx=5)
         
         # Export button
         ttk.Button(
@@ -44,28 +61,48 @@ class Dashboard(ttk.Frame):
             bootstyle="outline-secondary"
         ).pack(side=RIGHT, padx=20)
     
-    def update_stats(self, todos):
+    def _schedule_search(self):
+        """Search SEARCH_DEBOUNCE_MS after the last keystroke, dropping a pending search."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+    
+    def _run_search(self):
+        """Apply the search box now (cancelling the pending search, if any)."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        self.on_search_change(self.search_var.get())
+    
+    def update_stats(self, todos, archived_count=0):
         """Update statistics display."""
         total = len(todos)
-        active = sum(1 for t in todos if not t.get("completed"))
-        completed = sum(1 for t in todos if t.get("completed"))
+        completed = sum(1 for t in todos if t.completed)
+        active = total - completed
         
         # Calculate overdue
-        overdue = 0
-        now = datetime.now()
-        for t in todos:
-            if not t.get("completed") and t.get("due_datetime"):
-                try:
-                    dt = datetime.strptime(t["due_datetime"], DATETIME_FORMAT)
-                    if dt < now:
-                        overdue += 1
-                except:
-                    pass
+        now = now_epoch()
+        overdue = sum(1 for t in todos
+                      if not t.completed and t.due_ts is not None and t.due_ts < now)
         
         # Enhanced stats with emojis
         stats_text = f"📊 Total: {total}  |  ✅ Active: {active}  |  ⏰ Overdue: {overdue}  |  ✓ Completed: {completed}"
+        if archived_count:
+            stats_text += f"  |  🗄 Archived: {archived_count}"
         self.stats_label.config(text=stats_text)
     
+    def show_loading(self, count):
+        """Show loading progress instead of statistics."""
+        self.stats_label.config(text=f"⏳ Loading... {count} tasks")
+    
+    def show_status(self, text):
+        """Show a short note about background activity next to the stats."""
+        self.status_label.config(text=text)
+    
     def get_search_query(self):
         """Get current search query."""
         return self.search_var.get().lower()
+    
+    def is_fuzzy(self):
+        """Check if fuzzy search is switched on."""
+        return self.fuzzy_var.get()
@@ -425,10 +425,10 @@ class InputForm(ttk.Frame):
         """Load todo data into form."""
         self.clear_form(soft=True)
         
-        self.todo_title_entry.insert(0, todo["title"])
-        self.completed_var.set(todo.get("completed", False))
+        self.todo_title_entry.insert(0, todo.title)
+        self.completed_var.set(todo.completed)
         
-        desc = todo.get("description_content", [])
+        desc = todo.description_content
         if desc and isinstance(desc, list):
             target = self.description_text.text if hasattr(self.description_text, 'text') else self.description_text
             for line in desc:
@@ -437,21 +437,21 @@ class InputForm(ttk.Frame):
         if not is_sub:
             self.form_header.config(text="Edit Task", bootstyle="warning")
             
-            self.priority_var.set(todo.get("priority", "Medium"))
+            self.priority_var.set(todo.priority)
             
-            if todo.get("due_datetime"):
+            if todo.due_datetime:
                 try:
-                    dt = datetime.strptime(todo["due_datetime"], DATETIME_FORMAT)
+                    dt = datetime.strptime(todo.due_datetime, DATETIME_FORMAT)
                     self.due_date_entry.entry.delete(0, END)
                     self.due_date_entry.entry.insert(0, dt.strftime(DATE_FORMAT))
                     self.due_time_entry.insert(0, dt.strftime("%H:%M"))
                 except:
                     pass
             
-            self.set_reminder_var.set(todo.get("has_reminder", False))
-            if todo.get("has_reminder") and todo.get("reminder_datetime"):
+            self.set_reminder_var.set(todo.has_reminder)
+            if todo.has_reminder and todo.reminder_datetime:
                 try:
-                    rdt = datetime.strptime(todo["reminder_datetime"], DATETIME_FORMAT)
+                    rdt = datetime.strptime(todo.reminder_datetime, DATETIME_FORMAT)
                     self.reminder_date_entry.entry.delete(0, END)
                     self.reminder_date_entry.entry.insert(0, rdt.strftime(DATE_FORMAT))
                     self.reminder_time_entry.insert(0, rdt.strftime("%H:%M"))
@@ -459,9 +459,9 @@ class InputForm(ttk.Frame):
                     pass
             self.toggle_reminder_options()
             
-            self.set_recurring_var.set(todo.get("is_recurring", False))
-            if todo.get("is_recurring"):
-                self.recurring_combo.set(todo.get("recurring_frequency"))
+            self.set_recurring_var.set(todo.is_recurring)
+            if todo.is_recurring:
+                self.recurring_combo.set(todo.recurring_frequency)
             self.toggle_recurring_options()
         else:
             self.form_header.config(text="Edit Sub-Task", bootstyle="warning")
@@ -1,15 +1,50 @@
 """Task list component with treeview."""
 
 import tkinter as tk
+from bisect import bisect_left
+from itertools import islice
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from datetime import datetime
-from config.settings import DATETIME_FORMAT, FILTER_OPTIONS, SORT_OPTIONS
+from config.settings import (FILTER_OPTIONS, SORT_OPTIONS, INCREMENTAL_TREE_UPDATES,
+                             VIRTUAL_LIST_THRESHOLD, VIRTUAL_LIST_OVERSCAN)
+from models.todo import now_epoch
+from models.search_index import tokenize
+
+
+def _longest_increasing(seq):
+    """Positions in seq of one longest strictly increasing subsequence."""
+    tails = []  # tails[k]: position ending the best run of length k + 1
+    tail_values = []
+    prev = [-1] * len(seq)
+    for i, value in enumerate(seq):
+        k = bisect_left(tail_values, value)
+        if k:
+            prev[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    result = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.add(i)
+        i = prev[i]
+    return result
 
 
 class TaskList(ttk.Frame):
     """Task list with filtering and sorting."""
     
+    # Row ids are task and sub-task IDs; those of archived (read-only) tasks get this prefix
+    ARCHIVED_PREFIX = "archived:"
+    # Row id prefix of the empty child that gives a collapsed task its expander
+    PLACEHOLDER_PREFIX = "placeholder:"
+    
+    # Sorts after every real due date
+    NO_DUE_DATE = float("inf")
+    
     def __init__(self, parent, on_select, on_delete, on_add_subtask, theme_config):
         super().__init__(parent, padding=10)
         self.on_select = on_select
@@ -25,6 +60,35 @@ class TaskList(ttk.Frame):
         
         self.current_filter = "All"
         self.current_sort = "Due Date"
+        
+        # Tasks in the view: active ones by row id (their task ID), archived
+        # ones by row id, and all row ids in display order (active first)
+        self._rows = {}
+        self._archived = {}
+        self._order = []
+        self._sorted = True  # False while rows are appended unsorted during a load
+        # Top-level row ids held by the tree, in order (all of _order, or the
+        # part in view when virtualized) and what each was rendered as
+        self._tk_order = []
+        self._rendered = {}
+        # Row ids of the tasks whose subtasks are shown; subtask rows are only
+        # inserted once their task is expanded
+        self._expanded = set()
+        # Virtualized: position in _order of the first row in view, and the
+        # selected row id and its task's (kept while scrolled out of the tree)
+        self._virtual = False
+        self._top = 0
+        self._selected = None
+        self._selected_task = None
+        # Set by the parent: task ID -> position in the list (breaks sort ties)
+        self.position_callback = None
+        # Set by the parent: search query -> IDs of the matching tasks (None if
+        # it can't answer, in which case titles and descriptions are scanned)
+        self.search_callback = None
+        # Fuzzy search: task ID -> score of the matches, shown best first
+        self._ranking = None
+        # Search query the rows shown were filtered with
+        self._query = ""
     
     def _build_filter_controls(self):
         """Build filter and sort controls."""
@@ -96,11 +160,20 @@ class TaskList(ttk.Frame):
         self.tree.column("Status", width=80, anchor=CENTER)
         
         # Scrollbar
-        vsb = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
-        self.tree.bind('<<TreeviewSelect>>', lambda e: self.on_select())
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll)
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<<TreeviewOpen>>', self._on_tree_open)
+        self.tree.bind('<<TreeviewClose>>', self._on_tree_close)
+        
+        # Virtualized scrolling
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
+        self.tree.bind("<Up>", self._on_up)
+        self.tree.bind("<Configure>", lambda e: self._virtual and self._show_rows())
         
-        vsb.pack(side=RIGHT, fill=Y)
+        self.vsb.pack(side=RIGHT, fill=Y)
         self.tree.pack(side=LEFT, fill=BOTH, expand=True)
         
         self._configure_tags()
@@ -174,152 +247,526 @@ class TaskList(ttk.Frame):
         if hasattr(self, 'refresh_callback'):
             self.refresh_callback()
     
-    def refresh(self, todos, search_query=""):
-        """Refresh the treeview with filtered and sorted todos."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def refresh(self, todos, search_query="", ordered_indices=None, archived=None,
+                ranking=None):
+        """Refresh the treeview with filtered and sorted todos.
         
+        If ordered_indices is given (e.g. from a storage backend query), it is
+        used as the already filtered and sorted list of positions in todos.
+        Archived tasks, if given, are filtered the same way and listed after
+        the active ones. If ranking ({task ID: score}, from a fuzzy search)
+        is given, only the tasks in it are shown, highest score first.
+        
+        With INCREMENTAL_TREE_UPDATES the new rows are reconciled with the
+        shown ones (see _reconcile()) instead of being rebuilt.
+        """
+        self._ranking = ranking
+        self._query = search_query
         # Filter and sort
-        filtered = self._filter_todos(todos, search_query)
-        sorted_todos = self._sort_todos(filtered)
+        if ordered_indices is not None:
+            sorted_todos = [(i, todos[i]) for i in ordered_indices]
+        else:
+            filtered = self._filter_todos(todos, search_query)
+            sorted_todos = self._sort_todos(filtered)
+        
+        rows = [(todo.id, "", todo) for _, todo in sorted_todos]
+        if archived:
+            for _, todo in self._sort_todos(self._filter_todos(archived, search_query)):
+                rows.append((self.ARCHIVED_PREFIX + todo.id, self.ARCHIVED_PREFIX, todo))
+        
+        if self._expanded:
+            # Forget expanded tasks that no longer exist
+            alive = {todo.id for todo in todos}
+            alive.update(self.ARCHIVED_PREFIX + todo.id for todo in archived or ())
+            self._expanded &= alive
+        
+        self._rows = {todo.id: todo for _, todo in sorted_todos}
+        self._archived = {iid: todo for iid, prefix, todo in rows if prefix}
+        self._order = [iid for iid, _, _ in rows]
+        self._sorted = True
+        self._virtual = 0 < VIRTUAL_LIST_THRESHOLD < len(rows)
+        self._show_rows()
+    
+    def narrow(self, search_query):
+        """Apply a search that extends the current one to the rows shown.
+        
+        A longer query matches a subset of the tasks the shorter one did, in
+        the same order, so only the rows shown are checked. Returns False if
+        that doesn't hold (new query, fuzzy ranking, unsorted rows or a query
+        the search index can't answer); the caller then refreshes the list.
+        """
+        # (a query without words was matched as a substring, not by the index)
+        if (not tokenize(self._query) or not search_query.startswith(self._query)
+                or self._ranking is not None or not self._sorted
+                or self.search_callback is None):
+            return False
+        matches = self.search_callback(search_query)
+        if matches is None:
+            return False
+        self._rows = {i: todo for i, todo in self._rows.items() if i in matches}
+        self._archived = {iid: todo for iid, todo in self._archived.items()
+                          if todo.id in matches}
+        self._order = [iid for iid in self._order
+                       if iid in self._rows or iid in self._archived]
+        self._query = search_query
+        # Few enough rows may be left to show them all, as refresh() would
+        self._virtual = 0 < VIRTUAL_LIST_THRESHOLD < len(self._order)
+        self._show_rows()
+        return True
+    
+    def _show_rows(self):
+        """Bring the tree in line with _order (when virtualized, the rows in view)."""
+        if self._virtual:
+            self._top = max(0, min(self._top, self._max_top()))
+            iids = self._order[self._top:self._top + self._visible_count() + VIRTUAL_LIST_OVERSCAN]
+        else:
+            self._top = 0
+            iids = self._order
+        rows = [(iid, self.ARCHIVED_PREFIX if iid in self._archived else "",
+                 self._rows.get(iid) or self._archived[iid]) for iid in iids]
+        
+        now = now_epoch()
+        if INCREMENTAL_TREE_UPDATES:
+            self._reconcile(rows, now)
+        else:
+            self._rebuild(rows, now)
+        
+        if self._virtual:
+            self.tree.yview_moveto(0)
+            self._update_scrollbar()
+            if self._selected is not None and self.tree.exists(self._selected):
+                if self.tree.selection() != (self._selected,):
+                    self.tree.selection_set(self._selected)
+    
+    def _rebuild(self, rows, now):
+        """Replace every row in the tree."""
+        self.tree.delete(*self.tree.get_children())
+        self._rendered = {}
+        for iid, prefix, todo in rows:
+            self._insert_todo(iid, self._render(todo, prefix, now))
+        self._tk_order = [iid for iid, _, _ in rows]
+    
+    def _reconcile(self, rows, now):
+        """Turn the shown rows into the given ones with as few Tk calls as possible.
+        
+        Rows no longer wanted are deleted and new ones inserted. Of the rows
+        that stay, the longest run already in the right order stays put and
+        the rest are detached and re-attached at their new place. Rows whose
+        rendering changed are updated in place. A single-task change costs a
+        handful of calls however long the list is.
+        """
+        selected = self.tree.selection()
+        new_order = [iid for iid, _, _ in rows]
+        wanted = set(new_order)
+        gone = [iid for iid in self._tk_order if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self._rendered[iid]
+        
+        old_index = {iid: i for i, iid in enumerate(self._tk_order)}
+        staying = [iid for iid in new_order if iid in old_index]
+        in_order = _longest_increasing([old_index[iid] for iid in staying])
+        moving = {iid for i, iid in enumerate(staying) if i not in in_order}
+        if moving:
+            self.tree.detach(*moving)
+        
+        # Rows before position i are final from here on, so i is exact
+        for i, (iid, prefix, todo) in enumerate(rows):
+            rendered = self._render(todo, prefix, now)
+            old = self._rendered.get(iid)
+            if old is None:
+                self._insert_todo(iid, rendered, position=i)
+                continue
+            if iid in moving:
+                self.tree.move(iid, "", i)
+            if rendered != old:
+                self._update_todo(iid, old, rendered)
+        self._tk_order = new_order
+        # Moved and re-inserted rows drop out of the selection
+        keep = [item for item in selected if self.tree.exists(item)]
+        if list(self.tree.selection()) != keep:
+            self.tree.selection_set(keep)
+    
+    def show_todo(self, todo, search_query=""):
+        """Re-render one active task after it was added or changed.
+        
+        Only the task's own rows are touched: they are removed and, if it
+        still matches the filter and search, inserted again at its sorted
+        place. Returns False if that place can't be found (rows appended
+        unsorted during a load, or ranked by a fuzzy search); the caller
+        then refreshes the whole list.
+        """
+        if not self._sorted or self.position_callback is None or self._ranking is not None:
+            return False
+        selected = self.tree.selection()
+        self._remove(todo)
+        if self._filter_todos([todo], search_query):
+            slot = self._find_slot(todo)
+            self._rows[todo.id] = todo
+            self._order.insert(slot, todo.id)
+            if not self._virtual:
+                self._insert_todo(todo.id, self._render(todo, "", now_epoch()), position=slot)
+                self._tk_order.insert(slot, todo.id)
+        if self._virtual:
+            self._show_rows()
+        keep = [item for item in selected if self.tree.exists(item)]
+        if keep:
+            self.tree.selection_set(keep)
+        return True
+    
+    def remove_todo(self, todo):
+        """Remove a deleted active task's rows, if it is shown."""
+        self._expanded.discard(todo.id)
+        if self._remove(todo) and self._virtual:
+            self._show_rows()
+    
+    def _remove(self, todo):
+        """Drop an active task from the view; returns whether it was in it."""
+        if self._rows.pop(todo.id, None) is None:
+            return False
+        self._order.remove(todo.id)
+        if todo.id in self._rendered:
+            self._tk_order.remove(todo.id)
+            del self._rendered[todo.id]
+            self.tree.delete(todo.id)
+        return True
+    
+    def _find_slot(self, todo):
+        """Index among the shown active tasks where a task sorts (binary search)."""
+        key = self._order_key(todo)
+        # Active tasks come first in the display order
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._order_key(self._rows[self._order[mid]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _order_key(self, todo):
+        """Where a task sorts: completed last, then the sort option, then list order."""
+        return (todo.completed, self._sort_key(todo), self.position_callback(todo.id))
+    
+    def append(self, todos, start, search_query=""):
+        """Insert todos[start:] below the existing rows without re-sorting.
+        
+        Used while a large file is still loading; the next refresh() puts
+        everything in sorted order.
+        """
+        added = [todo for _, todo in self._filter_todos(todos, search_query, start)]
+        # Appended rows go below any archived ones until then
+        for todo in added:
+            self._rows[todo.id] = todo
+            self._order.append(todo.id)
+        self._sorted = False
+        if self._virtual or 0 < VIRTUAL_LIST_THRESHOLD < len(self._order):
+            self._virtual = True
+            self._show_rows()
+            return
+        now = now_epoch()
+        for todo in added:
+            self._insert_todo(todo.id, self._render(todo, "", now))
+            self._tk_order.append(todo.id)
+    
+    def _visible_count(self):
+        """How many rows fit in the tree's height."""
+        style = self.tree.cget("style") or "Treeview"
+        try:
+            row_height = int(ttk.Style().lookup(style, "rowheight") or 20)
+        except (TypeError, ValueError):
+            row_height = 20
+        return max(1, self.tree.winfo_height() // row_height)
+    
+    def _line_count(self, iid):
+        """Rows a task takes up: itself and, if expanded, its subtasks."""
+        if iid not in self._expanded:
+            return 1
+        todo = self._rows.get(iid) or self._archived[iid]
+        return 1 + len(todo.sub_todos)
+    
+    def _max_top(self):
+        """Highest first row in view that still fills the view."""
+        visible = self._visible_count()
+        lines = 0
+        top = len(self._order)
+        while top > 0:
+            lines += self._line_count(self._order[top - 1])
+            if lines > visible:
+                break
+            top -= 1
+        return top
+    
+    def _scroll_to(self, top):
+        """Virtualized: show the rows from position top in _order."""
+        top = max(0, min(top, self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._show_rows()
+    
+    def _update_scrollbar(self):
+        """Virtualized: set the scrollbar from the rows in view."""
+        count = len(self._order) or 1
+        end = min(count, self._top + self._visible_count())
+        self.vsb.set(self._top / count, end / count)
+    
+    def _yview(self, *args):
+        """Scrollbar command: scroll the tree, or when virtualized the rows in view."""
+        if not self._virtual:
+            return self.tree.yview(*args)
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._order)))
+        else:
+            step = self._visible_count() if args[2].startswith("page") else 1
+            self._scroll_to(self._top + int(args[1]) * step)
+    
+    def _on_tree_yscroll(self, first, last):
+        """The tree scrolled: update the scrollbar, or when virtualized move the view.
         
-        # Populate tree
-        for idx, todo in sorted_todos:
-            self._insert_todo(idx, todo)
+        When virtualized the tree normally stays at its top, but keyboard
+        navigation into the overscan rows scrolls it; the rows scrolled past
+        are folded into _top so the tree can go back to its top.
+        """
+        if not self._virtual:
+            self.vsb.set(first, last)
+            return
+        first = float(first)
+        if first <= 0:
+            return
+        lines = sum(self._line_count(iid) for iid in self._tk_order)
+        passed = int(first * lines + 0.5)
+        shift = 0
+        for iid in self._tk_order:
+            passed -= self._line_count(iid)
+            if passed < 0:
+                break
+            shift += 1
+        if shift:
+            self.after_idle(self._scroll_to, self._top + shift)
+    
+    def _on_wheel(self, event):
+        """Virtualized: scroll the rows in view with the mouse wheel."""
+        if not self._virtual:
+            return None
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(self._top + (-3 if up else 3))
+        return "break"
     
-    def _filter_todos(self, todos, search_query):
+    def _on_up(self, event):
+        """Virtualized: Up on the first row in the tree scrolls the row above into it."""
+        if not self._virtual or self._top == 0:
+            return None
+        if self.tree.focus() != self._tk_order[0]:
+            return None
+        self._scroll_to(self._top - 1)
+        # Go to the last row of the task scrolled into view
+        iid = self._order[self._top]
+        children = self.tree.get_children(iid) if iid in self._expanded else ()
+        item = children[-1] if children else iid
+        self.tree.focus(item)
+        self.tree.selection_set(item)
+        return "break"
+    
+    def _on_tree_select(self, event):
+        """Pass selection changes on, ignoring those from virtualized scrolling."""
+        sel = self.tree.selection()
+        # Virtualized scrolling removes and restores the selected row
+        if self._virtual and (not sel or sel[0] == self._selected):
+            return
+        self._selected = sel[0] if sel else None
+        self._selected_task = (self.tree.parent(sel[0]) or sel[0]) if sel else None
+        self.on_select()
+    
+    def _filter_todos(self, todos, search_query, start=0):
         """Filter todos based on current filter and search."""
         filtered = []
-        now = datetime.now()
+        now = now_epoch()
+        matches = self._ranking
+        if matches is None and search_query and self.search_callback is not None:
+            matches = self.search_callback(search_query)
         
-        for i, todo in enumerate(todos):
+        for i, todo in enumerate(islice(todos, start, None), start):
             # Search filter
-            if search_query:
-                text_content = todo['title'].lower()
-                desc_lines = todo.get("description_content", [])
-                desc_text = " ".join([x.get('text', '') for x in desc_lines]).lower()
+            if matches is not None:
+                if todo.id not in matches:
+                    continue
+            elif search_query:
+                text_content = todo.title.lower()
+                desc_text = " ".join([x.get('text', '') for x in todo.description_content]).lower()
                 if search_query not in text_content and search_query not in desc_text:
                     continue
             
             # Status filter
-            if self.current_filter == "Active" and todo.get("completed"):
+            if self.current_filter == "Active" and todo.completed:
                 continue
-            if self.current_filter == "Completed" and not todo.get("completed"):
+            if self.current_filter == "Completed" and not todo.completed:
+                continue
+            if self.current_filter == "Overdue" and not todo.is_overdue(now):
                 continue
-            if self.current_filter == "Overdue":
-                is_ov = False
-                if todo.get("due_datetime") and not todo.get("completed"):
-                    try:
-                        if datetime.strptime(todo["due_datetime"], DATETIME_FORMAT) < now:
-                            is_ov = True
-                    except:
-                        pass
-                if not is_ov:
-                    continue
             
             filtered.append((i, todo))
         
         return filtered
     
     def _sort_todos(self, indexed_todos):
-        """Sort todos based on current sort option."""
-        def get_sort_key(item):
-            todo = item[1]
-            if self.current_sort == "Priority":
-                p_map = {"High": 0, "Medium": 1, "Low": 2}
-                return p_map.get(todo.get("priority", "Medium"), 1)
-            elif self.current_sort == "Due Date":
-                return todo.get("due_datetime", "9999-12-31")
-            elif self.current_sort == "Created":
-                return todo.get("created_at", "")
-            return ""
-        
-        sorted_list = sorted(indexed_todos, key=get_sort_key)
+        """Sort todos based on current sort option (or fuzzy search score)."""
+        if self._ranking is not None:
+            return sorted(indexed_todos, key=lambda x: -self._ranking[x[1].id])
+        sorted_list = sorted(indexed_todos, key=lambda x: self._sort_key(x[1]))
         # Put completed at bottom
-        sorted_list.sort(key=lambda x: x[1].get("completed", False))
+        sorted_list.sort(key=lambda x: x[1].completed)
         return sorted_list
     
-    def _insert_todo(self, idx, todo):
-        """Insert a todo item into the tree."""
+    def _sort_key(self, todo):
+        """Sort key of a todo under the current sort option."""
+        if self.current_sort == "Priority":
+            p_map = {"High": 0, "Medium": 1, "Low": 2}
+            return p_map.get(todo.priority, 1)
+        elif self.current_sort == "Due Date":
+            return self.NO_DUE_DATE if todo.due_ts is None else todo.due_ts
+        elif self.current_sort == "Created":
+            return todo.created_ts or 0
+        return ""
+    
+    def _render(self, todo, iid_prefix, now):
+        """Work out a task's rows: (text, values, tags) and its sub-task rows.
+        
+        Sub-task rows are only built for expanded tasks; for a collapsed one
+        the second item is just whether it has sub-tasks, all its row shows.
+        now is now_epoch(), taken once per refresh.
+        """
         # Priority icons
         priority_icons = {
             "High": "🔴",
             "Medium": "🟡",
             "Low": "🟢"
         }
-        priority = todo.get("priority", "Medium")
+        priority = todo.priority
         priority_icon = priority_icons.get(priority, "🟡")
         
         # Status
-        status = "Done" if todo.get("completed") else "Active"
-        is_overdue = False
-        if status == "Active" and todo.get("due_datetime"):
-            try:
-                if datetime.strptime(todo["due_datetime"], DATETIME_FORMAT) < datetime.now():
-                    status = "Overdue"
-                    is_overdue = True
-            except:
-                pass
+        is_overdue = todo.is_overdue(now)
+        status = "Done" if todo.completed else "Overdue" if is_overdue else "Active"
         
         # Progress with visual bar
-        subs = todo.get("sub_todos", [])
+        subs = todo.sub_todos
         progress_text = "0%"
         progress_bar = ""
         if subs:
-            done_subs = sum(1 for s in subs if s.get("completed"))
+            done_subs = sum(1 for s in subs if s.completed)
             pct = int((done_subs / len(subs)) * 100)
             progress_text = f"{pct}%"
             # Create visual progress bar using Unicode blocks
             filled = int(pct / 10)
             progress_bar = "█" * filled + "░" * (10 - filled)
         
-        # Display date
-        d_str = todo.get("due_datetime", "")
-        try:
-            d_disp = datetime.strptime(d_str, DATETIME_FORMAT).strftime("%Y-%m-%d %H:%M")
-        except:
-            d_disp = ""
+        # Display date (stored as "%Y-%m-%d %H:%M", seconds dropped if present)
+        d_disp = todo.due_datetime[:16] if todo.due_ts is not None else ""
         
         # Tags
-        tags = [priority]
-        if todo.get("completed"):
-            tags.append("completed")
-        elif is_overdue:
-            tags.append("overdue")
-        
-        # Insert main task with icon
-        parent_id = str(idx)
-        task_title = f"{priority_icon} {todo['title']}"
-        self.tree.insert(
-            "", END,
-            iid=parent_id,
-            text=task_title,
-            values=(priority, d_disp, progress_bar if progress_bar else progress_text, status),
-            tags=tags
-        )
+        tags = (priority, "completed") if todo.completed else (
+            (priority, "overdue") if is_overdue else (priority,))
         
-        # Insert subtasks
-        for sub_idx, sub in enumerate(subs):
-            sub_id = f"{parent_id}-{sub_idx}"
-            st_tags = ["completed"] if sub.get("completed") else []
-            sub_status = "✓ Done" if sub.get("completed") else "○ Active"
-            self.tree.insert(
-                parent_id, END,
-                iid=sub_id,
-                text=f"  ↳ {sub['title']}",
-                values=("", "", "", sub_status),
-                tags=st_tags
+        # Main task with icon, then its subtasks
+        row = (
+            f"{priority_icon} {todo.title}",
+            (priority, d_disp, progress_bar if progress_bar else progress_text, status),
+            tags
+        )
+        if iid_prefix + todo.id not in self._expanded:
+            return row, bool(subs)
+        sub_rows = tuple(
+            (
+                f"{iid_prefix}{sub.id}",
+                f"  ↳ {sub.title}",
+                ("", "", "", "✓ Done" if sub.completed else "○ Active"),
+                ("completed",) if sub.completed else ()
             )
+            for sub in subs
+        )
+        return row, sub_rows
+    
+    def _insert_todo(self, iid, rendered, position=END):
+        """Insert a rendered task and, if it is expanded, its subtasks into the tree."""
+        (text, values, tags), sub_rows = rendered
+        expanded = bool(sub_rows) and iid in self._expanded
+        self.tree.insert("", position, iid=iid, text=text, values=values, tags=tags,
+                         open=expanded)
+        self._insert_subs(iid, sub_rows, expanded)
+        self._rendered[iid] = rendered
+    
+    def _update_todo(self, iid, old, rendered):
+        """Change a shown task's rows to a new rendering, touching only what differs."""
+        (text, values, tags), sub_rows = rendered
+        if rendered[0] != old[0]:
+            self.tree.item(iid, text=text, values=values, tags=tags)
+        if sub_rows != old[1]:
+            self.tree.delete(*self.tree.get_children(iid))
+            self._insert_subs(iid, sub_rows, iid in self._expanded)
+            if sub_rows and not old[1] and iid in self._expanded:
+                self.tree.item(iid, open=True)
+        self._rendered[iid] = rendered
+    
+    def _insert_subs(self, iid, sub_rows, expanded):
+        """Insert subtask rows under a task, or a placeholder if it is collapsed.
         
-        if subs:
-            self.tree.item(parent_id, open=True)
+        sub_rows is the second item of the task's _render().
+        """
+        if not sub_rows:
+            return
+        if not expanded:
+            self.tree.insert(iid, END, iid=self.PLACEHOLDER_PREFIX + iid)
+            return
+        for sub_iid, text, values, tags in sub_rows:
+            self.tree.insert(iid, END, iid=sub_iid, text=text, values=values, tags=tags)
+    
+    def _on_tree_open(self, event):
+        """Insert a task's subtask rows when it is first expanded."""
+        iid = self.tree.focus()
+        if iid in self._expanded or iid not in self._rendered:
+            return
+        self._expanded.add(iid)
+        self._render_again(iid)
+        if self._virtual:
+            self._show_rows()
+    
+    def _on_tree_close(self, event):
+        """Remember that a task was collapsed (its rows stay until it is next rendered)."""
+        self._expanded.discard(self.tree.focus())
+        if self._virtual:
+            self._show_rows()
+    
+    def expand(self, iid):
+        """Show a task's subtasks, as after adding one to it."""
+        if iid in self._expanded:
+            return
+        self._expanded.add(iid)
+        if iid in self._rendered:
+            self._render_again(iid)
+            if self._rendered[iid][1]:
+                self.tree.item(iid, open=True)
+    
+    def _render_again(self, iid):
+        """Update a shown task's rows after it was expanded (building its subtask rows)."""
+        todo = self._rows.get(iid) or self._archived[iid]
+        prefix = self.ARCHIVED_PREFIX if iid in self._archived else ""
+        self._update_todo(iid, self._rendered[iid], self._render(todo, prefix, now_epoch()))
+    
+    @classmethod
+    def is_archived(cls, iid):
+        """Check if a row id belongs to an archived task."""
+        return iid.startswith(cls.ARCHIVED_PREFIX)
     
     def get_selection(self):
         """Get currently selected item."""
         sel = self.tree.selection()
         if sel:
             return sel[0]
+        # Virtualized: the selected row may be scrolled out of the tree
+        if self._virtual and (self._selected_task in self._rows
+                              or self._selected_task in self._archived):
+            return self._selected
         return None
     
     def update_theme(self, theme_config):
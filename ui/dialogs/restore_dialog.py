@@ -0,0 +1,284 @@
+"""Backup restore dialog."""
+
+import tkinter as tk
+from datetime import datetime
+from itertools import islice
+from tkinter import messagebox
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+
+def format_size(size):
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def parse_time(text):
+    """Parse a restore time typed by the user (None if it isn't one)."""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class RestoreBackupDialog(tk.Toplevel):
+    """Dialog listing backups with their metadata, sortable by any column.
+    
+    A backup can be restored whole, or previewed as a per-task diff against
+    the live list (also for a point in time) and restored selectively.
+    """
+
+    # Column -> (heading, width, backup field sorted on)
+    COLUMNS = {
+        "created": ("Created", 160, "created_at"),
+        "tasks": ("Tasks", 70, "tasks"),
+        "completed": ("Completed", 80, "completed"),
+        "size": ("Size", 80, "size"),
+    }
+
+    def __init__(self, parent, backups, on_restore, on_diff, on_restore_tasks):
+        super().__init__(parent)
+        self.title("Restore Backup")
+        self.geometry("520x440")
+
+        self.backups = backups
+        self.on_restore = on_restore
+        self.on_diff = on_diff
+        self.on_restore_tasks = on_restore_tasks
+        self.sort_column = "created"
+        self.sort_reverse = True
+
+        self._build_ui()
+        self._populate()
+
+        # Make modal
+        self.transient(parent)
+        self.grab_set()
+
+    def _build_ui(self):
+        """Build the UI."""
+        ttk.Label(self, text="Select a backup to restore:", font=("Helvetica", 12, "bold")).pack(pady=10)
+
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill=BOTH, expand=True, padx=10)
+
+        self.tree = ttk.Treeview(list_frame, columns=list(self.COLUMNS), show="headings",
+                                 selectmode="browse")
+        for column, (heading, width, _) in self.COLUMNS.items():
+            self.tree.heading(column, text=heading, command=lambda c=column: self._sort_by(c))
+            self.tree.column(column, width=width, anchor=W if column == "created" else E)
+
+        scrollbar = ttk.Scrollbar(list_frame, orient=VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+        self.tree.bind("<Double-1>", lambda e: self._restore())
+
+        time_frame = ttk.Frame(self)
+        time_frame.pack(fill=X, padx=10, pady=(10, 0))
+
+        ttk.Label(time_frame, text="Or as of (YYYY-MM-DD HH:MM):").pack(side=LEFT, padx=5)
+        self.time_entry = ttk.Entry(time_frame, width=18)
+        self.time_entry.insert(0, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        self.time_entry.pack(side=LEFT, padx=5)
+        ttk.Button(time_frame, text="Preview", command=self._preview_time, bootstyle="info-outline").pack(side=LEFT, padx=5)
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttk.Button(btn_frame, text="Restore", command=self._restore, bootstyle="success").pack(side=RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Preview Changes", command=self._preview, bootstyle="info").pack(side=RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+    def _populate(self):
+        """Fill the list in the current sort order."""
+        field = self.COLUMNS[self.sort_column][2]
+        # Backups come newest first, so ties keep that order
+        rows = sorted(self.backups, key=lambda b: b[field], reverse=self.sort_reverse)
+
+        self.tree.delete(*self.tree.get_children())
+        for backup in rows:
+            self.tree.insert("", END, iid=backup["name"], values=(
+                backup["created_at"],
+                backup["tasks"],
+                backup["completed"],
+                format_size(backup["size"]),
+            ))
+
+        for column, (heading, _, _) in self.COLUMNS.items():
+            arrow = (" ▼" if self.sort_reverse else " ▲") if column == self.sort_column else ""
+            self.tree.heading(column, text=heading + arrow)
+
+    def _sort_by(self, column):
+        """Sort by a column, toggling the direction if it is already the sort column."""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = True  # newest / largest first
+        self._populate()
+
+    def _selected_backup(self):
+        """Get the selected backup's name, telling the user if there is none."""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a backup", parent=self)
+            return None
+        return selection[0]
+
+    def _restore(self):
+        """Restore the selected backup."""
+        name = self._selected_backup()
+        if name and self.on_restore(name):
+            self.destroy()
+
+    def _preview(self):
+        """Show what restoring the selected backup would change."""
+        name = self._selected_backup()
+        if name:
+            self._open_diff(name, f"Changes since {self.tree.set(name, 'created')}")
+
+    def _preview_time(self):
+        """Show what going back to the entered time would change."""
+        when = parse_time(self.time_entry.get())
+        if when is None:
+            messagebox.showwarning("Warning", "Enter a time as YYYY-MM-DD HH:MM", parent=self)
+            return
+        self._open_diff(when, f"Changes since {when.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    def _open_diff(self, point, title):
+        """Open the diff preview of a restore point."""
+        try:
+            changes = self.on_diff(point)
+        except Exception as e:
+            messagebox.showerror("Error", f"Cannot read restore point: {e}", parent=self)
+            return
+
+        def restore_tasks(keys):
+            if self.on_restore_tasks(point, keys):
+                self.destroy()
+                return True
+            return False
+
+        DiffPreviewDialog(self, title, changes, restore_tasks)
+
+
+class DiffPreviewDialog(tk.Toplevel):
+    """Per-task diff between a restore point and the live list.
+    
+    Changes are read from a stream in batches between UI updates, so a
+    diff of a large list fills in while the dialog stays responsive.
+    Selected tasks can be reverted to the restore point.
+    """
+
+    BATCH_SIZE = 200
+    LABELS = {"added": "Added", "removed": "Removed", "modified": "Modified"}
+
+    def __init__(self, parent, title, changes, on_restore_tasks):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("640x480")
+
+        self.changes = changes
+        self.on_restore_tasks = on_restore_tasks
+        self.keys = {}  # row iid -> task key
+        self._job = None
+
+        self._build_ui()
+        self._job = self.after(1, self._load_batch)
+        self.bind("<Destroy>", self._on_destroy)
+
+        # Make modal
+        self.transient(parent)
+        self.grab_set()
+
+    def _build_ui(self):
+        """Build the UI."""
+        self.status = ttk.Label(self, text="Comparing...", font=("Helvetica", 11, "bold"))
+        self.status.pack(pady=10)
+
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill=BOTH, expand=True, padx=10)
+
+        self.tree = ttk.Treeview(list_frame, columns=("change", "details"), selectmode="extended")
+        self.tree.heading("#0", text="Task")
+        self.tree.heading("change", text="Change")
+        self.tree.heading("details", text="Details")
+        self.tree.column("#0", width=250)
+        self.tree.column("change", width=90)
+        self.tree.column("details", width=260)
+
+        scrollbar = ttk.Scrollbar(list_frame, orient=VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+        ttk.Label(self, text="Restoring a task undoes its change: added tasks are removed, "
+                             "removed ones come back, modified ones get their old version.",
+                  wraplength=600).pack(padx=10, pady=(10, 0))
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=X, padx=10, pady=10)
+
+        ttk.Button(btn_frame, text="Restore Selected", command=self._restore_selected, bootstyle="success").pack(side=RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Select All", command=self._select_all, bootstyle="info-outline").pack(side=RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.destroy, bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+    def _load_batch(self):
+        """Add the next batch of changes to the list."""
+        self._job = None
+        try:
+            batch = list(islice(self.changes, self.BATCH_SIZE))
+        except Exception as e:
+            self.status.configure(text=f"Comparison failed: {e}")
+            return
+
+        for change in batch:
+            iid = str(len(self.keys))
+            self.keys[iid] = change["key"]
+            details = ", ".join(change["fields"])
+            if change["sub_todos"]:
+                details = f"{details}; sub-tasks" if details else "sub-tasks"
+            self.tree.insert("", END, iid=iid, text=change["title"],
+                             values=(self.LABELS[change["change"]], details))
+            for n, sub in enumerate(change["sub_todos"]):
+                self.tree.insert(iid, END, iid=f"{iid}-{n}", text=sub["title"],
+                                 values=(self.LABELS[sub["change"]], ""))
+
+        if len(batch) == self.BATCH_SIZE:
+            self.status.configure(text=f"Comparing... {len(self.keys)} changed tasks so far")
+            self._job = self.after(1, self._load_batch)
+        elif self.keys:
+            self.status.configure(text=f"{len(self.keys)} changed tasks")
+        else:
+            self.status.configure(text="No differences")
+
+    def _select_all(self):
+        """Select every changed task."""
+        self.tree.selection_set(list(self.keys))
+
+    def _restore_selected(self):
+        """Revert the selected tasks (a selected sub-task row picks its task)."""
+        if self._job is not None:
+            messagebox.showwarning("Warning", "Wait for the comparison to finish", parent=self)
+            return
+        keys = {self.keys[iid.split("-")[0]] for iid in self.tree.selection()}
+        if not keys:
+            messagebox.showwarning("Warning", "Please select tasks to restore", parent=self)
+            return
+        if not messagebox.askyesno("Confirm", f"Restore {len(keys)} task(s)?", parent=self):
+            return
+        if self.on_restore_tasks(keys):
+            self.destroy()
+
+    def _on_destroy(self, event):
+        """Stop reading changes when the dialog closes."""
+        if event.widget is self and self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
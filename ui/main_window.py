@@ -5,10 +5,19 @@ from tkinter import messagebox, filedialog
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from datetime import datetime
+from itertools import islice
 
-from config.settings import APP_NAME, DEFAULT_WINDOW_SIZE, MIN_WINDOW_SIZE
+from config.settings import (
+    APP_NAME, DEFAULT_WINDOW_SIZE, MIN_WINDOW_SIZE, FIRST_LOAD_CHUNK, LOAD_CHUNK_SIZE,
+    ARCHIVE_ENABLED, SYNC_POLL_MS
+)
 from config.themes import get_theme_config
+from models.task_index import TaskIndex
+from models.todo import TodoItem, SubTodoItem, new_id
 from utils.data_manager import DataManager
+from utils.archive import ArchiveManager
+from utils.autosave import AutoSaver
+from utils.backup_scheduler import BackupScheduler
 from ui.components.dashboard import Dashboard
 from ui.components.input_form import InputForm
 from ui.components.task_list import TaskList
@@ -33,14 +42,18 @@ class MainWindow(ttk.Window):
         
         # Data
         self.todo_list = []
-        self.selected_main_todo_index = None
-        self.selected_sub_todo_index = None
+        self.index = TaskIndex(self.todo_list)
+        self._archive_index = None  # built when an archived task is selected
+        self.selected_todo_id = None
+        self.selected_sub_id = None
+        self._loader = None
         
         # Build UI
         self._build_ui()
         
         # Load data
         self.load_todos()
+        self.after(SYNC_POLL_MS, self._poll_external_changes)
         
         # Setup keyboard shortcuts
         self._setup_keyboard_shortcuts()
@@ -118,13 +131,16 @@ class MainWindow(ttk.Window):
             theme_config=self.theme_config
         )
         self.task_list.refresh_callback = self.refresh_display
+        self.task_list.position_callback = self.index.position
+        self.task_list.search_callback = self._search_ids
         # Connect context menu callbacks
         self.task_list.duplicate_callback = self.duplicate_task
         self.task_list.toggle_complete_callback = self.toggle_task_completion
         self.paned_window.add(self.task_list, weight=35)
         
-        # Start auto-save timer
+        # Start background auto-saver and backups
         self._start_autosave()
+        self.backups = BackupScheduler(self, self._on_backup_done)
         
         # Build menu bar (after all components are created)
         self._build_menu_bar()
@@ -144,6 +160,7 @@ class MainWindow(ttk.Window):
         file_menu.add_separator()
         file_menu.add_command(label="Create Backup", command=self._create_backup)
         file_menu.add_command(label="Restore Backup", command=self._restore_backup)
+        file_menu.add_command(label="Verify Backups", command=self._verify_backups)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_close)
         
@@ -197,17 +214,85 @@ class MainWindow(ttk.Window):
             messagebox.showerror("Error", f"Failed to apply theme: {e}")
     
     def on_search_change(self, query):
-        """Handle search query change."""
-        self.refresh_display()
+        """Handle search query change (once typing pauses, see Dashboard).
+        
+        When the query only grew, the rows already shown are narrowed down
+        instead of filtering and sorting the whole list again. Searching
+        doesn't change the statistics, so they aren't recomputed.
+        """
+        search_query = self.dashboard.get_search_query()
+        if not self.dashboard.is_fuzzy() and self.task_list.narrow(search_query):
+            return
+        self._refresh_list()
     
     def refresh_display(self):
         """Refresh the task list display."""
+        self._refresh_list()
+        self._update_stats()
+    
+    def _refresh_list(self):
+        """Filter, sort and show the task list for the current filter and search."""
         search_query = self.dashboard.get_search_query()
-        self.task_list.refresh(self.todo_list, search_query)
-        self.dashboard.update_stats(self.todo_list)
+        archived = self._archived_for_view(search_query)
+        ranking = None
+        if search_query and self.dashboard.is_fuzzy():
+            ranking = self._rank_matches(search_query)
+        if ranking is not None:
+            # Shown in ranked order, not the storage's sort
+            ordered_indices = None
+        else:
+            matches = self._search_ids(search_query) if search_query else None
+            ordered_indices = DataManager.query_todos(
+                self.task_list.current_filter,
+                self.task_list.current_sort,
+                "" if matches is not None else search_query
+            )
+            if ordered_indices is not None and matches is not None:
+                ordered_indices = [i for i in ordered_indices if self.todo_list[i].id in matches]
+        self.task_list.refresh(
+            self.todo_list, search_query, ordered_indices,
+            archived=archived, ranking=ranking
+        )
+    
+    def _search_ids(self, search_query):
+        """Get the IDs of the tasks (and loaded archived tasks) matching a search.
+        
+        Answered from the search indexes; None if the query has no words.
+        """
+        ids = self.index.search.find(search_query)
+        if ids is not None and self._archive_index is not None:
+            ids |= self._archive_index.search.find(search_query)
+        return ids
+    
+    def _rank_matches(self, search_query):
+        """Get {task ID: score} for a fuzzy search over tasks and loaded archived tasks.
+        
+        None if the query has no words.
+        """
+        ranking = self.index.search.rank(search_query)
+        if ranking is not None and self._archive_index is not None:
+            ranking.update(self._archive_index.search.rank(search_query))
+        return ranking
+    
+    def _archived_for_view(self, search_query):
+        """Get archived tasks if the current view can show them, else None.
+        
+        Archived tasks are all completed, so they are only read for the
+        "Completed" filter or a search across all tasks.
+        """
+        current_filter = self.task_list.current_filter
+        if current_filter == "Completed" or (search_query and current_filter == "All"):
+            archived = ArchiveManager.load_archived()
+            if self._archive_index is None:
+                # Also makes sure their IDs are unique before they become row ids
+                self._archive_index = TaskIndex(archived)
+            return archived
+        return None
     
     def add_new_todo(self):
         """Add a new todo."""
+        if self._is_loading():
+            return
         if self.input_form.editing_sub_todo_mode.get():
             self.save_sub_todo()
             return
@@ -218,11 +303,12 @@ class MainWindow(ttk.Window):
             return
         
         if data:
-            data["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            data["sub_todos"] = []
-            self.todo_list.append(data)
-            self.save_todos()
-            self.refresh_display()
+            todo = TodoItem.from_dict(data)
+            self._stamp_completion(todo)
+            self.todo_list.append(todo)
+            self.index.add(todo)
+            self._save_change("add")
+            self._show_todo(todo)
             self.input_form.clear_form()
     
     def save_sub_todo(self):
@@ -232,33 +318,43 @@ class MainWindow(ttk.Window):
             messagebox.showerror("Validation Error", error)
             return
         
-        if data and self.selected_main_todo_index is not None:
-            parent = self.todo_list[self.selected_main_todo_index]
-            data["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            parent["sub_todos"].append(data)
-            self.save_todos()
-            self.refresh_display()
+        parent = self.index.tasks.get(self.selected_todo_id)
+        if data and parent is not None:
+            sub = SubTodoItem.from_dict(data)
+            parent.sub_todos.append(sub)
+            self.index.add_sub(parent, sub)
+            self._save_change("set", self.index.position(parent.id))
+            self.task_list.expand(parent.id)
+            self._show_todo(parent)
             self.input_form.clear_form()
     
     def update_selected_todo(self):
         """Update the selected todo."""
-        if self.selected_main_todo_index is None:
+        if self.selected_todo_id is None or self._is_loading():
+            return
+        parent = self.index.tasks.get(self.selected_todo_id)
+        if parent is None:
+            # Deleted by another instance since it was selected
+            self.clear_form()
             return
         
-        if self.input_form.editing_sub_todo_mode.get() and self.selected_sub_todo_index is not None:
+        if self.input_form.editing_sub_todo_mode.get() and self.selected_sub_id is not None:
             # Update sub-todo
             data, error = self.input_form.collect_data(is_sub=True)
             if error:
                 messagebox.showerror("Validation Error", error)
                 return
             
-            if data:
-                parent = self.todo_list[self.selected_main_todo_index]
-                old_sub = parent["sub_todos"][self.selected_sub_todo_index]
-                data["created_at"] = old_sub.get("created_at")
-                parent["sub_todos"][self.selected_sub_todo_index] = data
-                self.save_todos()
-                self.refresh_display()
+            _, old_sub = self.index.find(self.selected_sub_id)
+            if data and old_sub is not None:
+                sub = SubTodoItem.from_dict(data)
+                sub.id = old_sub.id
+                sub.created_at = old_sub.created_at
+                sub.extra = old_sub.extra
+                parent.sub_todos[parent.sub_todos.index(old_sub)] = sub
+                self.index.add_sub(parent, sub)
+                self._save_change("set", self.index.position(parent.id))
+                self._show_todo(parent)
                 self.input_form.clear_form()
         else:
             # Update main todo
@@ -268,43 +364,60 @@ class MainWindow(ttk.Window):
                 return
             
             if data:
-                old = self.todo_list[self.selected_main_todo_index]
-                data["created_at"] = old.get("created_at")
-                data["sub_todos"] = old.get("sub_todos", [])
+                old = parent
+                todo = TodoItem.from_dict(data)
+                todo.id = old.id
+                todo.created_at = old.created_at
+                todo.sub_todos = old.sub_todos
+                todo.extra = old.extra
+                self._stamp_completion(todo, old)
                 
-                self.todo_list[self.selected_main_todo_index] = data
-                self.save_todos()
-                self.refresh_display()
+                position = self.index.position(old.id)
+                self.todo_list[position] = todo
+                self.index.replace(old, todo)
+                self._save_change("set", position)
+                self._show_todo(todo)
                 self.input_form.clear_form()
     
     def delete_todo(self):
         """Delete the selected todo."""
         sel = self.task_list.get_selection()
-        if not sel:
+        if not sel or self._is_loading() or self._is_read_only(sel):
+            return
+        todo, sub = self.index.find(sel)
+        if todo is None:
             return
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this item?"):
-            if "-" in sel:
-                main, sub = map(int, sel.split("-"))
-                del self.todo_list[main]["sub_todos"][sub]
+            position = self.index.position(todo.id)
+            if sub is not None:
+                todo.sub_todos.remove(sub)
+                self.index.remove_sub(sub)
+                self._save_change("set", position)
+                self._show_todo(todo)
             else:
-                del self.todo_list[int(sel)]
+                del self.todo_list[position]
+                self.index.remove(todo)
+                self._save_change("delete", position)
+                if todo.id not in self.index.tasks:
+                    # (a merge during the save may have brought it back)
+                    self.task_list.remove_todo(todo)
+                    self._update_stats()
             
-            self.save_todos()
-            self.refresh_display()
             self.clear_form()
     
     def enter_sub_todo_mode(self):
         """Enter sub-todo creation mode."""
         sel = self.task_list.get_selection()
-        if not sel or "-" in sel:
+        if sel and self._is_read_only(sel):
+            return
+        todo, sub = self.index.find(sel) if sel else (None, None)
+        if todo is None or sub is not None:
             messagebox.showwarning("Warning", "Select a Main Task first")
             return
         
-        self.selected_main_todo_index = int(sel)
-        parent_title = self.todo_list[self.selected_main_todo_index]['title']
-        
-        self.input_form.enter_sub_todo_mode(parent_title)
+        self.selected_todo_id = todo.id
+        self.input_form.enter_sub_todo_mode(todo.title)
     
     def on_select_todo(self):
         """Handle todo selection."""
@@ -312,20 +425,26 @@ class MainWindow(ttk.Window):
         if not sel:
             return
         
-        if "-" in sel:
+        if TaskList.is_archived(sel):
+            # Archived tasks are shown but can't be updated
+            self.selected_todo_id = None
+            self.selected_sub_id = None
+            todo, sub = self._archive_index.find(sel[len(TaskList.ARCHIVED_PREFIX):])
+            if todo is not None:
+                self.input_form.load_todo(sub or todo, is_sub=sub is not None)
+            return
+        
+        todo, sub = self.index.find(sel)
+        if todo is None:
+            return
+        self.selected_todo_id = todo.id
+        if sub is not None:
             # Subtask selected
-            main_idx, sub_idx = map(int, sel.split("-"))
-            self.selected_main_todo_index = main_idx
-            self.selected_sub_todo_index = sub_idx
-            
-            todo = self.todo_list[main_idx]["sub_todos"][sub_idx]
-            self.input_form.load_todo(todo, is_sub=True)
+            self.selected_sub_id = sub.id
+            self.input_form.load_todo(sub, is_sub=True)
         else:
             # Main task selected
-            self.selected_main_todo_index = int(sel)
-            self.selected_sub_todo_index = None
-            
-            todo = self.todo_list[int(sel)]
+            self.selected_sub_id = None
             self.input_form.load_todo(todo, is_sub=False)
     
     def duplicate_task(self):
@@ -334,42 +453,50 @@ class MainWindow(ttk.Window):
         if not sel:
             messagebox.showwarning("Warning", "Please select a task to duplicate")
             return
-        
-        if "-" in sel:
-            messagebox.showwarning("Warning", "Cannot duplicate sub-tasks")
+        if self._is_loading() or self._is_read_only(sel):
             return
         
         # Get the task to duplicate
-        idx = int(sel)
-        original = self.todo_list[idx]
+        original, sub = self.index.find(sel)
+        if sub is not None:
+            messagebox.showwarning("Warning", "Cannot duplicate sub-tasks")
+            return
+        if original is None:
+            return
         
         # Create a copy
         import copy
         duplicate = copy.deepcopy(original)
-        duplicate["title"] = f"{duplicate['title']} (Copy)"
-        duplicate["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        duplicate["completed"] = False
+        duplicate.id = new_id()
+        duplicate.title = f"{duplicate.title} (Copy)"
+        duplicate.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        duplicate.completed = False
+        self._stamp_completion(duplicate)
         
         # Reset sub-task completion
-        for sub in duplicate.get("sub_todos", []):
-            sub["completed"] = False
+        for sub in duplicate.sub_todos:
+            sub.id = new_id()
+            sub.completed = False
         
         self.todo_list.append(duplicate)
-        self.save_todos()
-        self.refresh_display()
+        self.index.add(duplicate)
+        self._save_change("add")
+        self._show_todo(duplicate)
         messagebox.showinfo("Success", "Task duplicated successfully!")
     
     def clear_completed_tasks(self):
         """Clear all completed tasks."""
-        completed_count = sum(1 for t in self.todo_list if t.get("completed"))
+        if self._is_loading():
+            return
+        completed_count = sum(1 for t in self.todo_list if t.completed)
         
         if completed_count == 0:
             messagebox.showinfo("Info", "No completed tasks to clear")
             return
         
         if messagebox.askyesno("Confirm", f"Delete {completed_count} completed task(s)?"):
-            self.todo_list = [t for t in self.todo_list if not t.get("completed")]
-            self.save_todos()
+            self._set_todos([t for t in self.todo_list if not t.completed])
+            self._save_change("delete_completed")
             self.refresh_display()
             self.clear_form()
             messagebox.showinfo("Success", f"Cleared {completed_count} completed task(s)!")
@@ -377,39 +504,49 @@ class MainWindow(ttk.Window):
     def toggle_task_completion(self):
         """Toggle completion status of selected task."""
         sel = self.task_list.get_selection()
-        if not sel:
+        if not sel or self._is_loading() or self._is_read_only(sel):
+            return
+        task, sub = self.index.find(sel)
+        if task is None:
             return
         
-        if "-" in sel:
+        if sub is not None:
             # Toggle sub-task
-            main_idx, sub_idx = map(int, sel.split("-"))
-            parent = self.todo_list[main_idx]
-            sub = parent["sub_todos"][sub_idx]
-            sub["completed"] = not sub.get("completed", False)
+            sub.completed = not sub.completed
         else:
             # Toggle main task
-            idx = int(sel)
-            task = self.todo_list[idx]
-            task["completed"] = not task.get("completed", False)
-        
-        self.save_todos()
-        self.refresh_display()
+            task.completed = not task.completed
+            self._stamp_completion(task)
+        self._save_change("set", self.index.position(task.id))
+        self._show_todo(task)
+    
+    def _set_todos(self, todos):
+        """Replace the task list, re-indexing it by ID."""
+        self.todo_list = todos
+        self.index.rebuild(todos)
+    
+    def _show_todo(self, todo):
+        """Show a changed task, touching only its rows where possible."""
+        if self.index.tasks.get(todo.id) is not todo:
+            # Replaced by a merge while saving, which refreshed the list
+            return
+        if self.task_list.show_todo(todo, self.dashboard.get_search_query()):
+            self._update_stats()
+        else:
+            self.refresh_display()
+    
+    def _update_stats(self):
+        """Update the dashboard statistics."""
+        self.dashboard.update_stats(self.todo_list, ArchiveManager.count())
     
     def _start_autosave(self):
-        """Start auto-save timer (saves every 30 seconds)."""
-        def autosave():
-            if self.todo_list:
-                self.save_todos()
-            # Schedule next auto-save
-            self.after(30000, autosave)  # 30 seconds
-        
-        # Start the timer
-        self.after(30000, autosave)
+        """Start the background auto-saver (writes only after changes)."""
+        self.autosaver = AutoSaver(self, lambda: self.todo_list, DataManager.save_records)
     
     def clear_form(self):
         """Clear the input form."""
-        self.selected_main_todo_index = None
-        self.selected_sub_todo_index = None
+        self.selected_todo_id = None
+        self.selected_sub_id = None
         self.input_form.clear_form()
     
     def export_to_csv(self):
@@ -430,64 +567,262 @@ class MainWindow(ttk.Window):
             messagebox.showerror("Error", f"Export failed: {e}")
     
     def save_todos(self):
-        """Save todos to file."""
-        DataManager.save_todos(self.todo_list)
+        """Save pending changes to file."""
+        self.autosaver.save_now()
+    
+    def _save_change(self, op, index=None):
+        """Persist a single change to the todo list.
+        
+        Incremental storage records the change right away; otherwise the
+        auto-saver coalesces it into a background full save. So does a
+        change that could not be recorded, and the changes after it (they
+        would be recorded on top of a stored list that lacks it).
+        """
+        if not DataManager.is_incremental() or self.autosaver.dirty:
+            self.autosaver.mark_dirty()
+            return
+        if DataManager.record_change(self.todo_list, op, index):
+            return
+        if DataManager.has_external_changes():
+            # Another instance saved first; the merge saves our change too
+            self._merge_external_changes()
+            return
+        # Nothing was written (e.g. the disk is full); closing the window saves it too
+        self.autosaver.mark_dirty()
+        messagebox.showerror("Error", f"Failed to save the change: {DataManager.last_error}\n\n"
+                                      "It will be saved again automatically.")
+    
+    def _poll_external_changes(self):
+        """Periodically pick up changes saved by other running instances."""
+        if self._loader is None and DataManager.has_external_changes():
+            self._merge_external_changes()
+        self.after(SYNC_POLL_MS, self._poll_external_changes)
+    
+    def _merge_external_changes(self):
+        """Merge another instance's changes, re-rendering only the changed rows."""
+        self.autosaver.wait_for_writer()
+        try:
+            merged, summary = DataManager.merge_external(self.todo_list)
+        except Exception as e:
+            print(f"Error merging external changes: {e}")
+            return
+        # The selection is by ID, so it survives positions shifting
+        self._set_todos(merged)
+        self.autosaver.mark_saved()
+        
+        if summary["structural"]:
+            self.refresh_display()
+            return
+        
+        search_query = self.dashboard.get_search_query()
+        for idx in summary["updated"]:
+            if not self.task_list.show_todo(merged[idx], search_query):
+                self.refresh_display()
+                return
+        self._update_stats()
     
     def load_todos(self):
-        """Load todos from file."""
-        self.todo_list = DataManager.load_todos()
+        """Load todos from file.
+        
+        Tasks are parsed in chunks scheduled with after(): the first screenful
+        is shown as soon as it is parsed and the rest is filled in while the
+        window stays responsive.
+        """
+        if self._loader is None and DataManager.is_current():
+            # Files unchanged since this list was last loaded or saved
+            self.autosaver.mark_saved()
+            self._archive_old_tasks()
+            self.refresh_display()
+            return
+        
+        self._set_todos([])
+        self.task_list.refresh(self.todo_list)
+        self._loader = DataManager.iter_todos()
+        self._load_next_chunk(self._loader, FIRST_LOAD_CHUNK)
+    
+    def _load_next_chunk(self, loader, count):
+        """Parse and display the next chunk of a load in progress."""
+        if loader is not self._loader:
+            # Superseded by a newer load
+            return
+        
+        start = len(self.todo_list)
+        try:
+            self.todo_list.extend(islice(loader, count))
+            self.index.extend(self.todo_list[start:])
+            if len(self.todo_list) - start == count:
+                self.task_list.append(self.todo_list, start, self.dashboard.get_search_query())
+                self.dashboard.show_loading(len(self.todo_list))
+                self.after(1, lambda: self._load_next_chunk(loader, LOAD_CHUNK_SIZE))
+                return
+            DataManager.finish_loading(self.todo_list)
+        except Exception as e:
+            # Keep what was parsed; the unreadable file has been preserved
+            messagebox.showerror("Error", f"Failed to load tasks: {e}")
+        # Journal replay may have changed, added or removed tasks
+        self.index.rebuild(self.todo_list)
+        
+        self._loader = None
+        self.autosaver.mark_saved()
+        self._archive_old_tasks()
+        self.refresh_display()
+    
+    def _archive_old_tasks(self):
+        """Move old completed tasks to the archive and save the smaller list."""
+        if not ARCHIVE_ENABLED:
+            return
+        # A background save finishing afterwards would bring the tasks back
+        self.autosaver.wait_for_writer()
+        try:
+            remaining, count = ArchiveManager.archive_old_tasks(self.todo_list)
+        except Exception as e:
+            print(f"Archiving failed: {e}")
+            return
+        if count:
+            self._set_todos(remaining)
+            self._archive_index = None
+            self.autosaver.mark_saved()
+    
+    @staticmethod
+    def _stamp_completion(task, old=None):
+        """Record when a task was completed (decides when it gets archived)."""
+        if not task.completed:
+            task.completed_at = None
+        elif old is not None and old.completed and old.completed_at:
+            task.completed_at = old.completed_at
+        else:
+            task.completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _is_read_only(self, sel):
+        """Check if the selection is an archived task, offering to make it active again."""
+        if not TaskList.is_archived(sel):
+            return False
+        if messagebox.askyesno("Archived", "Archived tasks are read-only. "
+                               "Move this task back to the active list to change it?"):
+            self._unarchive(sel)
+        return True
+    
+    def _unarchive(self, sel):
+        """Move an archived task back to the active list."""
+        if self._archive_index is None:
+            return
+        todo, _ = self._archive_index.find(sel[len(TaskList.ARCHIVED_PREFIX):])
+        if todo is None:
+            return
+        # Saved as active before it leaves the archive, so a crash can't lose it
+        self.todo_list.append(todo)
+        self.index.add(todo)
+        self._save_change("add")
+        self.autosaver.save_now()
+        try:
+            ArchiveManager.remove(todo)
+        except Exception as e:
+            print(f"Error removing task from the archive: {e}")
+        self._archive_index = None
         self.refresh_display()
     
+    def _is_loading(self):
+        """Check if tasks are still loading, telling the user to wait."""
+        if self._loader is None:
+            return False
+        messagebox.showinfo("Loading", "Tasks are still loading, please wait a moment.")
+        return True
+    
     def on_close(self):
         """Handle window close."""
         if messagebox.askyesno("Exit", "Save and Quit?"):
-            self.save_todos()
+            if self._loader is None and DataManager.has_external_changes():
+                self._merge_external_changes()
+            self.autosaver.close()
+            self.backups.close()
             self.destroy()
     
     def _create_backup(self):
-        """Create a manual backup."""
-        from utils.backup_manager import BackupManager
-        if BackupManager.create_backup():
-            messagebox.showinfo("Success", "Backup created successfully!")
+        """Create a manual backup (runs in the background)."""
+        self.dashboard.show_status("💾 Backing up...")
+        self.backups.backup_now()
+    
+    def _on_backup_done(self, manual, path, error):
+        """Report the outcome of a background backup."""
+        if error is not None:
+            print(f"Backup failed: {error}")
+            self.dashboard.show_status("⚠ Backup failed")
+            if manual:
+                messagebox.showerror("Error", f"Failed to create backup: {error}")
+        elif path is None:
+            if manual:
+                self.dashboard.show_status("")
+                messagebox.showinfo("Backup", "No changes since the last backup.")
         else:
-            messagebox.showerror("Error", "Failed to create backup")
+            self.dashboard.show_status(f"💾 Backed up at {datetime.now().strftime('%H:%M')}")
+            if manual:
+                messagebox.showinfo("Success", "Backup created successfully!")
+    
+    def _verify_backups(self):
+        """Check every backup for damage (runs in the background)."""
+        self.dashboard.show_status("🔍 Verifying backups...")
+        self.backups.verify_now(self._on_verify_done)
+    
+    def _on_verify_done(self, report, error):
+        """Report the outcome of a backup check."""
+        self.dashboard.show_status("")
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to verify backups: {error}")
+            return
+        corrupt = report["corrupt"]
+        if not corrupt:
+            messagebox.showinfo("Verify Backups", f"All {report['checked']} backups are intact.")
+            return
+        lines = [f"{name}: {problem}" for name, problem in sorted(corrupt.items())[:10]]
+        if len(corrupt) > 10:
+            lines.append(f"...and {len(corrupt) - 10} more")
+        messagebox.showwarning(
+            "Verify Backups",
+            f"{len(corrupt)} of {report['checked']} backups are damaged and can't be restored:\n\n"
+            + "\n".join(lines)
+        )
     
     def _restore_backup(self):
         """Restore from a backup."""
         from utils.backup_manager import BackupManager
+        from ui.dialogs.restore_dialog import RestoreBackupDialog
         
+        if self._is_loading():
+            return
         backups = BackupManager.list_backups()
         if not backups:
             messagebox.showinfo("Info", "No backups available")
             return
         
-        # Create a simple dialog to select backup
-        dialog = tk.Toplevel(self)
-        dialog.title("Restore Backup")
-        dialog.geometry("400x300")
-        
-        ttk.Label(dialog, text="Select a backup to restore:", font=("Helvetica", 12, "bold")).pack(pady=10)
-        
-        listbox = tk.Listbox(dialog, height=10)
-        listbox.pack(fill=BOTH, expand=True, padx=10, pady=10)
-        
-        for name, timestamp in backups:
-            dt = datetime.fromtimestamp(timestamp)
-            display = f"{name} - {dt.strftime('%Y-%m-%d %H:%M:%S')}"
-            listbox.insert(END, display)
-        
-        def restore():
-            selection = listbox.curselection()
-            if selection:
-                backup_name = backups[selection[0]][0]
-                if BackupManager.restore_backup(backup_name):
-                    messagebox.showinfo("Success", "Backup restored! Reloading data...")
-                    self.load_todos()
-                    dialog.destroy()
-                else:
-                    messagebox.showerror("Error", "Failed to restore backup")
+        def restore(backup_name):
+            # Don't let a pending autosave overwrite the restored file
+            self.save_todos()
+            if BackupManager.restore_backup(backup_name):
+                self._archive_index = None  # the archive was restored too
+                messagebox.showinfo("Success", "Backup restored! Reloading data...")
+                self.load_todos()
+                return True
+            messagebox.showerror("Error", "Failed to restore backup (use File → Verify Backups to check it)")
+            return False
+        
+        def restore_tasks(point, keys):
+            self.save_todos()
+            try:
+                restored = BackupManager.restore_tasks(point, keys, self.todo_list)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to restore tasks: {e}")
+                return False
+            self._set_todos(restored)
+            self.autosaver.mark_dirty()
+            self.save_todos()
+            self.clear_form()
+            self.refresh_display()
+            messagebox.showinfo("Success", f"Restored {len(keys)} task(s)!")
+            return True
         
-        ttk.Button(dialog, text="Restore", command=restore, bootstyle="success").pack(pady=10)
+        RestoreBackupDialog(self, backups, restore,
+                            lambda point: BackupManager.diff_restore_point(point, self.todo_list),
+                            restore_tasks)
     
     def _show_shortcuts(self):
         """Show keyboard shortcuts dialog."""
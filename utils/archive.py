@@ -0,0 +1,204 @@
+"""Archive tier for old completed tasks."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional, Union
+from config.settings import ARCHIVE_DIR, ARCHIVE_AFTER_DAYS
+from models.todo import TodoItem
+from utils.atomic_io import atomic_write
+from utils.data_manager import DataManager
+from utils.file_cache import FileCache
+from utils.file_lock import store_lock
+from utils.json_stream import write_todos
+from utils.migrations import SchemaMigrator
+
+
+class ArchiveManager:
+    """Moves old completed tasks out of the active list into monthly shards.
+
+    Archived tasks live in archive/completed_YYYY-MM.json (by month of
+    completion) and are only read when a view needs them, so startup time
+    and memory follow the active list. archive/index.json keeps per-shard
+    task counts for the dashboard.
+
+    Shards are written under store_lock, together with the active list
+    they came from. A task already in its shard (say, brought back by
+    restoring an older backup) is not archived twice. Backups store the
+    archive next to the active list (see BackupManager).
+    """
+
+    INDEX_FILE = ARCHIVE_DIR / "index.json"
+
+    _archived = None  # loaded shards, once something needed them
+    _cache = FileCache()  # the index, reused while index.json is unchanged
+
+    @staticmethod
+    def completed_time(todo: Union[TodoItem, Dict]) -> Optional[datetime]:
+        """When a task (or its record) was completed (falls back to its creation time)."""
+        if isinstance(todo, dict):
+            values = (todo.get("completed_at"), todo.get("created_at"))
+        else:
+            values = (todo.completed_at, todo.created_at)
+        for value in values:
+            if value:
+                try:
+                    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    pass
+        return None
+
+    @classmethod
+    def archive_old_tasks(cls, todos: List[TodoItem]) -> Tuple[List[TodoItem], int]:
+        """Move completed tasks older than ARCHIVE_AFTER_DAYS into the archive.
+
+        Returns the remaining active list and the number of archived tasks;
+        the remaining list is already saved. The shards are written first, so
+        a crash in between can duplicate a task but never lose one. Nothing
+        is archived while another instance's changes are not merged yet.
+        """
+        cutoff = datetime.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+        remaining = []
+        by_shard = {}
+        for todo in todos:
+            done_at = cls.completed_time(todo) if todo.completed else None
+            if done_at is not None and done_at < cutoff:
+                by_shard.setdefault(done_at.strftime("%Y-%m"), []).append(todo)
+            else:
+                remaining.append(todo)
+
+        if not by_shard:
+            return todos, 0
+
+        with store_lock:
+            if DataManager.has_external_changes():
+                return todos, 0
+            ARCHIVE_DIR.mkdir(exist_ok=True)
+            index = dict(cls._index())
+            for month, tasks in by_shard.items():
+                shard = cls._shard_path(month)
+                existing = cls._read_shard(shard)
+                ids = {record.get("id") for record in existing}
+                tasks = [todo for todo in tasks if todo.id not in ids]
+                if not tasks:
+                    continue
+                existing.extend(TodoItem.to_dicts(tasks))
+                atomic_write(shard, lambda f: write_todos(f, existing, header=SchemaMigrator.header()))
+                index[month] = len(existing)
+                if cls._archived is not None:
+                    cls._archived.extend(tasks)
+            cls._write_index(index)
+            if not DataManager.save_todos(remaining):
+                raise OSError("The active list could not be saved")
+
+        return remaining, len(todos) - len(remaining)
+
+    @classmethod
+    def remove(cls, todo: TodoItem):
+        """Take an archived task out of the archive (to make it active again).
+
+        The caller saves it to the active list first, so a crash in between
+        can't lose it.
+        """
+        done_at = cls.completed_time(todo)
+        if done_at is None:
+            return
+        month = done_at.strftime("%Y-%m")
+        with store_lock:
+            shard = cls._shard_path(month)
+            records = [record for record in cls._read_shard(shard) if record.get("id") != todo.id]
+            index = dict(cls._index())
+            if records:
+                atomic_write(shard, lambda f: write_todos(f, records, header=SchemaMigrator.header()))
+                index[month] = len(records)
+            else:
+                try:
+                    shard.unlink()
+                except FileNotFoundError:
+                    pass
+                index.pop(month, None)
+            cls._write_index(index)
+            if cls._archived is not None:
+                cls._archived = [t for t in cls._archived if t.id != todo.id]
+
+    @classmethod
+    def replace_all(cls, records: Iterable[Dict]):
+        """Make the archive hold exactly the given tasks (when restoring a backup)."""
+        by_shard = {}
+        for record in records:
+            done_at = cls.completed_time(record)
+            month = done_at.strftime("%Y-%m") if done_at else datetime.now().strftime("%Y-%m")
+            by_shard.setdefault(month, []).append(record)
+        with store_lock:
+            ARCHIVE_DIR.mkdir(exist_ok=True)
+            for month, shard_records in by_shard.items():
+                atomic_write(cls._shard_path(month), lambda f: write_todos(
+                    f, shard_records, header=SchemaMigrator.header()))
+            for shard in ARCHIVE_DIR.glob("completed_*.json"):
+                if shard.stem[len("completed_"):] not in by_shard:
+                    try:
+                        shard.unlink()
+                    except FileNotFoundError:
+                        pass
+            cls._write_index({month: len(shard_records) for month, shard_records in by_shard.items()})
+            cls._archived = None
+
+    @classmethod
+    def iter_records(cls) -> Iterator[Dict]:
+        """Yield every archived task as a JSON record, a shard at a time."""
+        for shard in sorted(ARCHIVE_DIR.glob("completed_*.json")):
+            yield from cls._read_shard(shard)
+
+    @staticmethod
+    def source_key() -> tuple:
+        """Identity of the archive: its index, which is rewritten with every shard."""
+        return FileCache.stat_key([ArchiveManager.INDEX_FILE])
+
+    @classmethod
+    def load_archived(cls) -> List[TodoItem]:
+        """Get all archived tasks, reading the shards on first use."""
+        if cls._archived is None:
+            archived = []
+            for shard in sorted(ARCHIVE_DIR.glob("completed_*.json")):
+                archived.extend(TodoItem.from_dicts(cls._read_shard(shard)))
+            cls._archived = archived
+        return cls._archived
+
+    @classmethod
+    def count(cls) -> int:
+        """Number of archived tasks, from the index (no shard is read)."""
+        if cls._archived is not None:
+            return len(cls._archived)
+        return sum(cls._index().values())
+
+    @staticmethod
+    def _shard_path(month: str) -> Path:
+        """Path of the shard holding tasks completed in a month (YYYY-MM)."""
+        return ARCHIVE_DIR / f"completed_{month}.json"
+
+    @staticmethod
+    def _read_shard(shard: Path) -> List[Dict]:
+        """Read one shard (missing shards are empty)."""
+        if not shard.exists():
+            return []
+        return SchemaMigrator.load_file(shard)[0]
+
+    @classmethod
+    def _index(cls) -> Dict[str, int]:
+        """The per-shard task counts (not to be mutated); only re-read when the file changed."""
+        return cls._cache.get("index", [cls.INDEX_FILE], cls._read_index, lambda index: index)
+
+    @classmethod
+    def _read_index(cls) -> Dict[str, int]:
+        """Read the per-shard task counts."""
+        try:
+            with open(cls.INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def _write_index(cls, index: Dict[str, int]):
+        """Write the per-shard task counts."""
+        atomic_write(cls.INDEX_FILE, lambda f: json.dump(index, f, indent=2, sort_keys=True))
+        cls._cache.store("index", [cls.INDEX_FILE], index)
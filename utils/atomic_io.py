@@ -0,0 +1,233 @@
+"""Crash-safe file writes."""
+
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, IO
+from config.settings import FSYNC_POLICY, FSYNC_BATCH_WINDOW_MS
+
+
+FSYNC_POLICIES = ("always", "batched", "never")
+
+
+def _fsync_dir(directory: Path):
+    """Persist a rename by syncing its directory (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_file(path: Path):
+    """Flush a closed file's contents to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class GroupCommit:
+    """Lets concurrent writers of whole files share the syncs they can.
+
+    A writer queues its finished temp file and waits. The first waiter
+    becomes the leader: it takes every queued file, fsyncs them, renames
+    them into place and syncs each directory once, then wakes everyone it
+    committed. Writers arriving meanwhile form the next batch. When several
+    saves of the same file are queued only the newest one is synced; other
+    files each still need their own fsync, so only the directory syncs and
+    superseded saves are saved.
+    """
+
+    def __init__(self, window_ms: int = FSYNC_BATCH_WINDOW_MS):
+        self.window = window_ms / 1000
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._seq = 0
+        self._committed_seq = 0
+        self._committing = False
+        self._last_failure = (0, 0, None)
+        self.fsync_count = 0
+
+    def commit(self, tmp_path: Path, target: Path):
+        """Durably move tmp_path over target, batched with other writers."""
+        with self._cond:
+            superseded = self._pending.pop(target, None)
+            if superseded is not None:
+                try:
+                    superseded.unlink()
+                except FileNotFoundError:
+                    pass
+            self._pending[target] = tmp_path
+            self._seq += 1
+            my_seq = self._seq
+
+            while self._committed_seq < my_seq:
+                if self._committing:
+                    self._cond.wait()
+                else:
+                    self._lead_batch()
+
+            first_seq, last_seq, error = self._last_failure
+            if error is not None and first_seq <= my_seq <= last_seq:
+                raise error
+
+    def _lead_batch(self):
+        """Commit everything queued so far (called holding the condition)."""
+        self._committing = True
+        first_seq = self._committed_seq + 1
+        batch_seq = self._committed_seq
+        error = None
+        self._cond.release()
+        try:
+            if self.window:
+                # Give the rest of a burst a moment to join
+                time.sleep(self.window)
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                batch_seq = self._seq
+            try:
+                self._commit_batch(batch)
+            except OSError as e:
+                error = e
+        finally:
+            self._cond.acquire()
+        if error is not None:
+            self._last_failure = (first_seq, batch_seq, error)
+        self._committing = False
+        self._committed_seq = batch_seq
+        self._cond.notify_all()
+
+    def _commit_batch(self, batch: dict):
+        """fsync, rename and sync directories for one batch of files."""
+        for target, tmp_path in batch.items():
+            _fsync_file(tmp_path)
+            self.fsync_count += 1
+        for target, tmp_path in batch.items():
+            os.replace(tmp_path, target)
+        for directory in {target.parent for target in batch}:
+            _fsync_dir(directory)
+            self.fsync_count += 1
+
+
+_group_commit = GroupCommit()
+
+
+class DelayedSync:
+    """Syncs appended-to files in the background, one fsync per file per window.
+
+    An append returns once its data is with the OS; the first append after
+    a sync starts a timer, and when it fires every file appended to since
+    is synced once. A burst of appends therefore shares one fsync, at the
+    cost of up to window_ms of appends a power failure (not a crash of the
+    app) can lose.
+    """
+
+    def __init__(self, window_ms: int = FSYNC_BATCH_WINDOW_MS):
+        self.window = window_ms / 1000
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._timer = None
+        self.fsync_count = 0
+
+    def schedule(self, path: Path):
+        """Sync path with the next batch."""
+        with self._lock:
+            self._dirty.add(Path(path))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Sync every file appended to since the last flush."""
+        with self._lock:
+            paths, self._dirty = self._dirty, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for path in paths:
+            try:
+                _fsync_file(path)
+                self.fsync_count += 1
+            except FileNotFoundError:
+                pass  # replaced by a full write, which was synced itself
+            except OSError as e:
+                print(f"Error syncing {path.name}: {e}")
+
+
+_delayed_sync = DelayedSync()
+atexit.register(_delayed_sync.flush)
+
+
+def append_text(path, text: str, policy: str = None):
+    """Append text to a file, made durable according to policy.
+
+    "always" fsyncs the file (and its directory when the append created
+    it) before returning, "batched" leaves the fsync to DelayedSync so a
+    burst of appends shares one, and "never" leaves flushing to the OS.
+    """
+    path = Path(path)
+    policy = policy or FSYNC_POLICY
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy}")
+
+    created = policy == "always" and not path.exists()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+        if policy == "always":
+            f.flush()
+            os.fsync(f.fileno())
+    if created:
+        _fsync_dir(path.parent)
+    elif policy == "batched":
+        _delayed_sync.schedule(path)
+
+
+def atomic_write(path, write_func: Callable[[IO], None], policy: str = None,
+                 encoding: str = "utf-8"):
+    """Write a file through a temp file and an atomic rename.
+
+    Readers (and a crash at any point) see either the old or the new
+    contents, never a truncated file.
+
+    Args:
+        path: Target file
+        write_func: Called with the open temp file to write the contents
+        policy: "always" (fsync every write), "batched" (group commit) or
+            "never" (rename only); defaults to FSYNC_POLICY
+        encoding: Text encoding, or None to open the file in binary mode
+    """
+    path = Path(path)
+    policy = policy or FSYNC_POLICY
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy}")
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w" if encoding else "wb", encoding=encoding) as f:
+            write_func(f)
+            if policy == "always":
+                f.flush()
+                os.fsync(f.fileno())
+
+        if policy == "batched":
+            _group_commit.commit(tmp_path, path)
+            return
+        os.replace(tmp_path, path)
+        if policy == "always":
+            _fsync_dir(path.parent)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,137 @@
+"""Debounced background autosave."""
+
+import queue
+import threading
+from typing import Callable, List, Dict, Sequence
+from config.settings import AUTOSAVE_DELAY_MS
+from models.todo import TodoItem, RecordView
+
+
+class AutoSaver:
+    """Coalesces todo list saves and writes them on a background thread.
+
+    Every change bumps a version counter. A save is scheduled AUTOSAVE_DELAY_MS
+    after the last change, so a burst of edits produces one write, and it only
+    happens when the version differs from the last saved one. The writer
+    thread never touches Tk; completion is picked up on the Tk thread by
+    polling with after().
+
+    Tasks are converted to records on the writer thread, one at a time as
+    they are written, so a flush costs the Tk thread only a copy of the
+    list. A task edited while it is being written is saved again, as the
+    edit bumped the version.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget, get_todos: Callable[[], List[TodoItem]],
+                 save_func: Callable[[Sequence[Dict]], bool], delay_ms: int = AUTOSAVE_DELAY_MS):
+        self.widget = widget
+        self.get_todos = get_todos
+        self.save_func = save_func
+        self.delay_ms = delay_ms
+
+        self.version = 0
+        self.saved_version = 0
+        self._writing = False
+        self._flush_job = None
+        self._poll_job = None
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="autosave-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        """Check if there are changes that have not been saved yet."""
+        return self.version != self.saved_version
+
+    def mark_dirty(self):
+        """Record a change and (re)start the debounce timer."""
+        self.version += 1
+        if self._flush_job is not None:
+            self.widget.after_cancel(self._flush_job)
+        self._flush_job = self.widget.after(self.delay_ms, self.flush)
+
+    def mark_saved(self):
+        """Record that the current state was saved by other means."""
+        self.saved_version = self.version
+
+    def flush(self):
+        """Hand the current state to the writer thread if it changed."""
+        self._flush_job = None
+        if not self.dirty or self._writing:
+            # A running write reschedules itself when it finishes
+            return
+        self._writing = True
+        self._requests.put((self.version, self.snapshot(self.get_todos())))
+        self._poll_job = self.widget.after(self.POLL_MS, self._poll)
+
+    def save_now(self) -> bool:
+        """Save pending changes synchronously, after any write in progress."""
+        self.wait_for_writer()
+        if not self.dirty:
+            return True
+        ok = self.save_func(self.snapshot(self.get_todos()))
+        if ok:
+            self.mark_saved()
+        return ok
+
+    def close(self):
+        """Stop the writer thread, saving any pending changes first."""
+        if self._flush_job is not None:
+            self.widget.after_cancel(self._flush_job)
+            self._flush_job = None
+        self.wait_for_writer()
+        self._requests.put(None)
+        self._thread.join()
+        self.save_now()
+
+    def wait_for_writer(self):
+        """Block until a write in progress has finished."""
+        if not self._writing:
+            return
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._finish_write(*self._results.get())
+
+    @staticmethod
+    def snapshot(todos: List[TodoItem]) -> Sequence[Dict]:
+        """The todo list as records, converted when read (the list itself may change meanwhile)."""
+        return RecordView(list(todos))
+
+    def _writer(self):
+        """Writer thread: save snapshots until a None request arrives."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            version, todos = request
+            try:
+                ok = self.save_func(todos)
+            except Exception as e:
+                print(f"Autosave failed: {e}")
+                ok = False
+            self._results.put((version, ok))
+
+    def _poll(self):
+        """Pick up finished writes on the Tk thread."""
+        self._poll_job = None
+        try:
+            version, ok = self._results.get_nowait()
+        except queue.Empty:
+            self._poll_job = self.widget.after(self.POLL_MS, self._poll)
+            return
+
+        self._finish_write(version, ok)
+        if self.dirty and self._flush_job is None:
+            # Changes arrived during the write (or it failed); try again
+            self._flush_job = self.widget.after(self.delay_ms, self.flush)
+
+    def _finish_write(self, version: int, ok: bool):
+        """Record the outcome of a background write."""
+        self._writing = False
+        if ok:
+            self.saved_version = max(self.saved_version, version)
@@ -1,73 +1,486 @@
 """Backup management utilities."""
 
+import hashlib
 import json
-import shutil
+import zlib
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from config.settings import TODO_FILE, BASE_DIR
+from threading import Event
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from config.settings import (TODO_FILE, BASE_DIR, BACKUP_RETENTION, BACKUP_VERIFY_WORKERS,
+                             JOURNAL_ENABLED, BACKUP_LOCK_FILE)
+from models.todo import TodoItem, RecordView
+from utils.archive import ArchiveManager
+from utils.atomic_io import atomic_write
+from utils.chunk_store import ChunkStore
+from utils.data_manager import DataManager
+from utils.file_lock import FileLock, store_lock
+from utils.journal import TaskJournal
+from utils.json_stream import write_todos
+from utils.migrations import ID_VERSION, SCHEMA_VERSION, SchemaMigrator
+from utils.storage import JsonStorage, get_storage
+from utils.sync import SyncToken
+from utils.task_diff import diff_tasks, restore_tasks
 
 
 class BackupManager:
-    """Manages backup and restore of todo data."""
+    """Manages backup and restore of todo data.
+    
+    Tasks are cut into groups at content-defined boundaries (after a task
+    whose encoding's CRC ends in GROUP_BITS zero bits), and each group is
+    stored once, compressed, as a chunk named by its hash in backups/chunks.
+    A backup is a small manifest pointing at the tree of chunks that makes
+    up the list (see ChunkStore), so a backup after a one-task edit only
+    writes that task's group and the tree nodes above it. The archived
+    tasks are stored the same way, as a second list. Full-copy backups
+    (todos_backup_*.json) from older versions can still be restored.
+    
+    Old backups are thinned out grandfather-father-son style according to
+    BACKUP_RETENTION.
+    
+    backups/index.json keeps each backup's metadata (time, task and
+    completed counts, size, checksum) so listing backups reads one file.
+    
+    Chunks are named by the SHA-256 of their contents and manifests carry a
+    checksum of their own, so verify_backups() can tell intact backups from
+    damaged ones, and damaged ones are never restored.
+    """
     
     BACKUP_DIR = BASE_DIR / "backups"
-    MAX_BACKUPS = 10
+    INDEX_NAME = "index.json"
+    MANIFEST_FORMAT = 2
+    GROUP_BITS = 6  # about 64 tasks per chunk
+    
+    # Retention tier -> period a backup falls in
+    RETENTION_PERIODS = {
+        "hourly": lambda dt: dt.strftime("%Y-%m-%d %H"),
+        "daily": lambda dt: dt.strftime("%Y-%m-%d"),
+        "weekly": lambda dt: dt.isocalendar()[:2],
+    }
+    
+    chunks = ChunkStore(BACKUP_DIR / "chunks")
+    # Held while backups are written or pruned and chunks collected, so a
+    # chunk another instance still needs is never deleted under it
+    _lock = FileLock(BACKUP_LOCK_FILE)
+    _last_source = None  # identity of the task files at the last auto_backup()
+    _last_archive = None  # (archive identity, root, task count) as last stored
     
     @classmethod
     def create_backup(cls) -> bool:
-        """Create a backup of the current todos file."""
+        """Create a backup of the current todo list."""
         try:
-            # Create backup directory if it doesn't exist
-            cls.BACKUP_DIR.mkdir(exist_ok=True)
-            
-            # Generate backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = cls.BACKUP_DIR / f"todos_backup_{timestamp}.json"
-            
-            # Copy current file to backup
-            if Path(TODO_FILE).exists():
-                shutil.copy2(TODO_FILE, backup_file)
+            with cls._lock:
+                cls._write_backup()
                 
                 # Clean old backups
                 cls._cleanup_old_backups()
-                return True
-            return False
+            return True
         except Exception as e:
             print(f"Backup failed: {e}")
             return False
     
+    @classmethod
+    def _write_backup(cls, todos: Optional[List[Dict]] = None) -> Path:
+        """Store a todo list (the current one and the archive by default) and write its manifest."""
+        cls.BACKUP_DIR.mkdir(exist_ok=True)
+        stats = {}
+        if todos is None:
+            root = cls._put_current(stats)
+        else:
+            # Store each group of tasks (unchanged groups are already there) and the list
+            root = cls.chunks.put_list(cls._put_groups(todos, stats))
+        return cls._write_manifest(root, stats)
+    
+    @classmethod
+    def _put_current(cls, stats: Dict) -> str:
+        """Store the saved active list and archive; returns the active list's root.
+        
+        Both are read under store_lock, so a task being archived is caught
+        in one of them. The archive's root and task count go into stats
+        ("archive", "archived"); it is only stored again once it changed.
+        """
+        with store_lock:
+            todos = DataManager.read_records()
+            source = ArchiveManager.source_key()
+            last = cls._last_archive
+            if last is None or last[0] != source or not cls.chunks.path(last[1]).exists():
+                archive_stats = {}
+                archive = cls.chunks.put_list(cls._put_groups(ArchiveManager.iter_records(),
+                                                              archive_stats))
+                cls._last_archive = (source, archive, archive_stats["tasks"])
+        stats.update(archive=cls._last_archive[1], archived=cls._last_archive[2])
+        return cls.chunks.put_list(cls._put_groups(todos, stats))
+    
+    @classmethod
+    def _write_manifest(cls, root: str, stats: Dict[str, int]) -> Path:
+        """Write the manifest of a stored list (and archive) and add it to the index."""
+        manifest = {
+            "format": cls.MANIFEST_FORMAT,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "schema_version": SCHEMA_VERSION,
+            "tasks": stats["tasks"],
+            "completed": stats["completed"],
+            "size": stats["size"],
+            "root": root,
+        }
+        if "archive" in stats:
+            manifest.update(archive=stats["archive"], archived=stats["archived"])
+        manifest["checksum"] = cls._manifest_checksum(manifest)
+        path = cls._new_manifest_path()
+        atomic_write(path, lambda f: json.dump(manifest, f, indent=2))
+        cls.backup_index()
+        return path
+    
+    @classmethod
+    def _put_groups(cls, todos: Iterable[Dict], stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """Store tasks as chunks of newline-separated JSON; yields chunk digests.
+        
+        If given, stats is filled with the task and completed counts and the
+        encoded size in bytes.
+        """
+        mask = (1 << cls.GROUP_BITS) - 1
+        stats = {} if stats is None else stats
+        stats.update(tasks=0, completed=0, size=0)
+        group = []
+        for todo in todos:
+            line = json.dumps(todo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            stats["tasks"] += 1
+            stats["completed"] += 1 if todo.get("completed") else 0
+            stats["size"] += len(line) + 1
+            group.append(line)
+            if zlib.crc32(line) & mask == 0:
+                yield cls.chunks.put(b"\n".join(group))
+                group = []
+        if group:
+            yield cls.chunks.put(b"\n".join(group))
+    
+    @classmethod
+    def _new_manifest_path(cls) -> Path:
+        """Path for a new manifest, unique even for several backups per second."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = cls.BACKUP_DIR / f"todos_backup_{timestamp}.manifest"
+        n = 1
+        while path.exists():
+            n += 1
+            path = cls.BACKUP_DIR / f"todos_backup_{timestamp}_{n}.manifest"
+        return path
+    
+    @classmethod
+    def _backup_files(cls) -> List[Path]:
+        """All restore points (manifests and old full copies), newest first."""
+        files = [p for p in cls.BACKUP_DIR.glob("todos_backup_*")
+                 if p.suffix in (".manifest", ".json")]
+        return sorted(files, key=cls._backup_order, reverse=True)
+    
+    @staticmethod
+    def _backup_order(path: Path) -> Tuple[str, int]:
+        """Sort key of a backup file: its timestamp, then its number within that second."""
+        stamp = path.stem[len("todos_backup_"):]
+        date, _, rest = stamp.partition("_")
+        time, _, n = rest.partition("_")
+        return f"{date}_{time}", int(n) if n.isdigit() else 1
+    
+    @classmethod
+    def _read_manifest(cls, path: Path) -> Dict:
+        """Read a backup manifest, checking its checksum if it has one."""
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") not in (1, cls.MANIFEST_FORMAT):
+            raise ValueError(f"Unsupported backup format in {path.name}")
+        if "checksum" in manifest and manifest["checksum"] != cls._manifest_checksum(manifest):
+            raise ValueError(f"Manifest {path.name} does not match its checksum")
+        return manifest
+    
+    @staticmethod
+    def _manifest_checksum(manifest: Dict) -> str:
+        """SHA-256 of a manifest's fields (other than the checksum itself)."""
+        fields = {key: value for key, value in manifest.items() if key != "checksum"}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def backup_time(path: Path) -> datetime:
+        """When a backup was taken, from its name (falls back to the file time)."""
+        try:
+            return datetime.strptime(path.stem[len("todos_backup_"):][:15], "%Y%m%d_%H%M%S")
+        except ValueError:
+            return datetime.fromtimestamp(path.stat().st_mtime)
+    
+    @classmethod
+    def _retained(cls, files: List[Path], retention: Optional[Dict[str, int]] = None) -> Set[Path]:
+        """Pick the backups to keep from a newest-first list.
+        
+        The "last" N backups are kept, and for each other tier the newest
+        backup of each of the last N periods (hours, days, weeks) that have
+        backups. The newest backup is always kept.
+        """
+        retention = BACKUP_RETENTION if retention is None else retention
+        kept = set(files[:max(1, retention.get("last", 0))])
+        times = {path: cls.backup_time(path) for path in files}
+        for tier, count in retention.items():
+            if tier == "last":
+                continue
+            period_of = cls.RETENTION_PERIODS[tier]
+            periods = set()
+            for path in files:
+                period = period_of(times[path])
+                if period in periods:
+                    continue
+                if len(periods) >= count:
+                    break
+                periods.add(period)
+                kept.add(path)
+        return kept
+    
     @classmethod
     def _cleanup_old_backups(cls):
-        """Keep only the most recent MAX_BACKUPS backups."""
+        """Thin out old backups by BACKUP_RETENTION and drop unused chunks."""
         try:
-            backups = sorted(cls.BACKUP_DIR.glob("todos_backup_*.json"), reverse=True)
-            for old_backup in backups[cls.MAX_BACKUPS:]:
-                old_backup.unlink()
+            with cls._lock:
+                removed = 0
+                files = cls._backup_files()
+                kept = cls._retained(files)
+                for old_backup in files:
+                    if old_backup not in kept:
+                        old_backup.unlink()
+                        removed += 1
+                if removed:
+                    index = cls.backup_index()
+                    roots = [root for name, entry in index.items() if name.endswith(".manifest")
+                             for root in cls._entry_roots(entry)]
+                    cls.chunks.gc(cls.chunks.reachable(roots))
         except Exception as e:
             print(f"Cleanup failed: {e}")
     
     @classmethod
-    def list_backups(cls):
-        """List all available backups."""
+    def list_backups(cls) -> List[Dict]:
+        """List all available backups, newest first.
+        
+        Each backup is a dict with its file "name", "created_at", "tasks",
+        "completed", "size" (bytes of task data) and "checksum".
+        """
         try:
-            cls.BACKUP_DIR.mkdir(exist_ok=True)
-            backups = sorted(cls.BACKUP_DIR.glob("todos_backup_*.json"), reverse=True)
-            return [(b.name, b.stat().st_mtime) for b in backups]
+            index = cls.backup_index()
+            return [dict(entry, name=name)
+                    for name, entry in sorted(index.items(),
+                                              key=lambda item: cls._backup_order(Path(item[0])),
+                                              reverse=True)]
         except Exception as e:
             print(f"List backups failed: {e}")
             return []
     
+    @classmethod
+    def backup_index(cls) -> Dict[str, Dict]:
+        """Get the metadata of every backup by file name, from the index.
+        
+        The index is checked against the directory listing (names only; no
+        backup is opened or stat'ed), so backups added or removed by another
+        instance or by hand are picked up, and only those are read.
+        """
+        with cls._lock:
+            cls.BACKUP_DIR.mkdir(exist_ok=True)
+            index = cls._read_index()
+            names = {path.name for path in cls._backup_files()}
+            changed = False
+            for name in names - index.keys():
+                try:
+                    index[name] = cls._index_entry(cls.BACKUP_DIR / name)
+                    changed = True
+                except (OSError, ValueError) as e:
+                    print(f"Skipping unreadable backup {name}: {e}")
+            for name in index.keys() - names:
+                del index[name]
+                changed = True
+            if changed:
+                atomic_write(cls.BACKUP_DIR / cls.INDEX_NAME, lambda f: json.dump(
+                    {"format": 1, "backups": index}, f, separators=(",", ":")), policy="never")
+            return index
+    
+    @classmethod
+    def _read_index(cls) -> Dict[str, Dict]:
+        """Read the index file (empty if it is missing or damaged; it gets rebuilt)."""
+        try:
+            with open(cls.BACKUP_DIR / cls.INDEX_NAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == 1 and isinstance(data.get("backups"), dict):
+                return data["backups"]
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    @classmethod
+    def _index_entry(cls, path: Path) -> Dict:
+        """Work out the index metadata of one backup file."""
+        if path.suffix == ".manifest":
+            manifest = cls._read_manifest(path)
+            if "completed" not in manifest or "size" not in manifest:
+                # Written before manifests carried these; count them once
+                stats = {"tasks": 0, "completed": 0, "size": 0}
+                for digest in cls.chunks.iter_list(manifest["root"]):
+                    for line in cls.chunks.get(digest).split(b"\n"):
+                        stats["tasks"] += 1
+                        stats["completed"] += 1 if json.loads(line).get("completed") else 0
+                        stats["size"] += len(line) + 1
+                manifest.update(stats)
+            entry = {
+                "created_at": manifest["created_at"],
+                "tasks": manifest["tasks"],
+                "completed": manifest["completed"],
+                "size": manifest["size"],
+                "checksum": manifest["root"],
+            }
+            if "archive" in manifest:
+                entry.update(archive=manifest["archive"], archived=manifest["archived"])
+            return entry
+        
+        # Full copy from an older version
+        data = path.read_bytes()
+        todos = SchemaMigrator.split(json.loads(data))[1]
+        return {
+            "created_at": cls.backup_time(path).strftime("%Y-%m-%d %H:%M:%S"),
+            "tasks": len(todos),
+            "completed": sum(1 for todo in todos if todo.get("completed")),
+            "size": len(data),
+            "checksum": hashlib.sha256(data).hexdigest(),
+        }
+    
+    @classmethod
+    def iter_backup_tasks(cls, backup_name: str, new_ids: bool = True) -> Iterator[Dict]:
+        """Yield the tasks of a backup one at a time, upgraded to the current format.
+        
+        Tasks from before IDs get fresh ones, or none with new_ids=False:
+        a diff then matches them to live tasks by creation time.
+        """
+        path = cls.BACKUP_DIR / backup_name
+        if path.suffix != ".manifest":
+            todos, version = SchemaMigrator.load_file(path)
+            for todo in todos:
+                yield todo if new_ids or version >= ID_VERSION else cls._without_ids(todo)
+            return
+        manifest = cls._read_manifest(path)
+        version = manifest["schema_version"]
+        SchemaMigrator.check_version(version)
+        strip_ids = not new_ids and version < ID_VERSION
+        for todo in cls._iter_list_tasks(manifest["root"], version):
+            yield cls._without_ids(todo) if strip_ids else todo
+    
+    @classmethod
+    def iter_backup_archive(cls, backup_name: str) -> Optional[Iterator[Dict]]:
+        """The archived tasks stored with a backup, or None if it was taken without them."""
+        path = cls.BACKUP_DIR / backup_name
+        if path.suffix != ".manifest":
+            return None
+        manifest = cls._read_manifest(path)
+        if "archive" not in manifest:
+            return None
+        SchemaMigrator.check_version(manifest["schema_version"])
+        return cls._iter_list_tasks(manifest["archive"], manifest["schema_version"])
+    
+    @classmethod
+    def _iter_list_tasks(cls, root: str, version: int) -> Iterator[Dict]:
+        """Yield the tasks of a stored list, upgraded from version."""
+        for digest in cls.chunks.iter_list(root):
+            # Format 1 stored one task per chunk; later formats a group per line
+            for line in cls.chunks.get(digest, verify=True).split(b"\n"):
+                yield SchemaMigrator.migrate_record(json.loads(line), version)
+    
+    @staticmethod
+    def _entry_roots(entry: Dict) -> List[str]:
+        """Root digests of the lists a backup's index entry refers to."""
+        return [entry["checksum"]] + ([entry["archive"]] if "archive" in entry else [])
+    
+    @staticmethod
+    def _without_ids(todo: Dict) -> Dict:
+        """Drop the IDs a migration just invented for a task and its sub-tasks."""
+        todo.pop("id", None)
+        for sub in todo["sub_todos"]:
+            sub.pop("id", None)
+        return todo
+    
+    @classmethod
+    def iter_restore_point(cls, point: Union[str, datetime]) -> Iterator[Dict]:
+        """Yield the tasks of a backup (by name) or as they were at a time.
+        
+        A time the change journal reaches back to is rebuilt exactly from
+        the journal; otherwise the newest backup taken by then is used. Tasks
+        from before IDs have none, so every read gives them the same keys.
+        """
+        if not isinstance(point, datetime):
+            return cls.iter_backup_tasks(point, new_ids=False)
+        when = point.strftime("%Y-%m-%d %H:%M:%S")
+        if get_storage() is JsonStorage and JOURNAL_ENABLED:
+            earliest = TaskJournal.earliest_time()
+            if earliest is not None and earliest <= when:
+                return iter(JsonStorage.load_at(when))
+        backups = [b for b in cls.list_backups() if b["created_at"] <= when]
+        if not backups:
+            raise ValueError(f"No backup or journal reaches back to {when}")
+        return cls.iter_backup_tasks(max(backups, key=lambda b: b["created_at"])["name"],
+                                     new_ids=False)
+    
+    @classmethod
+    def diff_restore_point(cls, point: Union[str, datetime], todos: List[TodoItem]) -> Iterator[Dict]:
+        """Stream how the live list differs from a restore point (see diff_tasks()).
+        
+        Tasks archived since then are not gone, so they don't show as removed.
+        """
+        return diff_tasks(RecordView(todos), cls.iter_restore_point(point),
+                          present=ArchiveManager.iter_records())
+    
+    @classmethod
+    def restore_tasks(cls, point: Union[str, datetime], keys: Collection[tuple],
+                      todos: List[TodoItem]) -> List[TodoItem]:
+        """Revert the chosen tasks of the live list to a restore point.
+        
+        The stored list is backed up first. Returns the new list for the
+        caller to save; raises on failure.
+        """
+        with cls._lock:
+            cls._write_backup()
+        restored = restore_tasks(RecordView(todos), cls.iter_restore_point(point), keys,
+                                 present=ArchiveManager.iter_records())
+        cls._cleanup_old_backups()
+        return TodoItem.from_dicts(restored)
+    
     @classmethod
     def restore_backup(cls, backup_name: str) -> bool:
         """Restore from a specific backup."""
         try:
             backup_file = cls.BACKUP_DIR / backup_name
             if backup_file.exists():
-                # Create a backup of current state before restoring
-                cls.create_backup()
+                problems = cls.verify_backups([backup_name])["corrupt"]
+                if problems:
+                    print(f"Not restoring damaged backup {backup_name}: {problems[backup_name]}")
+                    return False
                 
-                # Restore the backup
-                shutil.copy2(backup_file, TODO_FILE)
+                # Create a backup of current state before restoring (pruning
+                # waits until afterwards so it can't remove this backup)
+                with cls._lock:
+                    cls._write_backup()
+                
+                # Restore the backup: the archive first, so a crash in between
+                # can duplicate a task but not lose one
+                storage = get_storage()
+                tasks = cls.iter_backup_tasks(backup_name)
+                archived = cls.iter_backup_archive(backup_name)
+                with store_lock:
+                    if archived is None:
+                        # Taken without the archive: tasks archived since stay there
+                        ids = {record.get("id") for record in ArchiveManager.iter_records()}
+                        tasks = (task for task in tasks if task.get("id") not in ids)
+                    else:
+                        ArchiveManager.replace_all(archived)
+                    if storage is JsonStorage:
+                        # Stream the tasks from their chunks straight into the file;
+                        # its header marks the pending journal records as replaced
+                        with TaskJournal.lock:
+                            header = TaskJournal.snapshot_header()
+                            atomic_write(TODO_FILE, lambda f: write_todos(f, tasks, header=header))
+                            TaskJournal.reset()
+                            SyncToken.bump(epoch=True)
+                    else:
+                        storage.save(list(tasks))
+                cls._cleanup_old_backups()
                 return True
             return False
         except Exception as e:
@@ -75,6 +488,117 @@ class BackupManager:
             return False
     
     @classmethod
-    def auto_backup(cls):
-        """Create automatic backup (called periodically)."""
-        return cls.create_backup()
+    def verify_backups(cls, names: Optional[List[str]] = None,
+                       workers: int = BACKUP_VERIFY_WORKERS,
+                       cancel: Optional[Event] = None) -> Dict:
+        """Check backups (all by default) against the checksums taken when written.
+        
+        Manifests and old full copies are checked, then every chunk they
+        use is read and re-hashed, each shared chunk once. The work is
+        spread over a thread pool (reading, decompressing and hashing
+        release the GIL), so a large backup directory is checked at disk
+        speed rather than one core's.
+        
+        The backup lock is only held to read the index and to confirm the
+        problems found, so backups, restores and other instances aren't
+        kept waiting; a backup pruned meanwhile is left out of the report.
+        Setting cancel stops the check early with CancelledError.
+        
+        Returns "checked" (number of backups) and "corrupt": a description
+        of the first problem found, by name, for each damaged, truncated
+        or incomplete backup.
+        """
+        with cls._lock:
+            index = cls.backup_index()
+            if names is None:
+                names = [path.name for path in cls._backup_files()]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            corrupt = {}
+            roots = {}
+            results = pool.map(lambda name: cls._verify_file(name, index.get(name), cancel), names)
+            for name, result in zip(names, results):
+                if isinstance(result, Exception):
+                    corrupt[name] = str(result)
+                elif result:
+                    roots[name] = result
+            
+            problems, damaged = cls.chunks.verify(
+                {root for name_roots in roots.values() for root in name_roots}, pool, cancel)
+            for name, name_roots in roots.items():
+                problem = next((problems[root] for root in name_roots if root in problems), None)
+                if problem is not None:
+                    corrupt[name] = problem
+        
+        checked = len(names)
+        if corrupt or damaged:
+            with cls._lock:
+                cls.chunks.quarantine(damaged)
+                for name in [name for name in corrupt if not (cls.BACKUP_DIR / name).exists()]:
+                    del corrupt[name]
+                    checked -= 1
+        return {"checked": checked, "corrupt": corrupt}
+    
+    @classmethod
+    def _verify_file(cls, name: str, entry: Optional[Dict], cancel: Optional[Event] = None):
+        """Check one backup file against its index entry.
+        
+        Returns the root digests a manifest refers to (None for a full
+        copy), or the exception describing what is wrong.
+        """
+        if cancel is not None and cancel.is_set():
+            raise CancelledError()
+        path = cls.BACKUP_DIR / name
+        try:
+            if path.suffix == ".manifest":
+                manifest = cls._read_manifest(path)
+                roots = [manifest["root"]] + ([manifest["archive"]] if "archive" in manifest else [])
+                if entry is not None and cls._entry_roots(entry) != roots:
+                    raise ValueError(f"Manifest {name} changed since it was written")
+                return roots
+            data = path.read_bytes()
+            if entry is not None and hashlib.sha256(data).hexdigest() != entry["checksum"]:
+                raise ValueError(f"Backup {name} does not match its checksum")
+            SchemaMigrator.split(json.loads(data))
+            return None
+        except FileNotFoundError:
+            return ValueError(f"Backup {name} is missing")
+        except Exception as e:
+            return e
+    
+    @classmethod
+    def auto_backup(cls) -> Optional[Path]:
+        """Create automatic backup (called periodically) unless nothing changed.
+        
+        The task files are not even read while their identity (and the
+        archive's) is unchanged, and no manifest is written when the content
+        hashes (the root digests of the list and archive) match the newest
+        backup. The tasks come from a locked load, so a save in progress is
+        never captured half-written.
+        
+        Returns the new manifest, or None if the backup was skipped. Raises
+        on failure.
+        """
+        with cls._lock:
+            active = DataManager.source_key()
+            source = None if active is None else (active, ArchiveManager.source_key())
+            if source is not None and source == cls._last_source:
+                return None
+            
+            cls.BACKUP_DIR.mkdir(exist_ok=True)
+            stats = {}
+            root = cls._put_current(stats)
+            path = None
+            if cls._entry_roots({"checksum": root, **stats}) != cls._latest_roots():
+                path = cls._write_manifest(root, stats)
+                cls._cleanup_old_backups()
+            cls._last_source = source
+            return path
+    
+    @classmethod
+    def _latest_roots(cls) -> Optional[List[str]]:
+        """Root digests of the newest backup (None if it isn't a manifest)."""
+        files = cls._backup_files()
+        if not files or files[0].suffix != ".manifest":
+            return None
+        entry = cls.backup_index().get(files[0].name)
+        return cls._entry_roots(entry) if entry else None
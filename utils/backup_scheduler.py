@@ -0,0 +1,92 @@
+"""Scheduled background backups."""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from config.settings import BACKUP_INTERVAL_MS
+from utils.backup_manager import BackupManager
+
+
+class BackupScheduler:
+    """Takes backups on a worker thread every BACKUP_INTERVAL_MS.
+
+    Backups are skipped while the task list is unchanged (see
+    BackupManager.auto_backup()). Like AutoSaver, the worker never touches
+    Tk: outcomes are queued and handed to on_done on the Tk thread by
+    polling with after(), as on_done(manual, path, error) where path is the
+    new manifest (None if skipped) and error the exception of a failure.
+    Backup verification runs on the same thread, and close() cancels one
+    in progress rather than waiting for it.
+    """
+
+    POLL_MS = 250
+
+    def __init__(self, widget, on_done: Callable[[bool, Optional[Path], Optional[Exception]], None],
+                 interval_ms: int = BACKUP_INTERVAL_MS):
+        self.widget = widget
+        self.on_done = on_done
+        self.interval = interval_ms / 1000
+        self._closed = False
+        self._cancel = threading.Event()
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="backup-scheduler", daemon=True)
+        self._thread.start()
+        self._poll_job = self.widget.after(self.POLL_MS, self._poll)
+
+    def backup_now(self):
+        """Request a backup right away (e.g. from the menu)."""
+        self._requests.put(True)
+
+    def verify_now(self, on_verified: Callable[[Optional[Dict], Optional[Exception]], None]):
+        """Request a check of every backup.
+
+        on_verified(report, error) gets the outcome; see
+        BackupManager.verify_backups() for the report.
+        """
+        self._requests.put(on_verified)
+
+    def close(self):
+        """Stop the worker after a backup in progress has finished (a check is cancelled)."""
+        self._closed = True
+        self._cancel.set()
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._requests.put(None)
+        self._thread.join()
+
+    def _worker(self):
+        """Worker thread: back up on every request or interval tick, and verify on request."""
+        while True:
+            try:
+                request = self._requests.get(timeout=self.interval)
+            except queue.Empty:
+                request = False
+            if request is None:
+                return
+            if callable(request):
+                # A verification, reported to the callback that was passed
+                try:
+                    self._results.put((request, (BackupManager.verify_backups(cancel=self._cancel), None)))
+                except Exception as e:
+                    self._results.put((request, (None, e)))
+                continue
+            try:
+                self._results.put((self.on_done, (request, BackupManager.auto_backup(), None)))
+            except Exception as e:
+                self._results.put((self.on_done, (request, None, e)))
+
+    def _poll(self):
+        """Hand finished backups and checks to their callbacks on the Tk thread."""
+        self._poll_job = None
+        while True:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        if not self._closed:
+            self._poll_job = self.widget.after(self.POLL_MS, self._poll)
@@ -0,0 +1,239 @@
+"""Content-addressed chunk storage for backups."""
+
+import gzip
+import hashlib
+import lzma
+import zlib
+from concurrent.futures import CancelledError, Executor
+from functools import partial
+from pathlib import Path
+from threading import Event
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from config.settings import BACKUP_COMPRESSION
+from utils.atomic_io import atomic_write
+
+
+# Codec name -> (tag byte stored in front of the chunk, compress, decompress)
+CODECS = {
+    "none": (b"N", bytes, bytes),
+    "zlib": (b"Z", zlib.compress, zlib.decompress),
+    "gzip": (b"G", lambda data: gzip.compress(data, mtime=0), gzip.decompress),
+    "lzma": (b"X", lzma.compress, lzma.decompress),
+}
+_DECOMPRESS = {tag: decompress for tag, _, decompress in CODECS.values()}
+
+
+class ChunkStore:
+    """Stores blobs under their SHA-256 digest, each distinct blob once.
+
+    Chunks live in <root>/<first two hex digits>/<digest>. Lists of digests
+    are stored as trees of node chunks whose boundaries depend on content (a
+    node ends after a child whose digest ends in NODE_BITS zero bits), so
+    inserting or deleting one item only changes the nodes above it and a
+    new backup of a barely changed list writes a few small chunks.
+
+    Chunks are compressed with the store's codec and start with a tag byte
+    naming it; digests are taken before compression, so switching codecs
+    keeps deduplicating against existing chunks.
+
+    put() trusts a chunk file that exists and gc() deletes unused ones, so
+    writing a list and its manifest must not overlap a gc() in any
+    instance; callers hold a lock around both (see BackupManager).
+    """
+
+    NODE_BITS = 6  # about 64 children per tree node
+    NODE_PREFIX = b"tree "
+
+    def __init__(self, root: Path, codec: str = BACKUP_COMPRESSION):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown backup compression: {codec}")
+        self.root = Path(root)
+        self.codec = codec
+
+    def path(self, digest: str) -> Path:
+        """Where the chunk with a digest is stored."""
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """Store a chunk (unless an identical one exists) and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tag, compress, _ = CODECS[self.codec]
+            stored = tag + compress(data)
+            # The manifest pointing at the chunk is what gets fsynced
+            atomic_write(path, lambda f: f.write(stored), policy="never", encoding=None)
+        return digest
+
+    def get(self, digest: str, verify: bool = False) -> bytes:
+        """Read and decompress a chunk (raises FileNotFoundError if it is missing).
+
+        With verify, the data is re-hashed and a ValueError raised unless it
+        matches the digest.
+        """
+        with open(self.path(digest), "rb") as f:
+            stored = f.read()
+        decompress = _DECOMPRESS.get(stored[:1])
+        # No tag: written uncompressed, before codecs existed
+        data = stored if decompress is None else decompress(stored[1:])
+        if verify and hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest[:12]} does not match its checksum")
+        return data
+
+    def put_list(self, digests: Iterable[str]) -> str:
+        """Store an ordered list of digests as a tree; returns the root digest."""
+        level = list(digests)
+        height = 1
+        mask = (1 << self.NODE_BITS) - 1
+        while True:
+            parents = []
+            group = []
+            for digest in level:
+                group.append(digest)
+                if int(digest[-4:], 16) & mask == 0:
+                    parents.append(self._put_node(height, group))
+                    group = []
+            if group or not parents:
+                parents.append(self._put_node(height, group))
+            if len(parents) == 1:
+                return parents[0]
+            if len(parents) >= len(level):
+                # Every child was a boundary; close the tree here
+                return self._put_node(height + 1, parents)
+            level = parents
+            height += 1
+
+    def iter_list(self, root: str) -> Iterator[str]:
+        """Yield the digests of a list stored with put_list(), in order."""
+        height, children = self._read_node(root)
+        for child in children:
+            if height == 1:
+                yield child
+            else:
+                yield from self.iter_list(child)
+
+    def reachable(self, roots: Iterable[str], seen: Set[str] = None) -> Set[str]:
+        """Get every chunk digest (nodes and items) reachable from list roots."""
+        seen = set() if seen is None else seen
+        stack = [root for root in roots if root not in seen]
+        seen.update(stack)
+        while stack:
+            height, children = self._read_node(stack.pop())
+            for child in children:
+                if child in seen:
+                    continue
+                seen.add(child)
+                if height > 1:
+                    stack.append(child)
+        return seen
+
+    def gc(self, live: Set[str]) -> int:
+        """Delete chunks that are not in live; returns the number deleted."""
+        removed = 0
+        for path in self.root.glob("??/*"):
+            if path.name.startswith(".") or path.name in live:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            removed += 1
+        return removed
+
+    def verify(self, roots: Iterable[str], pool: Executor,
+               cancel: Optional[Event] = None) -> Tuple[Dict[str, str], List[str]]:
+        """Re-hash every chunk reachable from list roots on a thread pool.
+
+        Chunks shared by several lists are checked once. Trees are walked a
+        level at a time, each level checked in parallel. Nothing is changed,
+        so no lock is needed. Raises CancelledError soon after cancel is set.
+        Returns a problem description by root, for the lists with a missing
+        or damaged chunk, and the damaged chunks (see quarantine()).
+        """
+        check_node = partial(self._verify_node, cancel=cancel)
+        check_chunk = partial(self._verify_node, node=False, cancel=cancel)
+        roots = set(roots)
+        nodes = {}  # verified node -> children
+        bad = {}  # chunk -> problem
+        leaves = set()
+        level = list(roots)
+        while level:
+            next_level = set()
+            for digest, result in zip(level, pool.map(check_node, level)):
+                if isinstance(result, str):
+                    bad[digest] = result
+                    continue
+                height, children = result
+                nodes[digest] = children
+                (leaves if height == 1 else next_level).update(children)
+            level = list(next_level - nodes.keys() - bad.keys())
+        leaves = list(leaves)
+        for digest, problem in zip(leaves, pool.map(check_chunk, leaves)):
+            if problem is not None:
+                bad[digest] = problem
+
+        found = {}
+
+        def problem_under(digest: str) -> Optional[str]:
+            if digest not in found:
+                found[digest] = bad.get(digest)
+                for child in nodes.get(digest, ()):
+                    if found[digest] is not None:
+                        break
+                    found[digest] = problem_under(child)
+            return found[digest]
+
+        problems = {root: problem_under(root) for root in roots}
+        damaged = [digest for digest in bad if self.path(digest).exists()]
+        return {root: problem for root, problem in problems.items() if problem is not None}, damaged
+
+    def quarantine(self, digests: Iterable[str]):
+        """Move chunks that are still damaged out of the way (gc() leaves them alone).
+
+        The next put() of the same data then writes a good copy instead of
+        deduplicating against them. Each chunk is checked again first, as
+        it may have been collected and written anew since it was verified;
+        callers hold the same lock as for put() and gc().
+        """
+        for digest in digests:
+            if self._verify_node(digest, node=False) is None:
+                continue
+            path = self.path(digest)
+            try:
+                path.replace(path.with_name(f".{digest}.damaged"))
+            except FileNotFoundError:
+                pass
+
+    def _verify_node(self, digest: str, node: bool = True,
+                     cancel: Optional[Event] = None) -> Union[str, Tuple[int, List[str]], None]:
+        """Check one chunk and parse it as a tree node (unless node is False).
+
+        Returns the parsed node, or what is wrong with the chunk.
+        """
+        if cancel is not None and cancel.is_set():
+            raise CancelledError()
+        try:
+            data = self.get(digest, verify=True)
+            return self._parse_node(digest, data) if node else None
+        except FileNotFoundError:
+            return f"Chunk {digest[:12]} is missing"
+        except Exception as e:
+            return f"Chunk {digest[:12]} is damaged: {e}"
+
+    def _put_node(self, height: int, children: List[str]) -> str:
+        """Store one tree node."""
+        data = self.NODE_PREFIX + f"{height}\n".encode() + "\n".join(children).encode()
+        return self.put(data)
+
+    def _read_node(self, digest: str) -> Tuple[int, List[str]]:
+        """Read one tree node as (height, child digests)."""
+        return self._parse_node(digest, self.get(digest))
+
+    def _parse_node(self, digest: str, data: bytes) -> Tuple[int, List[str]]:
+        """Parse the data of a tree node."""
+        if not data.startswith(self.NODE_PREFIX):
+            raise ValueError(f"Chunk {digest[:12]} is not a tree node")
+        first, _, rest = data.partition(b"\n")
+        children = rest.decode().split("\n") if rest else []
+        return int(first[len(self.NODE_PREFIX):]), children
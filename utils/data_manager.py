@@ -3,39 +3,264 @@
 import json
 import csv
 from pathlib import Path
-from typing import List, Dict
-from models.todo import TodoItem
-from config.settings import TODO_FILE, SETTINGS_FILE, DEFAULT_THEME
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+from models.todo import TodoItem, RecordView
+from config.settings import SETTINGS_FILE, DEFAULT_THEME
+from utils.atomic_io import atomic_write
+from utils.file_cache import FileCache
+from utils.file_lock import store_lock
+from utils.migrations import SCHEMA_VERSION
+from utils.storage import get_storage
+from utils.sync import SyncToken, digest_keyed, iter_keyed, merge_todos, task_digest
 
 
 class DataManager:
-    """Manages data persistence for todos and settings."""
+    """Manages data persistence for todos and settings.
+    
+    This is the boundary between the app's TodoItem objects and the JSON
+    records that storage backends, the journal, sync and backups work on.
+    Todos are converted in bulk on the way in and out. No copy of the list
+    is kept here: the cache only remembers which files the app's list was
+    loaded from or saved to, and the merge base is a hash per task.
+    """
+    
+    # Parsed settings, and the identity of the todo files the app's list matches
+    _cache = FileCache()
+    _load_stat_key = None
+    
+    # (key, content hash) of the stored tasks as of the last sync with other
+    # instances (merge base, see digest_keyed())
+    _sync_base = None
+    
+    # Why the last failed save failed, for the UI to show
+    last_error = None
     
     @staticmethod
-    def load_todos() -> List[Dict]:
-        """Load todos from JSON file."""
+    def load_todos(progress: Callable[[int, int], None] = None) -> List[TodoItem]:
+        """Load todos from the configured storage backend.
+        
+        Records in an older file format are upgraded in a single pass, with
+        (done, total) reported to progress, and written back once.
+        """
         try:
-            if Path(TODO_FILE).exists():
-                with open(TODO_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return []
+            return DataManager.read_todos(progress)
         except Exception as e:
             print(f"Error loading todos: {e}")
             return []
     
     @staticmethod
-    def save_todos(todos: List[Dict]) -> bool:
-        """Save todos to JSON file."""
+    def read_todos(progress: Callable[[int, int], None] = None) -> List[TodoItem]:
+        """Load todos like load_todos(), but raise if they can't be read."""
+        return TodoItem.from_dicts(DataManager.read_records(progress))
+    
+    @staticmethod
+    def read_records(progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """Load the stored list as JSON records (raises if they can't be read)."""
+        storage = get_storage()
+        with store_lock:
+            records = storage.load(progress)
+            DataManager._save_upgrade(storage, records)
+        return records
+    
+    @staticmethod
+    def source_key() -> Optional[tuple]:
+        """Identity of the stored todo files, or None if the backend has none."""
+        paths = get_storage().cache_paths()
+        return FileCache.stat_key(paths) if paths is not None else None
+    
+    @staticmethod
+    def _save_upgrade(storage, records) -> bool:
+        """Rewrite the stored list if it was loaded from an older format."""
+        if storage.loaded_version >= SCHEMA_VERSION:
+            return False
+        storage.save(records)
+        return True
+    
+    @staticmethod
+    def is_current() -> bool:
+        """Check if the stored files are unchanged since the app's list was
+        last loaded from or saved to them, so it needs no reload."""
+        paths = get_storage().cache_paths()
+        if paths is None:
+            return False
+        with store_lock:
+            if not DataManager._cache.lookup("todos", paths, bool):
+                return False
+            SyncToken.mark_synced()
+        return True
+    
+    @staticmethod
+    def iter_todos() -> Iterator[TodoItem]:
+        """Yield stored todos one at a time as they are parsed.
+        
+        Once the iterator is exhausted, pass the collected list to
+        finish_loading() to apply changes not yet folded into the file.
+        """
+        storage = get_storage()
+        paths = storage.cache_paths()
+        DataManager._load_stat_key = FileCache.stat_key(paths) if paths is not None else None
+        memo = {}
+        return (TodoItem.from_dict(record, memo) for record in storage.iter_load())
+    
+    @staticmethod
+    def finish_loading(todos: List[TodoItem]) -> List[TodoItem]:
+        """Complete a load started with iter_todos()."""
+        storage = get_storage()
+        with store_lock:
+            storage.finish_load(todos, make=TodoItem.from_dict)
+            # Tasks are converted one at a time, for the upgrade and the merge base
+            records = RecordView(todos)
+            upgraded = DataManager._save_upgrade(storage, records)
+            DataManager._mark_synced(records)
+            paths = storage.cache_paths()
+            if paths is not None:
+                # Upgrading rewrote the files, so their identity is taken afresh
+                stat_key = None if upgraded else DataManager._load_stat_key
+                DataManager._cache.store("todos", paths, True, stat_key)
+        return todos
+    
+    @staticmethod
+    def save_todos(todos: List[TodoItem]) -> bool:
+        """Save the full todo list to the configured storage backend."""
+        return DataManager.save_records(RecordView(todos))
+    
+    @staticmethod
+    def save_records(records: Sequence[Dict]) -> bool:
+        """Save the full list, given as JSON records (or a RecordView of the tasks).
+        
+        Refuses (returns False) if another instance changed the stored list
+        since it was loaded; merge_external() has to run first.
+        """
         try:
-            with open(TODO_FILE, "w", encoding="utf-8") as f:
-                json.dump(todos, f, indent=2, ensure_ascii=False)
+            storage = get_storage()
+            with store_lock:
+                if DataManager.has_external_changes():
+                    print("Not saving todos: they were changed by another instance")
+                    return False
+                storage.save(records)
+                paths = storage.cache_paths()
+                if paths is not None:
+                    DataManager._cache.store("todos", paths, True)
+                if DataManager._sync_base is not None:
+                    DataManager._sync_base = digest_keyed(records)
             return True
         except Exception as e:
             print(f"Error saving todos: {e}")
+            DataManager.last_error = str(e)
             return False
     
     @staticmethod
-    def export_to_csv(todos: List[Dict], file_path: str) -> bool:
+    def cache_stats() -> Dict[str, int]:
+        """Get load cache hit/miss counters for diagnostics."""
+        return DataManager._cache.stats()
+    
+    @staticmethod
+    def record_change(todos: List[TodoItem], op: str, index: int = None) -> bool:
+        """Persist a single change to the todo list.
+        
+        The JSON backend appends the changed task to the journal and the
+        SQLite backend updates its row; neither rewrites the whole list.
+        
+        Args:
+            todos: The full todo list, after the change was applied
+            op: "add", "set", "delete" or "delete_completed"
+            index: Position of the affected task (None for "add")
+        
+        Returns False without writing if another instance changed the stored
+        list since it was loaded (see merge_external()), or if neither the
+        change nor a full save could be written (see last_error).
+        """
+        try:
+            with store_lock:
+                if DataManager.has_external_changes():
+                    return False
+                # Only the changed task is converted (or all of them on a fallback save)
+                ok = get_storage().record_change(RecordView(todos), op, index)
+                if ok and DataManager._sync_base is not None:
+                    DataManager._apply_to_base(todos, op, index)
+                return ok
+        except Exception as e:
+            print(f"Error saving change: {e}")
+            return DataManager.save_todos(todos)
+    
+    @staticmethod
+    def has_external_changes() -> bool:
+        """Check if another app instance changed the stored todos since we synced.
+        
+        Both backends bump the SyncToken on every write; it costs one stat() call.
+        """
+        return SyncToken.changed_externally()
+    
+    @staticmethod
+    def merge_external(todos: List[TodoItem]) -> Tuple[List[TodoItem], Dict]:
+        """Merge changes made by another instance into our todo list and save.
+        
+        Tasks are merged one by one against the list both sides last agreed
+        on (see merge_todos()); the result is written back so every instance
+        converges on it. Returns the merged list and the merge summary.
+        """
+        storage = get_storage()
+        with store_lock:
+            theirs = storage.load()
+            merged, summary = merge_todos(DataManager._sync_base or [],
+                                          TodoItem.to_dicts(todos), theirs)
+            if merged != theirs:
+                storage.save(merged)
+            paths = storage.cache_paths()
+            if paths is not None:
+                DataManager._cache.store("todos", paths, True)
+            DataManager._mark_synced(merged)
+        return TodoItem.from_dicts(merged), summary
+    
+    @staticmethod
+    def _mark_synced(records: Iterable[Dict]):
+        """Remember the stored list we are in sync with (call holding store_lock)."""
+        SyncToken.mark_synced()
+        DataManager._sync_base = digest_keyed(records)
+    
+    @staticmethod
+    def _apply_to_base(todos: List[TodoItem], op: str, index: int = None):
+        """Apply a recorded change to the merge base as well.
+        
+        Right after the change the stored list is ours, so the base follows
+        our list: the changed task is hashed, or for a bulk delete the list.
+        """
+        base = DataManager._sync_base
+        if op == "add":
+            base.append(DataManager._base_entry(todos[-1]))
+        elif op == "set":
+            base[index] = DataManager._base_entry(todos[index])
+        elif op == "delete":
+            del base[index]
+        else:
+            DataManager._sync_base = digest_keyed(RecordView(todos))
+    
+    @staticmethod
+    def _base_entry(todo: TodoItem) -> tuple:
+        """A task's (key, content hash) for the merge base."""
+        record = todo.to_dict()
+        return next(iter_keyed([record]))[0], task_digest(record)
+    
+    @staticmethod
+    def is_incremental() -> bool:
+        """Check if record_change() persists changes without a full rewrite."""
+        return get_storage().incremental
+    
+    @staticmethod
+    def query_todos(filter_name: str, sort_name: str, search_query: str = "") -> Optional[List[int]]:
+        """Get filtered and sorted todo positions from the storage backend.
+        
+        Returns None when the backend cannot answer the query, in which case
+        the caller filters and sorts in memory.
+        """
+        try:
+            return get_storage().query(filter_name, sort_name, search_query)
+        except Exception as e:
+            print(f"Error querying todos: {e}")
+            return None
+    
+    @staticmethod
+    def export_to_csv(todos: List[TodoItem], file_path: str) -> bool:
         """Export todos to CSV file."""
         try:
             with open(file_path, mode='w', newline='', encoding='utf-8') as file:
@@ -43,23 +268,23 @@ class DataManager:
                 writer.writerow(["Type", "Title", "Priority", "Due Date", "Status", "Description"])
                 
                 for todo in todos:
-                    desc = " ".join([l.get('text', '') for l in todo.get("description_content", [])])
-                    status = "Done" if todo.get('completed') else "Active"
+                    desc = " ".join([l.get('text', '') for l in todo.description_content])
+                    status = "Done" if todo.completed else "Active"
                     writer.writerow([
                         "Main", 
-                        todo['title'], 
-                        todo.get('priority', ''), 
-                        todo.get('due_datetime', ''), 
+                        todo.title, 
+                        todo.priority, 
+                        todo.due_datetime or '', 
                         status, 
                         desc
                     ])
                     
-                    for sub in todo.get("sub_todos", []):
-                        sub_desc = " ".join([l.get('text', '') for l in sub.get("description_content", [])])
-                        sub_status = "Done" if sub.get('completed') else "Active"
+                    for sub in todo.sub_todos:
+                        sub_desc = " ".join([l.get('text', '') for l in sub.description_content])
+                        sub_status = "Done" if sub.completed else "Active"
                         writer.writerow([
                             "Sub", 
-                            sub['title'], 
+                            sub.title, 
                             "-", 
                             "-", 
                             sub_status, 
@@ -74,20 +299,25 @@ class DataManager:
     def load_settings() -> Dict:
         """Load application settings."""
         try:
-            if Path(SETTINGS_FILE).exists():
-                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return {"theme": DEFAULT_THEME}
+            return DataManager._cache.get("settings", [SETTINGS_FILE], DataManager._read_settings, dict)
         except Exception as e:
             print(f"Error loading settings: {e}")
             return {"theme": DEFAULT_THEME}
     
+    @staticmethod
+    def _read_settings() -> Dict:
+        """Read settings.json (raises on unreadable files)."""
+        if Path(SETTINGS_FILE).exists():
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"theme": DEFAULT_THEME}
+    
     @staticmethod
     def save_settings(settings: Dict) -> bool:
         """Save application settings."""
         try:
-            with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-                json.dump(settings, f, indent=2)
+            atomic_write(SETTINGS_FILE, lambda f: json.dump(settings, f, indent=2))
+            DataManager._cache.store("settings", [SETTINGS_FILE], dict(settings))
             return True
         except Exception as e:
             print(f"Error saving settings: {e}")
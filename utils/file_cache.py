@@ -0,0 +1,107 @@
+"""Parsed-file cache keyed on file identity."""
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def _stat_key(paths: Iterable[Path]) -> tuple:
+    """Cheap identity of a set of files: (path, size, mtime_ns) each."""
+    key = []
+    for path in paths:
+        try:
+            st = Path(path).stat()
+            key.append((str(path), st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            key.append((str(path), None, None))
+    return tuple(key)
+
+
+def _digest(paths: Iterable[Path]) -> str:
+    """Content hash over a set of files (missing files hash differently from empty ones)."""
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                h.update(b"+")
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(block)
+        except FileNotFoundError:
+            h.update(b"-")
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class FileCache:
+    """Remembers the parsed contents of files until the files change.
+
+    An entry is valid while its files keep the same (path, size, mtime_ns).
+    When the stat data differs the files are hashed, so a file rewritten
+    with identical bytes (e.g. restoring the backup just taken) is still a
+    hit. Values are handed out through a copy function so callers can
+    mutate what they get.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, name: str, paths: Iterable[Path], copy: Callable[[Any], Any]) -> Optional[Any]:
+        """Get a copy of the cached value, or None if the files changed."""
+        paths = list(paths)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                stat_key = _stat_key(paths)
+                if stat_key != entry["stat_key"] and _digest(paths) == entry["digest"]:
+                    entry["stat_key"] = stat_key
+                if stat_key == entry["stat_key"]:
+                    self.hits += 1
+                    return copy(entry["value"])
+            self.misses += 1
+            return None
+
+    def store(self, name: str, paths: Iterable[Path], value: Any, stat_key: tuple = None):
+        """Remember the parsed value of the given files.
+
+        If stat_key (taken before parsing started) is given and the files
+        changed since, nothing is stored.
+        """
+        paths = list(paths)
+        with self._lock:
+            current = _stat_key(paths)
+            if stat_key is not None and stat_key != current:
+                self._entries.pop(name, None)
+                return
+            self._entries[name] = {"stat_key": current, "digest": _digest(paths), "value": value}
+
+    def get(self, name: str, paths: Iterable[Path], parse: Callable[[], Any],
+            copy: Callable[[Any], Any]) -> Any:
+        """Get a copy of the cached value, parsing the files on a miss."""
+        paths = list(paths)
+        value = self.lookup(name, paths, copy)
+        if value is None:
+            stat_key = _stat_key(paths)
+            value = parse()
+            self.store(name, paths, copy(value), stat_key)
+        return value
+
+    def invalidate(self, name: str = None):
+        """Drop one entry, or all of them."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters for diagnostics."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    @staticmethod
+    def stat_key(paths: Iterable[Path]) -> tuple:
+        """Get the identity of a set of files, for a later store()."""
+        return _stat_key(paths)
@@ -0,0 +1,84 @@
+"""Advisory inter-process file locking."""
+
+import os
+import threading
+import time
+from pathlib import Path
+from config.settings import LOCK_FILE, LOCK_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Advisory lock held on a lock file, shared by all running instances.
+
+    Re-entrant within a process (threads of one instance queue on an RLock),
+    so code that already holds the lock can call other locked code.
+    """
+
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, path, timeout: float = LOCK_TIMEOUT):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        """Take the lock, waiting up to timeout seconds for other processes."""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        """Release one level of the lock."""
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def _lock_file(self) -> int:
+        """Open the lock file and lock it, polling until the timeout."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return fd
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for {self.path.name}")
+                time.sleep(self.POLL_INTERVAL)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# Serializes writes to the task files across all app instances
+store_lock = FileLock(LOCK_FILE)
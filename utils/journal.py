@@ -0,0 +1,279 @@
+"""Append-only change journal for todos."""
+
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Dict, Callable, Optional
+from config.settings import TODO_FILE, JOURNAL_FILE, JOURNAL_COMPACT_THRESHOLD
+from utils.atomic_io import append_text
+from utils.file_lock import store_lock
+from utils.json_stream import iter_decode_todos
+from utils.migrations import SCHEMA_VERSION, SchemaMigrator
+from utils.sync import SyncToken
+
+
+class TaskJournal:
+    """Write-ahead journal of task list mutations.
+
+    Every change is appended to the journal as a single JSON line instead of
+    rewriting todos.json. On load the journal is replayed on top of the
+    snapshot, and once it grows past JOURNAL_COMPACT_THRESHOLD it is folded
+    back into the snapshot on a background thread.
+
+    Records carry the time they were written ("at"), so the list can be
+    rebuilt as of any moment the journal reaches back to.
+
+    Records are positional, so replaying one the snapshot already holds
+    would apply it twice. They are numbered ("seq"), and a snapshot's
+    header records the last number folded into it ("journal_seq"): a crash
+    after a snapshot is written but before the journal is removed leaves
+    records that replay() then skips.
+    """
+
+    COMPACTING_FILE = Path(f"{JOURNAL_FILE}.compacting")
+
+    # Guards snapshot writes; full saves bump the generation so that a
+    # compaction started before them never overwrites a newer snapshot.
+    lock = threading.RLock()
+    _generation = 0
+    _compacting = False
+    # (identity of the task files, last record number) as of the last look
+    _last_seq = None
+
+    @classmethod
+    def append(cls, op: str, index: int = None, todo: Dict = None) -> bool:
+        """Append one change record to the journal (call holding store_lock).
+
+        The record is synced to disk according to FSYNC_POLICY.
+        """
+        record = {"op": op, "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        if index is not None:
+            record["index"] = index
+        if todo is not None:
+            record["todo"] = todo
+            record["v"] = SCHEMA_VERSION
+        try:
+            record["seq"] = cls.last_seq() + 1
+            append_text(JOURNAL_FILE, json.dumps(record, ensure_ascii=False) + "\n")
+            cls._last_seq = (cls._files_key(), record["seq"])
+            return True
+        except Exception as e:
+            print(f"Error writing journal: {e}")
+            return False
+
+    @staticmethod
+    def apply(todos: List, record: Dict):
+        """Apply a single journal record to a todo list in place.
+
+        The list may hold records or TodoItem objects; "todo" must match.
+        """
+        op = record.get("op")
+        if op == "add":
+            todos.append(record["todo"])
+        elif op == "set":
+            todos[record["index"]] = record["todo"]
+        elif op == "delete":
+            del todos[record["index"]]
+        elif op == "delete_completed":
+            todos[:] = [t for t in todos
+                        if not (t.get("completed") if isinstance(t, dict) else t.completed)]
+
+    @classmethod
+    def replay(cls, todos: List, until: Optional[str] = None,
+               make: Callable[[Dict], object] = None) -> List:
+        """Replay pending journal records on top of the loaded snapshot.
+
+        Call holding store_lock, so the snapshot is still the one loaded;
+        records it already holds are skipped. With until ("YYYY-mm-dd
+        HH:MM:SS"), stop at the first record written after that time. With
+        make, journaled tasks are passed through it (e.g.
+        TodoItem.from_dict) before they go into the list.
+        """
+        after = cls.snapshot_seq()
+        for path in (cls.COMPACTING_FILE, Path(JOURNAL_FILE)):
+            if not cls._replay_file(path, todos, until, make, after):
+                break
+        return todos
+
+    @classmethod
+    def snapshot_header(cls, journal_seq: int = None) -> Dict[str, Any]:
+        """Header for a new todos.json holding every journal record (up to journal_seq)."""
+        return {**SchemaMigrator.header(),
+                "journal_seq": cls.last_seq() if journal_seq is None else journal_seq}
+
+    @staticmethod
+    def snapshot_seq() -> int:
+        """Number of the last journal record folded into todos.json (0 if none)."""
+        header = {}
+        try:
+            with open(TODO_FILE, "r", encoding="utf-8") as f:
+                # The header comes before the tasks; stop at the first one
+                next(iter_decode_todos(f, header=header), None)
+        except FileNotFoundError:
+            pass
+        return header.get("journal_seq", 0)
+
+    @classmethod
+    def last_seq(cls) -> int:
+        """Number of the last record written by any instance (call holding store_lock).
+
+        Re-read from the files only when another instance changed them.
+        """
+        key = cls._files_key()
+        if cls._last_seq is None or cls._last_seq[0] != key:
+            seq = max(cls._file_seq(Path(JOURNAL_FILE)), cls._file_seq(cls.COMPACTING_FILE),
+                      cls.snapshot_seq())
+            cls._last_seq = (key, seq)
+        return cls._last_seq[1]
+
+    @classmethod
+    def _files_key(cls) -> tuple:
+        """Identity of the snapshot and journal files (inode, size, mtime_ns each)."""
+        key = []
+        for path in (TODO_FILE, JOURNAL_FILE, cls.COMPACTING_FILE):
+            try:
+                st = Path(path).stat()
+                key.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                key.append(None)
+        return tuple(key)
+
+    @staticmethod
+    def _file_seq(path: Path) -> int:
+        """Number of the last complete record in a journal file (0 if none)."""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            end = f.seek(0, 2)
+            block = 4096
+            while True:
+                # Read backwards until a whole record turns up
+                start = max(0, end - block)
+                f.seek(start)
+                lines = f.read(end - start).split(b"\n")
+                if start > 0:
+                    lines = lines[1:]
+                for line in reversed(lines):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # blank or torn
+                    # Records from before numbering have no "seq"
+                    return record.get("seq", 0)
+                if start == 0:
+                    return 0
+                block *= 8
+
+    @classmethod
+    def earliest_time(cls) -> Optional[str]:
+        """Time of the oldest pending record (None if there are none or it has no time)."""
+        for path in (cls.COMPACTING_FILE, Path(JOURNAL_FILE)):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.loads(f.readline()).get("at")
+            except (OSError, ValueError):
+                continue
+        return None
+
+    @classmethod
+    def _replay_file(cls, path: Path, todos: List, until: Optional[str] = None,
+                     make: Callable[[Dict], object] = None, after: int = 0) -> bool:
+        """Replay the records of one journal file numbered past after.
+
+        Returns False if it stopped at a record written after until.
+        """
+        if not path.exists():
+            return True
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if record.get("seq", after + 1) <= after:
+                        continue  # already in the snapshot
+                    if until is not None and record.get("at", "") > until:
+                        return False
+                    if "todo" in record:
+                        # Records from before versioning have no "v"
+                        version = record.get("v", 0)
+                        record["todo"] = SchemaMigrator.migrate_record(record["todo"], version)
+                        if make is not None:
+                            record["todo"] = make(record["todo"])
+                    cls.apply(todos, record)
+                except (ValueError, KeyError, IndexError) as e:
+                    # A torn last line after a crash is expected; skip it
+                    print(f"Skipping journal record {path.name}:{line_no}: {e}")
+        return True
+
+    @classmethod
+    def size(cls) -> int:
+        """Get the current journal size in bytes."""
+        try:
+            return Path(JOURNAL_FILE).stat().st_size
+        except OSError:
+            return 0
+
+    @classmethod
+    def needs_compaction(cls) -> bool:
+        """Check if the journal has grown past the compaction threshold."""
+        return not cls._compacting and cls.size() >= JOURNAL_COMPACT_THRESHOLD
+
+    @classmethod
+    def reset(cls):
+        """Drop all journal records after a full snapshot was written.
+
+        Must be called while holding ``lock``.
+        """
+        cls._generation += 1
+        for path in (Path(JOURNAL_FILE), cls.COMPACTING_FILE):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def compact_async(cls, read_snapshot: Callable[[], List[Dict]],
+                      write_snapshot: Callable[[List[Dict], int], bool]) -> bool:
+        """Fold the journal into the snapshot on a background thread.
+
+        The live journal is rotated aside first, so changes recorded while
+        the compaction runs go to a fresh journal and are never lost. If any
+        instance replaced the snapshot in the meantime, the result is dropped.
+        write_snapshot(todos, journal_seq) gets the number of the last
+        record folded in.
+        """
+        with store_lock, cls.lock:
+            if cls._compacting:
+                return False
+            journal = Path(JOURNAL_FILE)
+            if not cls.COMPACTING_FILE.exists():
+                if not journal.exists():
+                    return False
+                journal.replace(cls.COMPACTING_FILE)
+            cls._compacting = True
+            generation = cls._generation
+            epoch = SyncToken.read()["epoch"]
+
+        def worker():
+            try:
+                # A snapshot replaced meanwhile changes the epoch; see below
+                after = cls.snapshot_seq()
+                todos = read_snapshot()
+                cls._replay_file(cls.COMPACTING_FILE, todos, after=after)
+                seq = max(after, cls._file_seq(cls.COMPACTING_FILE))
+                with store_lock, cls.lock:
+                    if (generation == cls._generation and SyncToken.read()["epoch"] == epoch
+                            and write_snapshot(todos, seq)):
+                        cls.COMPACTING_FILE.unlink()
+                        SyncToken.bump(generation=False, epoch=True)
+            except Exception as e:
+                print(f"Journal compaction failed: {e}")
+            finally:
+                cls._compacting = False
+
+        threading.Thread(target=worker, name="journal-compaction", daemon=True).start()
+        return True
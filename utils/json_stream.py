@@ -0,0 +1,178 @@
+"""Streaming JSON encoding for todo lists."""
+
+import json
+from typing import Iterable, Iterator, Dict, IO, Optional
+from config.settings import JSON_COMPACT
+
+
+WRITE_CHUNK_SIZE = 64 * 1024  # characters buffered before each write
+
+
+def iter_encode_todos(todos: Iterable[Dict], compact: bool = JSON_COMPACT,
+                      header: Optional[Dict] = None) -> Iterator[str]:
+    """Encode a todo list one task at a time.
+
+    The indented output is byte-identical to
+    ``json.dump(todos, f, indent=2, ensure_ascii=False)``; the compact
+    output matches ``separators=(",", ":")``. With a header the output is
+    the object ``{**header, "todos": todos}`` instead, header keys first.
+    Only one encoded task is held in memory at a time.
+    """
+    if compact:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        newline = ""
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+        newline = "\n"
+
+    def encode(value, depth):
+        # Nest depth levels deeper; JSON strings never contain raw newlines
+        return encoder.encode(value).replace("\n", "\n" + "  " * depth)
+
+    depth = 0
+    if header is not None:
+        depth = 1
+        item_indent = newline + ("" if compact else "  ")
+        yield "{"
+        for key, value in header.items():
+            yield item_indent + encode(key, 0) + encoder.key_separator + encode(value, 1) + ","
+        yield item_indent + encode("todos", 0) + encoder.key_separator
+
+    indent = newline + ("" if compact else "  " * (depth + 1))
+    first = True
+    for todo in todos:
+        yield ("[" if first else ",") + indent
+        first = False
+        yield encode(todo, depth + 1)
+
+    if first:
+        yield "[]"
+    else:
+        yield newline + ("" if compact else "  " * depth) + "]"
+    if header is not None:
+        yield newline + "}"
+
+
+def write_todos(f: IO, todos: Iterable[Dict], compact: bool = JSON_COMPACT,
+                header: Optional[Dict] = None):
+    """Stream a todo list to an open text file in large buffered chunks."""
+    chunk = []
+    size = 0
+    for piece in iter_encode_todos(todos, compact, header):
+        chunk.append(piece)
+        size += len(piece)
+        if size >= WRITE_CHUNK_SIZE:
+            f.write("".join(chunk))
+            chunk = []
+            size = 0
+    if chunk:
+        f.write("".join(chunk))
+
+
+READ_CHUNK_SIZE = 256 * 1024  # characters read per refill
+
+
+def iter_decode_todos(f: IO, chunk_size: int = READ_CHUNK_SIZE,
+                      header: Optional[Dict] = None) -> Iterator[Dict]:
+    """Parse the tasks of a todos file from an open text file one at a time.
+
+    The file is either a JSON array of tasks or an object holding it under
+    "todos"; the object's other keys are stored into header (if given) as
+    they are read, so keys written before "todos" are known before the
+    first task is yielded. Only the current read buffer and the task being
+    decoded are held in memory, so the first tasks are available long
+    before a large file has been read completely. Raises ValueError on
+    malformed input.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = f.read(chunk_size)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    def next_char():
+        # Skip whitespace, refilling as needed; returns "" at end of input
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos] if pos < len(buf) else ""
+            fill()
+
+    def decode(what):
+        # Decode one value at pos, reading more while it is cut off
+        nonlocal pos
+        while True:
+            next_char()
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Malformed {what} in todos file")
+                fill()
+                continue
+            if end == len(buf) and not eof:
+                # A number may continue in the next read
+                fill()
+                continue
+            pos = end
+            return value
+
+    def iter_tasks():
+        nonlocal pos
+        if next_char() != "[":
+            raise ValueError("Todos file has no task list")
+        pos += 1
+        if next_char() == "]":
+            pos += 1
+            return
+        while True:
+            todo = decode("task")
+            delimiter = next_char()
+            if delimiter not in (",", "]"):
+                raise ValueError("Expected ',' or ']' after task in todos file")
+            yield todo
+            pos += 1
+            if delimiter == "]":
+                return
+
+    first = next_char()
+    if first == "[":
+        yield from iter_tasks()
+        return
+    if first != "{":
+        raise ValueError("Todos file is neither a task list nor an object")
+    pos += 1
+
+    found = False
+    delimiter = next_char()
+    while delimiter != "}":
+        key = decode("key")
+        if not isinstance(key, str) or next_char() != ":":
+            raise ValueError("Malformed header in todos file")
+        pos += 1
+        if key == "todos":
+            found = True
+            yield from iter_tasks()
+        else:
+            value = decode("header")
+            if header is not None:
+                header[key] = value
+        delimiter = next_char()
+        if delimiter not in (",", "}"):
+            raise ValueError("Expected ',' or '}' in todos file header")
+        pos += 1
+        if delimiter == ",":
+            delimiter = next_char()
+            if delimiter == "}":
+                raise ValueError("Malformed header in todos file")
+    if not found:
+        raise ValueError("Todos file has no task list")
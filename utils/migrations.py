@@ -0,0 +1,131 @@
+"""Versioned task file format and record migrations."""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models.todo import new_id
+
+
+# Version of the task records written by this code. Bump it and append a
+# step to SchemaMigrator.STEPS whenever the record format changes.
+SCHEMA_VERSION = 2
+
+# First version whose tasks and sub-tasks all carry an "id"
+ID_VERSION = 2
+
+# Fields every record has from version 1 on
+TASK_DEFAULTS = {
+    "title": "",
+    "priority": "Medium",
+    "due_datetime": None,
+    "description_content": [],
+    "completed": False,
+    "has_reminder": False,
+    "reminder_datetime": None,
+    "is_recurring": False,
+    "recurring_frequency": "None",
+    "created_at": "",
+    "sub_todos": [],
+}
+SUB_TASK_DEFAULTS = {
+    "title": "",
+    "description_content": [],
+    "completed": False,
+    "created_at": "",
+}
+
+PROGRESS_EVERY = 1000  # records between progress callbacks
+
+
+def _fill_defaults(record: Dict, defaults: Dict):
+    """Add missing fields (and replace null lists) with fresh default values."""
+    for key, value in defaults.items():
+        if key not in record or (record[key] is None and isinstance(value, list)):
+            record[key] = list(value) if isinstance(value, list) else value
+
+
+def _v0_to_v1(todo: Dict) -> Dict:
+    """Version 0 (bare list, optional fields): give every field a value."""
+    _fill_defaults(todo, TASK_DEFAULTS)
+    for sub in todo["sub_todos"]:
+        _fill_defaults(sub, SUB_TASK_DEFAULTS)
+    return todo
+
+
+def _v1_to_v2(todo: Dict) -> Dict:
+    """Version 2: every task and sub-task has a unique "id"."""
+    if not todo.get("id"):
+        todo["id"] = new_id()
+    for sub in todo["sub_todos"]:
+        if not sub.get("id"):
+            sub["id"] = new_id()
+    return todo
+
+
+class SchemaMigrator:
+    """Upgrades task records to SCHEMA_VERSION in one pass at load time.
+
+    Task files start with a header, ``{"version": N, "todos": [...]}``;
+    files without one (a bare list) are version 0. Each record runs through
+    all steps from its file's version on before the next record is touched,
+    so a file is walked once however many versions it is behind. Code past
+    the load boundary can rely on every field in TASK_DEFAULTS being set.
+    """
+
+    # STEPS[n] upgrades a record from version n to n + 1, in place
+    STEPS: List[Callable[[Dict], Dict]] = [_v0_to_v1, _v1_to_v2]
+
+    @staticmethod
+    def header() -> Dict[str, Any]:
+        """Header fields written in front of the task list."""
+        return {"version": SCHEMA_VERSION}
+
+    @staticmethod
+    def split(data: Any) -> Tuple[int, List[Dict]]:
+        """Get (version, records) from a parsed task file."""
+        if isinstance(data, list):
+            return 0, data
+        if not isinstance(data, dict) or not isinstance(data.get("todos"), list):
+            raise ValueError("Todos file has neither a task list nor a header")
+        version = data.get("version", 0)
+        SchemaMigrator.check_version(version)
+        return version, data["todos"]
+
+    @staticmethod
+    def check_version(version: int):
+        """Refuse files written by a newer version of the app."""
+        if not isinstance(version, int) or version > SCHEMA_VERSION:
+            raise ValueError(f"Todos file version {version} is newer than this app supports")
+
+    @classmethod
+    def migrate_record(cls, todo: Dict, from_version: int) -> Dict:
+        """Upgrade one record from from_version to SCHEMA_VERSION."""
+        for step in cls.STEPS[from_version:]:
+            todo = step(todo)
+        return todo
+
+    @classmethod
+    def migrate(cls, todos: List[Dict], from_version: int,
+                progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """Upgrade a whole list in place, reporting (done, total) to progress."""
+        if from_version >= SCHEMA_VERSION:
+            return todos
+        total = len(todos)
+        for i, todo in enumerate(todos):
+            todos[i] = cls.migrate_record(todo, from_version)
+            if progress is not None and (i + 1) % PROGRESS_EVERY == 0:
+                progress(i + 1, total)
+        if progress is not None:
+            progress(total, total)
+        return todos
+
+    @classmethod
+    def load_file(cls, path: Path, progress: Optional[Callable[[int, int], None]] = None
+                  ) -> Tuple[List[Dict], int]:
+        """Read a task file and upgrade its records.
+
+        Returns the records and the version the file was written with.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            version, todos = cls.split(json.load(f))
+        return cls.migrate(todos, version, progress), version
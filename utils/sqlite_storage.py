@@ -0,0 +1,331 @@
+"""SQLite storage backend for todos."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Dict, Iterator, Optional
+from config.settings import DATABASE_FILE, TODO_FILE, JOURNAL_FILE, DATETIME_FORMAT
+from utils.file_lock import store_lock
+from utils.migrations import SCHEMA_VERSION, SchemaMigrator
+from utils.storage import JsonStorage
+from utils.sync import SyncToken
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    title TEXT NOT NULL DEFAULT '',
+    priority TEXT,
+    due_datetime TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    search_text TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sub_tasks (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_position ON tasks(position);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_datetime ON tasks(due_datetime);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+CREATE INDEX IF NOT EXISTS idx_sub_tasks_task ON sub_tasks(task_id, position);
+"""
+
+PRIORITY_ORDER = "CASE priority WHEN 'High' THEN 0 WHEN 'Low' THEN 2 ELSE 1 END"
+
+SORT_COLUMNS = {
+    "Priority": PRIORITY_ORDER,
+    "Due Date": "COALESCE(NULLIF(due_datetime, ''), '9999-12-31')",
+    "Created": "COALESCE(created_at, '')",
+}
+
+
+class SqliteStorage:
+    """Stores todos in a SQLite database.
+
+    Each task is one row in ``tasks`` and each sub-task one row in
+    ``sub_tasks``. The full record is kept as JSON in the ``data`` column so
+    that round trips are lossless; the columns used for filtering and
+    sorting are indexed copies of it. A task's place in the list is its
+    ``position`` column and its "id" is the ``uid`` column, by which
+    single-task changes find the one row they touch.
+
+    Writes happen under store_lock and bump the SyncToken, like the JSON
+    storage's, so other instances notice them and merge.
+    """
+
+    name = "sqlite"
+    incremental = True
+    # Rows are upgraded when the database is opened
+    loaded_version = SCHEMA_VERSION
+
+    _conn = None
+    _lock = threading.RLock()
+    _load_generation = None  # SyncToken generation when the running iter_load() started
+
+    @classmethod
+    def connect(cls) -> sqlite3.Connection:
+        """Get the shared database connection, creating the schema if needed."""
+        if cls._conn is not None:
+            return cls._conn
+        # store_lock first, in the order every writer takes the two locks
+        with store_lock, cls._lock:
+            if cls._conn is None:
+                is_new = not Path(DATABASE_FILE).exists()
+                conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
+                conn.execute("PRAGMA foreign_keys = ON")
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                cls._add_uid_column(conn)
+                cls._conn = conn
+                if is_new:
+                    cls.migrate_from_json()
+                else:
+                    cls._upgrade_rows()
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return cls._conn
+
+    @staticmethod
+    def _add_uid_column(conn: sqlite3.Connection):
+        """Add the task ID column to databases created before it existed."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+        if "uid" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE tasks ADD COLUMN uid TEXT")
+                rows = conn.execute("SELECT id, data FROM tasks").fetchall()
+                conn.executemany("UPDATE tasks SET uid = ? WHERE id = ?",
+                                 [(json.loads(data).get("id"), row_id) for row_id, data in rows])
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_uid ON tasks(uid)")
+
+    @classmethod
+    def _upgrade_rows(cls):
+        """Upgrade task records written by an older version, in one pass.
+
+        The record version is kept in SQLite's user_version pragma.
+        """
+        version = cls._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            cls.save(SchemaMigrator.migrate(cls.load(), version))
+
+    @classmethod
+    def close(cls):
+        """Close the shared database connection."""
+        with cls._lock:
+            if cls._conn is not None:
+                cls._conn.close()
+                cls._conn = None
+
+    @classmethod
+    def load(cls, progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """Load all todos in list order (records are already upgraded)."""
+        conn = cls.connect()
+        with cls._lock:
+            todos = []
+            by_task_id = {}
+            for task_id, data in conn.execute("SELECT id, data FROM tasks ORDER BY position"):
+                todo = json.loads(data)
+                todo["sub_todos"] = []
+                by_task_id[task_id] = todo
+                todos.append(todo)
+            for task_id, data in conn.execute(
+                    "SELECT task_id, data FROM sub_tasks ORDER BY task_id, position"):
+                by_task_id[task_id]["sub_todos"].append(json.loads(data))
+            return todos
+
+    @classmethod
+    def iter_load(cls) -> Iterator[Dict]:
+        """Yield todos in list order."""
+        cls._load_generation = SyncToken.read()["generation"]
+        return iter(cls.load())
+
+    @classmethod
+    def finish_load(cls, todos: List, make: Callable[[Dict], object] = None):
+        """Read the tasks again if another instance wrote since iter_load() started."""
+        with store_lock:
+            if SyncToken.read()["generation"] != cls._load_generation:
+                records = cls.load()
+                todos[:] = records if make is None else map(make, records)
+
+    @classmethod
+    def save(cls, todos: List[Dict]) -> bool:
+        """Replace the whole database contents with the given list."""
+        conn = cls.connect()
+        with store_lock:
+            with cls._lock, conn:
+                conn.execute("DELETE FROM sub_tasks")
+                conn.execute("DELETE FROM tasks")
+                for position, todo in enumerate(todos):
+                    cls._insert_task(conn, position, todo)
+            SyncToken.bump(epoch=True)
+        return True
+
+    @classmethod
+    def record_change(cls, todos: List[Dict], op: str, index: int = None) -> bool:
+        """Apply a single change as row-level statements.
+
+        Changed tasks are found by ID. A deleted task is gone from todos, so
+        it is the row at index: positions match ours because DataManager
+        refuses to record changes once another instance has written.
+        """
+        conn = cls.connect()
+        with store_lock:
+            with cls._lock, conn:
+                if op == "add":
+                    cls._insert_task(conn, cls._next_position(conn), todos[-1])
+                elif op == "set":
+                    cls._update_task(conn, todos[index])
+                elif op == "delete":
+                    cls._delete_task(conn, todos, index)
+                elif op == "delete_completed":
+                    conn.execute("DELETE FROM tasks WHERE completed = 1")
+                    cls._renumber_positions(conn)
+            SyncToken.bump()
+        return True
+
+    @staticmethod
+    def cache_paths() -> Optional[List[Path]]:
+        """The database is queried directly, so loads are not cached."""
+        return None
+
+    @classmethod
+    def query(cls, filter_name: str, sort_name: str, search_query: str = "") -> Optional[List[int]]:
+        """Get the positions of matching todos in display order.
+
+        Mirrors TaskList's in-memory filter and sort: completed tasks last,
+        then the selected sort key, then list order.
+        """
+        where = []
+        params = []
+        if search_query:
+            where.append("instr(search_text, ?) > 0")
+            params.append(search_query)
+        if filter_name == "Active":
+            where.append("completed = 0")
+        elif filter_name == "Completed":
+            where.append("completed = 1")
+        elif filter_name == "Overdue":
+            where.append("completed = 0 AND due_datetime IS NOT NULL "
+                         "AND due_datetime != '' AND due_datetime < ?")
+            params.append(datetime.now().strftime(DATETIME_FORMAT))
+
+        sql = "SELECT position FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sort_key = SORT_COLUMNS.get(sort_name)
+        sql += f" ORDER BY completed, {sort_key}, position" if sort_key else " ORDER BY completed, position"
+
+        conn = cls.connect()
+        with cls._lock:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    @classmethod
+    def migrate_from_json(cls) -> int:
+        """One-shot import of the JSON storage's tasks into the database.
+
+        They are read the way the JSON backend loads them, so changes still
+        in the journal come along. Returns the number of imported tasks.
+        Existing rows are replaced.
+        """
+        if not Path(TODO_FILE).exists() and not Path(JOURNAL_FILE).exists():
+            return 0
+        todos = JsonStorage.load()
+        cls.save(todos)
+        return len(todos)
+
+    @staticmethod
+    def _task_columns(todo: Dict) -> tuple:
+        """Extract the indexed column values of a task."""
+        desc_text = " ".join(x.get('text', '') for x in todo.get("description_content", []))
+        record = {k: v for k, v in todo.items() if k != "sub_todos"}
+        return (
+            todo.get("id"),
+            todo.get("title", ""),
+            todo.get("priority"),
+            todo.get("due_datetime"),
+            1 if todo.get("completed") else 0,
+            todo.get("created_at"),
+            f"{todo.get('title', '').lower()}\n{desc_text.lower()}",
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    @classmethod
+    def _insert_task(cls, conn: sqlite3.Connection, position: int, todo: Dict):
+        """Insert a task row and its sub-task rows."""
+        cur = conn.execute(
+            "INSERT INTO tasks (position, uid, title, priority, due_datetime, completed, "
+            "created_at, search_text, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (position, *cls._task_columns(todo))
+        )
+        cls._insert_sub_tasks(conn, cur.lastrowid, todo.get("sub_todos", []))
+
+    @classmethod
+    def _update_task(cls, conn: sqlite3.Connection, todo: Dict):
+        """Update a task's row in place and replace its sub-task rows."""
+        row = conn.execute("SELECT id FROM tasks WHERE uid = ?", (todo.get("id"),)).fetchone()
+        if row is None:
+            cls._insert_task(conn, cls._next_position(conn), todo)
+            return
+        conn.execute(
+            "UPDATE tasks SET uid = ?, title = ?, priority = ?, due_datetime = ?, completed = ?, "
+            "created_at = ?, search_text = ?, data = ? WHERE id = ?",
+            (*cls._task_columns(todo), row[0])
+        )
+        conn.execute("DELETE FROM sub_tasks WHERE task_id = ?", (row[0],))
+        cls._insert_sub_tasks(conn, row[0], todo.get("sub_todos", []))
+
+    @classmethod
+    def _delete_task(cls, conn: sqlite3.Connection, todos: List[Dict], position: int):
+        """Delete the task that was at position, checking it is no longer in todos."""
+        row = conn.execute("SELECT id, uid FROM tasks WHERE position = ?", (position,)).fetchone()
+        if row is None:
+            return
+        if position < len(todos) and todos[position].get("id") == row[1]:
+            raise ValueError("Task rows do not match the list; a full save is needed")
+        conn.execute("DELETE FROM tasks WHERE id = ?", (row[0],))
+        cls._shift_positions(conn, position)
+
+    @staticmethod
+    def _next_position(conn: sqlite3.Connection) -> int:
+        """The position after the last task."""
+        return conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM tasks").fetchone()[0]
+
+    @staticmethod
+    def _insert_sub_tasks(conn: sqlite3.Connection, task_id: int, sub_todos: List[Dict]):
+        """Insert the sub-task rows of a task."""
+        conn.executemany(
+            "INSERT INTO sub_tasks (task_id, position, title, completed, created_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (task_id, position, sub.get("title", ""), 1 if sub.get("completed") else 0,
+                 sub.get("created_at"), json.dumps(sub, ensure_ascii=False))
+                for position, sub in enumerate(sub_todos)
+            ]
+        )
+
+    @staticmethod
+    def _shift_positions(conn: sqlite3.Connection, deleted_position: int):
+        """Close the gap left by a deleted task."""
+        # Two steps so the unique position index never sees a duplicate
+        conn.execute("UPDATE tasks SET position = -position WHERE position > ?",
+                     (deleted_position,))
+        conn.execute("UPDATE tasks SET position = -position - 1 WHERE position < 0")
+
+    @staticmethod
+    def _renumber_positions(conn: sqlite3.Connection):
+        """Renumber positions to 0..n-1 after a bulk delete."""
+        ids = [row[0] for row in conn.execute("SELECT id FROM tasks ORDER BY position")]
+        conn.execute("UPDATE tasks SET position = -position - 1")
+        conn.executemany("UPDATE tasks SET position = ? WHERE id = ?",
+                         [(position, task_id) for position, task_id in enumerate(ids)])
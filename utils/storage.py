@@ -0,0 +1,168 @@
+"""Storage backends for the todo list."""
+
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Dict, Iterator, Optional
+from config.settings import TODO_FILE, JOURNAL_FILE, STORAGE_BACKEND, JOURNAL_ENABLED
+from utils.atomic_io import atomic_write
+from utils.file_lock import store_lock
+from utils.journal import TaskJournal
+from utils.sync import SyncToken
+from utils.json_stream import write_todos, iter_decode_todos
+from utils.migrations import SCHEMA_VERSION, SchemaMigrator
+
+
+class JsonStorage:
+    """Stores todos in todos.json plus an append-only change journal.
+
+    Every storage backend exposes the same static interface: load(),
+    iter_load()/finish_load(), save(), record_change() and query(). Methods raise on failure;
+    DataManager reports the errors.
+
+    Writes happen under store_lock and bump the SyncToken, so several app
+    instances can share the files.
+    """
+
+    name = "json"
+    # Whether record_change() persists changes without rewriting everything
+    incremental = JOURNAL_ENABLED
+
+    _load_epoch = None  # snapshot epoch when the running iter_load() started
+    # Format version of the last snapshot read (older ones need a rewrite)
+    loaded_version = SCHEMA_VERSION
+
+    @staticmethod
+    def load(progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """Load todos, replaying any pending journal records."""
+        with store_lock:
+            try:
+                todos = JsonStorage.read_snapshot(progress)
+            except ValueError:
+                JsonStorage.preserve_corrupt()
+                raise
+            if JOURNAL_ENABLED:
+                TaskJournal.replay(todos)
+        return todos
+
+    @staticmethod
+    def load_at(until: str) -> List[Dict]:
+        """Load todos as of a time ("YYYY-mm-dd HH:MM:SS") the journal reaches back to."""
+        with store_lock:
+            todos = JsonStorage.read_snapshot()
+            TaskJournal.replay(todos, until)
+        return todos
+
+    @staticmethod
+    def iter_load() -> Iterator[Dict]:
+        """Yield snapshot tasks one at a time while the file is parsed.
+        
+        Pending journal records are applied by finish_load() afterwards.
+        """
+        JsonStorage._load_epoch = SyncToken.read()["epoch"]
+        JsonStorage.loaded_version = SCHEMA_VERSION
+        if not Path(TODO_FILE).exists():
+            return
+        header = {}
+        with open(TODO_FILE, "r", encoding="utf-8") as f:
+            try:
+                for todo in iter_decode_todos(f, header=header):
+                    version = header.get("version", 0)
+                    if version != JsonStorage.loaded_version:
+                        SchemaMigrator.check_version(version)
+                        JsonStorage.loaded_version = version
+                    yield SchemaMigrator.migrate_record(todo, version)
+            except ValueError:
+                JsonStorage.preserve_corrupt()
+                raise
+
+    @staticmethod
+    def finish_load(todos: List, make: Callable[[Dict], object] = None):
+        """Replay pending journal records after iter_load() finished.
+
+        If another instance replaced todos.json while it was being parsed,
+        the parsed tasks no longer match the journal and are read again.
+        With make, tasks read here are converted the way the caller converted
+        the ones iter_load() yielded.
+        """
+        with store_lock:
+            if SyncToken.read()["epoch"] != JsonStorage._load_epoch:
+                snapshot = JsonStorage.read_snapshot()
+                todos[:] = snapshot if make is None else map(make, snapshot)
+            if JOURNAL_ENABLED:
+                TaskJournal.replay(todos, make=make)
+
+    @staticmethod
+    def save(todos: List[Dict]) -> bool:
+        """Write the full todo list and drop the journal."""
+        with store_lock, TaskJournal.lock:
+            JsonStorage.write_snapshot(todos)
+            TaskJournal.reset()
+            SyncToken.bump(epoch=True)
+        return True
+
+    @staticmethod
+    def record_change(todos: List[Dict], op: str, index: int = None) -> bool:
+        """Append a single change to the journal."""
+        if not JOURNAL_ENABLED:
+            return JsonStorage.save(todos)
+
+        with store_lock:
+            if op == "add":
+                ok = TaskJournal.append(op, todo=todos[-1])
+            elif op == "set":
+                ok = TaskJournal.append(op, index, todos[index])
+            else:
+                ok = TaskJournal.append(op, index)
+
+            if not ok:
+                return JsonStorage.save(todos)
+            SyncToken.bump()
+        if TaskJournal.needs_compaction():
+            TaskJournal.compact_async(JsonStorage.read_snapshot, JsonStorage.write_snapshot)
+        return True
+
+    @staticmethod
+    def cache_paths() -> Optional[List[Path]]:
+        """Files whose identity determines the loaded list (for DataManager's cache)."""
+        return [Path(TODO_FILE), Path(JOURNAL_FILE), TaskJournal.COMPACTING_FILE]
+
+    @staticmethod
+    def query(filter_name: str, sort_name: str, search_query: str = "") -> Optional[List[int]]:
+        """Filtering happens in memory for JSON storage."""
+        return None
+
+    @staticmethod
+    def read_snapshot(progress: Callable[[int, int], None] = None) -> List[Dict]:
+        """Read the todos.json snapshot, upgrading old records (raises on unreadable files)."""
+        if Path(TODO_FILE).exists():
+            todos, JsonStorage.loaded_version = SchemaMigrator.load_file(TODO_FILE, progress)
+            return todos
+        JsonStorage.loaded_version = SCHEMA_VERSION
+        return []
+
+    @staticmethod
+    def preserve_corrupt():
+        """Copy an unreadable todos.json aside so the next save can't overwrite it."""
+        corrupt_file = Path(f"{TODO_FILE}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        shutil.copy2(TODO_FILE, corrupt_file)
+        print(f"Unreadable todos file preserved as {corrupt_file.name}")
+
+    @staticmethod
+    def write_snapshot(todos: List[Dict], journal_seq: int = None) -> bool:
+        """Write the todos.json snapshot atomically (call holding store_lock).
+
+        Its header marks the journal records it holds: all of them, or those
+        up to journal_seq.
+        """
+        header = TaskJournal.snapshot_header(journal_seq)
+        atomic_write(TODO_FILE, lambda f: write_todos(f, todos, header=header))
+        return True
+
+
+def get_storage():
+    """Get the storage backend selected by STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "sqlite":
+        from utils.sqlite_storage import SqliteStorage
+        return SqliteStorage
+    return JsonStorage
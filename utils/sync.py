@@ -0,0 +1,170 @@
+"""Detecting and merging changes made by other app instances."""
+
+import hashlib
+import json
+import os
+import uuid
+from typing import Dict, Iterable, Iterator, List, Tuple
+from config.settings import SYNC_FILE
+from utils.atomic_io import atomic_write
+
+
+class SyncToken:
+    """Change counters shared by every instance writing the task files.
+
+    The token file holds a "generation", bumped (under store_lock) by every
+    instance on every change to the stored list, and an "epoch", bumped
+    whenever todos.json itself is replaced (full saves, restores, journal
+    compaction). Another instance notices a foreign write with one stat()
+    call, and readers can tell if the snapshot moved under them.
+    """
+
+    WRITER_ID = uuid.uuid4().hex
+
+    # Generation our in-memory list was last in sync with (None: never loaded)
+    synced_generation = None
+
+    _stat = None
+    _token = {"generation": 0, "epoch": 0, "writer": None}
+
+    @classmethod
+    def read(cls) -> Dict:
+        """Get the current token; only re-reads the file when its stat changed."""
+        try:
+            st = os.stat(SYNC_FILE)
+            stat = (st.st_size, st.st_mtime_ns, st.st_ino)
+        except FileNotFoundError:
+            return {"generation": 0, "epoch": 0, "writer": None}
+        if stat != cls._stat:
+            try:
+                with open(SYNC_FILE, "r", encoding="utf-8") as f:
+                    token = json.load(f)
+                cls._token = {"generation": token["generation"], "epoch": token["epoch"],
+                              "writer": token["writer"]}
+            except (OSError, ValueError, KeyError):
+                # Half-written by a crashed instance; treat as a change
+                cls._token = {"generation": -1, "epoch": -1, "writer": None}
+            cls._stat = stat
+        return cls._token
+
+    @classmethod
+    def bump(cls, generation: bool = True, epoch: bool = False) -> Dict:
+        """Record a write by this instance (call while holding store_lock).
+
+        If we were in sync before the write, we stay in sync after it.
+        """
+        current = cls.read()
+        token = {
+            "generation": max(current["generation"], 0) + (1 if generation else 0),
+            "epoch": max(current["epoch"], 0) + (1 if epoch else 0),
+            "writer": cls.WRITER_ID,
+        }
+        atomic_write(SYNC_FILE, lambda f: json.dump(token, f), policy="never")
+        if generation and current["generation"] == cls.synced_generation:
+            cls.synced_generation = token["generation"]
+        return token
+
+    @classmethod
+    def mark_synced(cls, token: Dict = None):
+        """Record that the in-memory list matches the stored one at token."""
+        cls.synced_generation = (token or cls.read())["generation"]
+
+    @classmethod
+    def changed_externally(cls) -> bool:
+        """Check if another instance changed the stored list since we synced."""
+        if cls.synced_generation is None:
+            return False
+        return cls.read()["generation"] != cls.synced_generation
+
+
+def iter_keyed(todos: Iterable[Dict]) -> Iterator[Tuple[tuple, Dict]]:
+    """Pair tasks with a stable identity: their "id".
+
+    Records written before ids (schema version 1) fall back to creation
+    time plus occurrence number, which cannot tell apart tasks created in
+    the same second. Works on a stream, one task at a time, and on sub-task
+    lists too.
+    """
+    seen = {}
+    for todo in todos:
+        todo_id = todo.get("id")
+        identity = ("id", todo_id) if todo_id else ("created", todo.get("created_at") or "")
+        n = seen.get(identity, 0)
+        seen[identity] = n + 1
+        yield (*identity, n), todo
+
+
+def _keyed(todos: List[Dict]) -> Dict[tuple, Dict]:
+    """Index tasks by their identity (see iter_keyed())."""
+    return dict(iter_keyed(todos))
+
+
+def task_digest(todo: Dict) -> bytes:
+    """Short hash of a task's content, sub-tasks included."""
+    text = json.dumps(todo, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def digest_keyed(todos: Iterable[Dict]) -> List[Tuple[tuple, bytes]]:
+    """(key, content hash) of each task in order: a merge base for merge_todos().
+
+    Much smaller than a copy of the tasks, and built from a stream.
+    """
+    return [(key, task_digest(todo)) for key, todo in iter_keyed(todos)]
+
+
+def merge_todos(base: Iterable[Tuple[tuple, bytes]], ours: List[Dict],
+                theirs: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """Three-way merge of two diverged task lists, task by task.
+
+    base is the list both sides last agreed on, as digest_keyed() gives
+    it. A task changed on one side
+    only takes that side's version; when both changed it, ours wins. Edits
+    beat deletions. Tasks keep their order in theirs, followed by tasks
+    only we added.
+
+    Returns the merged list and a summary: "updated" (positions in the
+    merged list whose content differs from ours), "added", "removed",
+    "conflicts" (counts) and "structural" (True if positions shifted).
+    """
+    base_k, ours_k, theirs_k = dict(base), _keyed(ours), _keyed(theirs)
+    merged = []
+    merged_keys = []
+    conflicts = 0
+
+    for key, their_task in theirs_k.items():
+        base_digest = base_k.get(key)
+        our_task = ours_k.get(key)
+        if our_task is None:
+            if base_digest is not None and task_digest(their_task) == base_digest:
+                continue  # we deleted it and they didn't touch it
+            chosen = their_task
+        elif our_task == their_task or task_digest(our_task) == base_digest:
+            chosen = their_task
+        elif task_digest(their_task) == base_digest:
+            chosen = our_task
+        else:
+            conflicts += 1
+            chosen = our_task
+        merged.append(chosen)
+        merged_keys.append(key)
+
+    for key, our_task in ours_k.items():
+        if key in theirs_k:
+            continue
+        base_digest = base_k.get(key)
+        if base_digest is not None and task_digest(our_task) == base_digest:
+            continue  # they deleted it and we didn't touch it
+        merged.append(our_task)
+        merged_keys.append(key)
+
+    merged_set = set(merged_keys)
+    summary = {
+        "updated": [i for i, (key, todo) in enumerate(zip(merged_keys, merged))
+                    if key in ours_k and ours_k[key] is not todo and ours_k[key] != todo],
+        "added": sum(1 for key in merged_keys if key not in ours_k),
+        "removed": sum(1 for key in ours_k if key not in merged_set),
+        "conflicts": conflicts,
+        "structural": merged_keys != list(ours_k),
+    }
+    return merged, summary
@@ -0,0 +1,144 @@
+"""Per-task differences between an older version of the todo list and the live one."""
+
+from typing import Collection, Dict, Iterable, Iterator, List
+from utils.sync import iter_keyed
+
+
+def _positions(todos: Iterable[Dict]) -> Dict[tuple, int]:
+    """Positions of tasks by key (see iter_keyed()).
+
+    Tasks with an ID can also be found by the creation-time key they would
+    have had before IDs, so records from old backups still match them.
+    """
+    positions = {}
+    created = {}
+    for i, (key, todo) in enumerate(iter_keyed(todos)):
+        positions[key] = i
+        if key[0] == "id":
+            created_at = todo.get("created_at") or ""
+            n = created.get(created_at, 0)
+            created[created_at] = n + 1
+            positions.setdefault(("created", created_at, n), i)
+    return positions
+
+
+def _differs(old: Dict, new: Dict) -> bool:
+    """Check if a task (or sub-task) changed, ignoring an ID the old record never had."""
+    if old.get("id") or not new.get("id"):
+        return old != new
+    if any(old.get(field) != new.get(field) for field in _fields(old, new)):
+        return True
+    old_subs, new_subs = old.get("sub_todos"), new.get("sub_todos")
+    if old_subs is None or new_subs is None:
+        return old_subs != new_subs
+    return len(old_subs) != len(new_subs) or any(map(_differs, old_subs, new_subs))
+
+
+def _fields(old: Dict, new: Dict) -> List[str]:
+    """Fields that differ between two versions of a task, other than its ID and sub-tasks."""
+    return sorted(field for field in old.keys() | new.keys()
+                  if field not in ("id", "sub_todos") and old.get(field) != new.get(field))
+
+
+def _sub_changes(old: List[Dict], new: List[Dict]) -> List[Dict]:
+    """Sub-tasks added, removed or modified between two versions of a task."""
+    positions = _positions(new)
+    old_at = {}
+    removed = []
+    for key, old_sub in iter_keyed(old):
+        i = positions.get(key)
+        if i is None or i in old_at:
+            removed.append({"change": "removed", "title": old_sub["title"]})
+        else:
+            old_at[i] = old_sub
+    changes = []
+    for i, sub in enumerate(new):
+        old_sub = old_at.get(i)
+        if old_sub is None:
+            changes.append({"change": "added", "title": sub["title"]})
+        elif _differs(old_sub, sub):
+            changes.append({"change": "modified", "title": sub["title"]})
+    return changes + removed
+
+
+def _entry(change: str, key: tuple, old: Dict = None, new: Dict = None) -> Dict:
+    """Describe one changed task (without keeping either version of it)."""
+    entry = {"change": change, "key": key, "title": (new or old)["title"],
+             "fields": [], "sub_todos": []}
+    if old is not None and new is not None:
+        entry["fields"] = _fields(old, new)
+        entry["sub_todos"] = _sub_changes(old["sub_todos"], new["sub_todos"])
+    return entry
+
+
+def diff_tasks(live: List[Dict], snapshot: Iterable[Dict],
+               present: Iterable[Dict] = ()) -> Iterator[Dict]:
+    """Yield how the live list differs from an older snapshot, task by task.
+
+    The snapshot is consumed as a stream and each entry only describes the
+    change, so a large backup is never held in memory next to the live
+    list. Tasks are matched by ID, or by creation time for snapshots
+    written before IDs (see iter_keyed()); an entry has
+    "change" ("added", "removed" or "modified" since the snapshot), the
+    task "key" and "title", the "fields" that differ and the "sub_todos"
+    added, removed or modified. Snapshot tasks found in present (say, the
+    archive) are not reported as removed.
+    """
+    positions = _positions(live)
+    kept = _positions(present)
+    matched = bytearray(len(live))
+    for key, old in iter_keyed(snapshot):
+        i = positions.get(key)
+        if i is None or matched[i]:
+            if key not in kept:
+                yield _entry("removed", key, old=old)
+            continue
+        matched[i] = 1
+        if _differs(old, live[i]):
+            yield _entry("modified", key, old=old, new=live[i])
+    for (key, todo), seen in zip(iter_keyed(live), matched):
+        if not seen:
+            yield _entry("added", key, new=todo)
+
+
+def restore_tasks(live: List[Dict], snapshot: Iterable[Dict], keys: Collection[tuple],
+                  present: Iterable[Dict] = ()) -> List[Dict]:
+    """Revert chosen tasks (by key) of the live list to their snapshot versions.
+
+    Modified tasks get their old version back in place, removed ones are put
+    back after the task they followed in the snapshot, and added ones are
+    dropped. Every other task is left alone, and tasks found in present (say,
+    the archive) are not put back. Returns the new list; only the chosen
+    tasks of the snapshot are kept in memory.
+    """
+    keys = set(keys)
+    positions = _positions(live)
+    kept = _positions(present)
+    matched = bytearray(len(live))
+    replaced = {}
+    inserted = {}  # live position they follow (-1: the start) -> tasks
+    after = -1
+    found = set()
+    for key, old in iter_keyed(snapshot):
+        i = positions.get(key)
+        if i is not None and matched[i]:
+            i = None
+        if i is not None:
+            matched[i] = 1
+        if key in keys:
+            found.add(key)
+            if i is None:
+                if key not in kept:
+                    inserted.setdefault(after, []).append(old)
+            else:
+                replaced[i] = old
+        if i is not None:
+            after = i
+
+    dropped = keys - found  # chosen but not in the snapshot: added since
+    restored = list(inserted.get(-1, []))
+    for i, (key, todo) in enumerate(iter_keyed(live)):
+        if key not in dropped:
+            restored.append(replaced.get(i, todo))
+        restored.extend(inserted.get(i, []))
+    return restored